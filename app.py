@@ -2,20 +2,32 @@ import os
 from dotenv import load_dotenv
 import pandas as pd
 import numpy as np
-from flask import Flask, request, jsonify, render_template, send_file, abort
+from flask import Flask, request, jsonify, render_template, send_file, abort, session, g, Response
 from werkzeug.utils import secure_filename
-import plotly.graph_objects as go
-from scipy.stats import gaussian_kde
 import tempfile
+import shutil
+import atexit
+import queue
+import threading
+import functools
+import io
 import json
 import logging
 load_dotenv()
 import traceback
-from sklearn.datasets import load_iris, load_diabetes, load_breast_cancer, load_wine, fetch_california_housing
-from ml_processor import MLProcessor, MODEL_ALIASES
+from ml_processor import MLProcessor, MODEL_ALIASES, train_model_job, tune_hyperparameters_job
 from business_intelligence import BusinessIntelligence
 from reporting import BusinessReporter
 from gemini_ai import GeminiAI
+from dataset_cache import DatasetCache
+from feature_store import FeatureStore
+from data_ingestion import read_tabular, detect_format, needs_random_access, FILE_FORMATS, HashingReader
+import example_datasets
+from jobs import JobManager
+from shared_frames import SharedFrameStore, ParallelFrame
+from response_cache import ResponseCache
+from workspace import WorkspaceRegistry, WorkspaceStore
+from model_store import ModelStore
 from datetime import datetime, date, timedelta
 import requests
 import xml.etree.ElementTree as ET
@@ -23,6 +35,7 @@ from email.utils import parsedate_to_datetime
 import re
 from urllib.parse import urlparse
 import uuid
+import hashlib
 import math
 import numpy as np
 import pandas as pd
@@ -33,6 +46,13 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Process-wide pandas copy-on-write: every workspace's processing stages take shallow views of
+# the loaded dataset (often memory-mapped snapshots), and a stage that writes to a column then
+# copies only that column instead of the whole frame. Without it, ml_processor falls back to
+# deep copies for those views.
+if hasattr(pd.options.mode, 'copy_on_write'):
+    pd.set_option('mode.copy_on_write', True)
+
 class CustomJSONEncoder(json.JSONEncoder):
     """Custom JSON encoder to handle NaN, infinity, and other problematic values"""
     def default(self, obj):
@@ -54,23 +74,85 @@ class CustomJSONEncoder(json.JSONEncoder):
             if math.isnan(obj) or math.isinf(obj):
                 return None
             return obj
+        elif isinstance(obj, (pd.Timestamp, datetime, date)):
+            return None if pd.isna(obj) else obj.isoformat()
+        elif isinstance(obj, np.datetime64):
+            return None if np.isnat(obj) else pd.Timestamp(obj).isoformat()
         return super().default(obj)
 
 app = Flask(__name__)
 app.json_encoder = CustomJSONEncoder
 app.config['UPLOAD_FOLDER'] = 'uploads'
-app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
-app.config['SECRET_KEY'] = os.urandom(24)
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get('MAX_UPLOAD_SIZE_MB', 512)) * 1024 * 1024  # max upload size
+app.config['INGEST_CHUNK_SIZE'] = int(os.environ.get('INGEST_CHUNK_SIZE', 100000))  # rows per parsed CSV block
+app.config['DATASET_CACHE_DIR'] = os.environ.get('DATASET_CACHE_DIR', os.path.join('uploads', 'cache'))
+app.config['FEATURE_STORE_DIR'] = os.environ.get('FEATURE_STORE_DIR', os.path.join('uploads', 'features'))
+app.config['MEMORY_MAPPED_FEATURES'] = os.environ.get('MEMORY_MAPPED_FEATURES', 'True').lower() == 'true'
+app.config['JOB_WORKERS'] = int(os.environ.get('JOB_WORKERS', 2))  # background ingestion/profiling threads
+app.config['TRAINING_WORKERS'] = int(os.environ.get('TRAINING_WORKERS', 2))  # processes for training/tuning jobs
+app.config['RESPONSE_CACHE_MB'] = int(os.environ.get('RESPONSE_CACHE_MB', 256))  # rendered analysis responses
+app.config['SSE_KEEPALIVE_SECONDS'] = int(os.environ.get('SSE_KEEPALIVE_SECONDS', 15))  # comment lines keep idle streams open
+app.config['PARALLEL_MIN_ROWS'] = int(os.environ.get('PARALLEL_MIN_ROWS', 200000))  # fan per-column analysis out above this
+app.config['WORKSPACE_MEMORY_BUDGET_MB'] = int(os.environ.get('WORKSPACE_MEMORY_BUDGET_MB', 2048))  # all workspaces together
+app.config['MODEL_SPILL_DIR'] = os.environ.get('MODEL_SPILL_DIR', os.path.join('uploads', 'models'))
+app.config['MODEL_IDLE_SECONDS'] = int(os.environ.get('MODEL_IDLE_SECONDS', 900))  # spill trained models unused this long
+app.config['MODEL_MEMORY_MB'] = int(os.environ.get('MODEL_MEMORY_MB', 512))  # resident trained models per workspace
+app.config['WORKSPACE_STATE_DIR'] = os.environ.get('WORKSPACE_STATE_DIR', os.path.join('uploads', 'workspaces'))
+app.config['JOB_STATE_DIR'] = os.environ.get('JOB_STATE_DIR', os.path.join('uploads', 'jobs'))
 app.config['DATA_UPLOAD_API_KEY'] = os.environ.get('DATA_UPLOAD_API_KEY', None)
 app.config['NEWS_API_KEY'] = os.environ.get('NEWS_API_KEY', None)
 
-# Global variable to track the most recently uploaded file
-most_recent_uploaded_file = None
-
-# Global instances
-ml_processor = None
-business_intelligence = None
-business_reporter = None
+def _secret_key():
+    """Session signing key shared by all server processes: SECRET_KEY, or one generated once on disk"""
+    if os.environ.get('SECRET_KEY'):
+        return os.environ['SECRET_KEY']
+    path = os.path.join(app.config['UPLOAD_FOLDER'], '.secret_key')
+    os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
+    try:
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(os.urandom(24))
+    except FileExistsError:
+        pass
+    with open(path, 'rb') as f:
+        return f.read()
+
+app.config['SECRET_KEY'] = _secret_key()
+
+def _model_store():
+    """Trained-model store for a workspace: idle models are spilled to disk and reloaded on use"""
+    return ModelStore(app.config['MODEL_SPILL_DIR'], idle_seconds=app.config['MODEL_IDLE_SECONDS'],
+                      max_bytes=app.config['MODEL_MEMORY_MB'] * 1024 * 1024)
+
+# Each analyst (browser session or API key) gets their own dataset, splits and models; their
+# manifests on disk let any server process pick a workspace up
+workspaces = WorkspaceRegistry(app.config['WORKSPACE_MEMORY_BUDGET_MB'] * 1024 * 1024,
+                               store=WorkspaceStore(app.config['WORKSPACE_STATE_DIR'],
+                                                    model_store_factory=_model_store))
+
+def _workspace_key():
+    """Identify the caller: API clients by (a hash of) their key, browsers by session"""
+    api_key = request.headers.get('X-API-Key') or request.args.get('api_key')
+    if api_key:
+        return 'api:' + hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+    if 'workspace_id' not in session:
+        session['workspace_id'] = uuid.uuid4().hex
+    return 'session:' + session['workspace_id']
+
+def current_workspace():
+    """Return the calling user's workspace (once per request)"""
+    if 'workspace' not in g:
+        g.workspace = workspaces.get(_workspace_key())
+    return g.workspace
+
+@app.after_request
+def _measure_workspace(response):
+    """Re-measure the workspace after requests that may have changed it and enforce the budget"""
+    if request.method == 'POST' and 'workspace' in g:
+        workspaces.refresh(g.workspace)
+    return response
+
+# Shared AI client
 gemini_ai = None
 
 # Initialize Gemini AI using environment variable (recommended)
@@ -84,10 +166,200 @@ except Exception as e:
 # Ensure upload directory exists
 os.makedirs(app.config['UPLOAD_FOLDER'], exist_ok=True)
 
-ALLOWED_EXTENSIONS = {'csv'}
+# Parsed datasets are stored once per content hash as memory-mappable snapshots
+dataset_cache = DatasetCache(app.config['DATASET_CACHE_DIR'])
+
+# Preprocessed train/test matrices are shared between trainers as memory-mapped arrays
+feature_store = FeatureStore(app.config['FEATURE_STORE_DIR'])
+
+# Parsing and profiling of async uploads run on threads; async training and tuning in worker processes
+job_manager = JobManager(max_workers=app.config['JOB_WORKERS'], process_workers=app.config['TRAINING_WORKERS'],
+                         state_dir=app.config['JOB_STATE_DIR'])
+
+# Large datasets are handed to those worker processes once, as shared-memory columns
+shared_frames = SharedFrameStore()
+atexit.register(shared_frames.close)
+
+# Read-only analysis endpoints are computed once per dataset and query
+response_cache = ResponseCache(app.config['RESPONSE_CACHE_MB'] * 1024 * 1024)
+
+def cached_by_dataset(vary=None, on_hit=None):
+    """Serve a read-only GET endpoint from the response cache while the caller's dataset is unchanged.
+    vary(workspace) names any other workspace state the response depends on; on_hit(workspace, payload)
+    restores workspace state the view would have set as a side effect."""
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            ws = current_workspace()
+            processor = ws.ml_processor
+            if processor is None or processor.data is None:
+                return view(*args, **kwargs)
+            key = ResponseCache.make_key(processor.dataset_fingerprint(), request.endpoint, request.args,
+                                         *((vary(ws),) if vary else ()))
+            cached = response_cache.get(key)
+            if cached is not None:
+                body, status, mimetype = cached
+                if on_hit is not None:
+                    on_hit(ws, json.loads(body))
+                response = app.response_class(body, status=status, mimetype=mimetype)
+                response.headers['X-Cache'] = 'HIT'
+                return response
+
+            response = app.make_response(view(*args, **kwargs))
+            payload = response.get_json(silent=True) if response.status_code == 200 else None
+            # Errors (e.g. a bad column name) are not cached
+            if isinstance(payload, dict) and payload.get('status') != 'error':
+                response_cache.put(key, response.get_data(), response.status_code, response.mimetype)
+            response.headers['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+def _feature_store_for(options):
+    """Return the feature store unless memory mapping is disabled for this request"""
+    return feature_store if options.get('memory_map', app.config['MEMORY_MAPPED_FEATURES']) else None
+
+ALLOWED_EXTENSIONS = {suffix.rsplit('.', 1)[1] for suffix in FILE_FORMATS}
 
 def allowed_file(filename):
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return detect_format(filename) is not None
+
+def _check_upload_api_key():
+    """Return an error response if an upload API key is configured and not provided"""
+    expected = app.config.get('DATA_UPLOAD_API_KEY')
+    provided = request.headers.get('X-API-Key') or request.args.get('api_key')
+    if expected:
+        if not provided or provided != expected:
+            return jsonify({'status': 'error', 'message': 'Invalid API key'}), 401
+    return None
+
+def _upload_path(filename):
+    """Path to save one upload at: a directory of its own under the upload folder, so uploads
+    of the same filename (by any user) never overwrite each other, e.g. while a job reads one.
+    The directory is created when the file is written."""
+    return os.path.join(app.config['UPLOAD_FOLDER'], uuid.uuid4().hex, secure_filename(filename))
+
+def _save_upload(filepath):
+    """Create the directory of an upload path before the upload is written to it"""
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    return filepath
+
+def _fingerprint_upload(file):
+    """Hash an uploaded file without saving it. Returns (filepath, dataset_key, cache_hit)."""
+    filepath = _upload_path(file.filename)
+    key = dataset_cache.fingerprint_stream(file.stream)
+    return filepath, key, dataset_cache.has(key)
+
+def _ingest_stream(stream, filepath, tee=True, progress=None):
+    """Parse an uploaded byte stream while it is read, saving it to filepath and hashing it
+    in the same pass, then store the parsed frame in the snapshot cache.
+    Zip, Excel and Parquet files need random access, so they are saved first and parsed
+    from disk. With tee=False the stream is already the saved file and is only hashed.
+    `progress` is called with (rows, bytes_read) after every parsed block.
+    Returns (data, dataset_key, load_stats)."""
+    reader = HashingReader(stream, tee_path=_save_upload(filepath) if tee else None)
+    on_chunk = (lambda rows: progress(rows, reader.bytes_read)) if progress else None
+    try:
+        if needs_random_access(filepath):
+            reader.drain()
+            reader.close()
+            data, load_stats = read_tabular(filepath, filepath, chunksize=app.config['INGEST_CHUNK_SIZE'],
+                                            progress=on_chunk)
+        else:
+            data, load_stats = read_tabular(io.BufferedReader(reader), filepath,
+                                            chunksize=app.config['INGEST_CHUNK_SIZE'], progress=on_chunk)
+            reader.drain()
+    except Exception:
+        reader.close()
+        if os.path.exists(filepath):
+            os.remove(filepath)
+        try:
+            os.rmdir(os.path.dirname(filepath))  # the upload's own directory, if now empty
+        except OSError:
+            pass
+        raise
+    reader.close()
+
+    dataset_key = reader.hexdigest()
+    dataset_cache.store(dataset_key, data, filename=os.path.basename(filepath),
+                        date_formats=load_stats.get('date_columns') or {})
+    load_stats.update({'cache_hit': False, 'bytes_received': reader.bytes_read})
+    return data, dataset_key, load_stats
+
+def _processor_for(data, dataset_key, load_stats):
+    """Build an MLProcessor for a freshly parsed dataset, preferring its memory-mapped snapshot"""
+    if dataset_cache.has(dataset_key):
+        processor = MLProcessor(cache=dataset_cache, fingerprint=dataset_key)
+    else:
+        processor = MLProcessor(data=data, fingerprint=dataset_key)
+        processor.date_formats = load_stats.get('date_columns') or {}
+    processor.load_stats = load_stats
+    return processor
+
+def _activate_dataset(processor, filepath=None, workspace=None):
+    """Make a freshly loaded dataset the current one for all analysis endpoints of a workspace
+    (the caller's, unless one is given)"""
+    ws = workspace or current_workspace()
+    if ws.most_recent_dataset_key and ws.most_recent_dataset_key != processor.fingerprint:
+        response_cache.invalidate(ws.most_recent_dataset_key)
+    if ws.business_intelligence is not None and ws.business_intelligence.parallel is not None:
+        # The previous dataset's shared blocks are freed once no other workspace uses them
+        ws.business_intelligence.parallel.close()
+    parallel = None
+    if len(processor.data) >= app.config['PARALLEL_MIN_ROWS']:
+        parallel = ParallelFrame(job_manager.process_executor, shared_frames, processor.fingerprint)
+    business_intelligence = BusinessIntelligence(processor.data, parallel=parallel, profile=processor.dataset.profile)
+    processor.models = _model_store()
+    ws.business_reporter = BusinessReporter(business_intelligence)
+    ws.business_intelligence = business_intelligence
+    ws.ml_processor = processor
+    ws.most_recent_uploaded_file = filepath
+    ws.most_recent_dataset_key = processor.fingerprint
+    workspaces.refresh(ws)
+
+def _is_async_request():
+    """Check whether the client asked for the work to be done in a background job"""
+    body = request.get_json(silent=True) if request.is_json else None
+    flag = request.args.get('async') or request.form.get('async') or (body or {}).get('async')
+    return str(flag or '').lower() == 'true'
+
+def _run_ingest_job(job, workspace, filepath, dataset_key=None):
+    """Background job: parse (or memory-map) a saved upload, profile it and make it current"""
+    if dataset_key and dataset_cache.has(dataset_key):
+        job.update(stage='loading snapshot')
+        processor = MLProcessor(cache=dataset_cache, fingerprint=dataset_key)
+    else:
+        job.update(stage='parsing')
+        with open(filepath, 'rb') as f:
+            data, dataset_key, load_stats = _ingest_stream(
+                f, filepath, tee=False,
+                progress=lambda rows, nbytes: job.update(rows=rows, bytes_processed=nbytes))
+        job.update(stage='inferring types')
+        processor = _processor_for(data, dataset_key, load_stats)
+
+    job.update(stage='profiling', rows=len(processor.data), bytes_processed=job.total_bytes)
+    _activate_dataset(processor, filepath, workspace=workspace)
+    return convert_to_json_serializable({
+        'columns': processor.data.columns.tolist(),
+        'shape': list(processor.data.shape),
+        'dataset_key': processor.fingerprint,
+        'load_stats': processor.load_stats
+    })
+
+def _accepted_job(job, message):
+    """Response for a request whose work continues in a background job"""
+    return jsonify({
+        'status': 'success',
+        'message': message,
+        'job_id': job.id,
+        'job_url': f'/jobs/{job.id}'
+    }), 202
+
+def _load_cached_dataset(filepath, key=None):
+    """Load a dataset through the snapshot cache, parsing the CSV only on a miss"""
+    parser = lambda path: read_tabular(path, path, chunksize=app.config['INGEST_CHUNK_SIZE'])[0]
+    data, key, _ = dataset_cache.load_or_parse(filepath, parser, key=key)
+    return data, key
 
 def convert_to_json_serializable(obj):
     """Convert numpy/pandas objects to JSON serializable format"""
@@ -138,15 +410,12 @@ def profile_page():
 
 @app.route('/upload', methods=['POST'])
 def upload_file():
-    global ml_processor, business_intelligence, business_reporter, most_recent_uploaded_file
-    
+    ws = current_workspace()
     try:
         # Optional API key check
-        expected = app.config.get('DATA_UPLOAD_API_KEY')
-        provided = request.headers.get('X-API-Key') or request.args.get('api_key')
-        if expected:
-            if not provided or provided != expected:
-                return jsonify({'status': 'error', 'message': 'Invalid API key'}), 401
+        auth_error = _check_upload_api_key()
+        if auth_error:
+            return auth_error
         if 'file' not in request.files:
             return jsonify({
                 'status': 'error',
@@ -159,34 +428,44 @@ def upload_file():
                 'status': 'error',
                 'message': 'No file selected'
             })
+        if not allowed_file(file.filename):
+            return jsonify({
+                'status': 'error',
+                'message': 'Unsupported file type. Upload CSV (plain, .gz, .zip or .zst), Excel or Parquet files.'
+            })
 
-        # Save file
-        filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-        file.save(filepath)
+        # Identical content already cached skips both saving and parsing
+        filepath, dataset_key, cache_hit = _fingerprint_upload(file)
 
-        # Update global variable
-        most_recent_uploaded_file = filepath
+        if _is_async_request():
+            if not cache_hit:
+                file.save(_save_upload(filepath))
+            job = job_manager.submit('upload', _run_ingest_job, ws, filepath, dataset_key, owner=ws.key,
+                                     total_bytes=None if cache_hit else os.path.getsize(filepath))
+            return _accepted_job(job, 'File received, processing in background')
 
         # Initialize MLProcessor with the uploaded file
         try:
-            ml_processor = MLProcessor(data_path=filepath)
+            if cache_hit:
+                processor = MLProcessor(cache=dataset_cache, fingerprint=dataset_key)
+            else:
+                # Parse straight from the upload stream while saving it
+                data, dataset_key, load_stats = _ingest_stream(file.stream, filepath)
+                processor = _processor_for(data, dataset_key, load_stats)
             
             # Initialize Business Intelligence
-            business_intelligence = BusinessIntelligence(ml_processor.data)
-            business_reporter = BusinessReporter(business_intelligence)
+            _activate_dataset(processor, filepath)
             
             return jsonify({
                 'status': 'success',
                 'message': 'File uploaded successfully',
-                'columns': ml_processor.data.columns.tolist(),
-                'shape': ml_processor.data.shape
+                'columns': ws.ml_processor.data.columns.tolist(),
+                'shape': ws.ml_processor.data.shape,
+                'dataset_key': dataset_key,
+                'load_stats': ws.ml_processor.load_stats
             })
             
         except Exception as e:
-            # Clean up the uploaded file if processing fails
-            if os.path.exists(filepath):
-                os.remove(filepath)
             raise ValueError(f"Error processing file: {str(e)}")
 
     except Exception as e:
@@ -196,50 +475,133 @@ def upload_file():
             'message': f"Error uploading file: {str(e)}"
         })
 
+@app.route('/upload_stream', methods=['POST'])
+def upload_stream():
+    """Upload a CSV as the raw request body and parse it while it is being received.
+
+    The filename comes from the X-Filename header (or ?filename=). Clients that know
+    the file's SHA-256 can send it as X-Content-SHA256; if that dataset is already
+    cached the body is never read.
+    """
+    ws = current_workspace()
+    try:
+        auth_error = _check_upload_api_key()
+        if auth_error:
+            return auth_error
+
+        filename = secure_filename(request.headers.get('X-Filename') or request.args.get('filename') or '')
+        if not filename:
+            return jsonify({
+                'status': 'error',
+                'message': 'No filename given (X-Filename header or filename parameter)'
+            })
+        if not allowed_file(filename):
+            return jsonify({
+                'status': 'error',
+                'message': 'Unsupported file type. Upload CSV (plain, .gz, .zip or .zst), Excel or Parquet files.'
+            })
+        filepath = _upload_path(filename)
+
+        known_key = (request.headers.get('X-Content-SHA256') or '').lower()
+        if _is_async_request():
+            # The body must be consumed on the request thread; parsing happens in the job
+            if known_key and dataset_cache.has(known_key):
+                job = job_manager.submit('upload', _run_ingest_job, ws, None, known_key, owner=ws.key)
+            else:
+                with open(_save_upload(filepath), 'wb') as f:
+                    shutil.copyfileobj(request.stream, f, 1024 * 1024)
+                job = job_manager.submit('upload', _run_ingest_job, ws, filepath, owner=ws.key,
+                                         total_bytes=os.path.getsize(filepath))
+            return _accepted_job(job, 'File received, processing in background')
+
+        if known_key and dataset_cache.has(known_key):
+            processor = MLProcessor(cache=dataset_cache, fingerprint=known_key)
+            filepath = None
+        else:
+            data, dataset_key, load_stats = _ingest_stream(request.stream, filepath)
+            processor = _processor_for(data, dataset_key, load_stats)
+
+        _activate_dataset(processor, filepath)
+
+        return jsonify({
+            'status': 'success',
+            'message': 'File uploaded successfully',
+            'columns': ws.ml_processor.data.columns.tolist(),
+            'shape': ws.ml_processor.data.shape,
+            'dataset_key': ws.ml_processor.fingerprint,
+            'load_stats': ws.ml_processor.load_stats
+        })
+
+    except Exception as e:
+        app.logger.error(f"Error streaming upload: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': f"Error uploading file: {str(e)}"
+        })
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    """Report the stage, rows processed and ETA of one of the caller's background jobs"""
+    job = job_manager.get(job_id, owner=current_workspace().key)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job not found'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'job': job.to_dict()
+    })
+
+@app.route('/jobs/<job_id>/cancel', methods=['POST'])
+def cancel_job(job_id):
+    """Request cancellation of one of the caller's background jobs; running training stops at
+    its next checkpoint"""
+    job = job_manager.cancel(job_id, owner=current_workspace().key)
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job not found'
+        }), 404
+    return jsonify({
+        'status': 'success',
+        'message': 'Cancellation requested',
+        'job': job.to_dict()
+    })
+
+@app.route('/workspace', methods=['GET'])
+def get_workspace():
+    """Describe the caller's workspace and the registry's memory use"""
+    ws = current_workspace()
+    return jsonify({
+        'status': 'success',
+        'workspace': ws.to_dict(),
+        'registry': workspaces.stats(),
+        'response_cache': response_cache.stats()
+    })
+
 @app.route('/load_example_dataset/<dataset_name>', methods=['GET'])
 def load_example_dataset(dataset_name):
-    global ml_processor, business_intelligence, business_reporter, most_recent_uploaded_file
-    
     try:
-        # Load the selected dataset
-        if dataset_name == 'iris':
-            data = load_iris()
-        elif dataset_name == 'california':
-            data = fetch_california_housing()
-        elif dataset_name == 'diabetes':
-            data = load_diabetes()
-        elif dataset_name == 'breast_cancer':
-            data = load_breast_cancer()
-        elif dataset_name == 'wine':
-            data = load_wine()
-        else:
+        if dataset_name not in example_datasets.EXAMPLE_DATASETS:
             return jsonify({
                 'status': 'error',
                 'message': 'Invalid dataset name'
             })
+        # Snapshots are normally committed or built at deploy; build any that are still missing
+        if not example_datasets.is_available(dataset_name):
+            example_datasets.materialize(dataset_name)
 
-        # Convert to DataFrame
-        df = pd.DataFrame(data.data, columns=data.feature_names)
-        if hasattr(data, 'target'):
-            df['target'] = data.target
-
-        # Save to temporary file
-        temp_file = os.path.join(app.config['UPLOAD_FOLDER'], f'{dataset_name}_temp.csv')
-        df.to_csv(temp_file, index=False)
-        
-        # Update global variable
-        most_recent_uploaded_file = temp_file
-
-        # Initialize processors
-        ml_processor = MLProcessor(data_path=temp_file)
-        business_intelligence = BusinessIntelligence(ml_processor.data)
-        business_reporter = BusinessReporter(business_intelligence)
+        # Memory-map the snapshot; no CSV round trip and no download
+        processor = MLProcessor(cache=example_datasets.snapshots, fingerprint=dataset_name)
+        _activate_dataset(processor)
 
         return jsonify({
             'status': 'success',
             'message': f'{dataset_name} dataset loaded successfully',
-            'columns': df.columns.tolist(),
-            'shape': df.shape
+            'columns': processor.data.columns.tolist(),
+            'shape': processor.data.shape,
+            'load_stats': processor.load_stats
         })
 
     except Exception as e:
@@ -251,17 +613,18 @@ def load_example_dataset(dataset_name):
 
 @app.route('/detect_problem_type', methods=['POST'])
 def detect_problem():
+    ws = current_workspace()
     try:
         data = request.get_json()
         target_column = data.get('target_column')
         
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
             })
         
-        problem_type = ml_processor.detect_problem_type(target_column)
+        problem_type = ws.ml_processor.detect_problem_type(target_column)
         
         return jsonify({
             'status': 'success',
@@ -277,8 +640,9 @@ def detect_problem():
 
 @app.route('/analyze_bias', methods=['POST'])
 def analyze_bias():
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
@@ -294,10 +658,10 @@ def analyze_bias():
         target_column = data['target_column']
         
         # First detect problem type
-        problem_type = ml_processor.detect_problem_type(target_column)
+        problem_type = ws.ml_processor.detect_problem_type(target_column)
         
         # Then analyze bias
-        bias_report = ml_processor.analyze_data_bias()
+        bias_report = ws.ml_processor.analyze_data_bias()
         
         return jsonify({
             'status': 'success',
@@ -314,8 +678,9 @@ def analyze_bias():
 
 @app.route('/preprocess', methods=['POST'])
 def preprocess():
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
@@ -332,9 +697,15 @@ def preprocess():
         handle_imbalance = data.get('handle_imbalance', True)
         
         # Preprocess the data
-        preprocessing_results = ml_processor.preprocess_data(
+        preprocessing_results = ws.ml_processor.preprocess_data(
             test_size=test_size,
-            handle_imbalance=handle_imbalance
+            handle_imbalance=handle_imbalance,
+            feature_store=_feature_store_for(data),
+            encodings=data.get('encodings'),
+            drop_uninformative=data.get('drop_uninformative', True),
+            keep_columns=data.get('keep_columns'),
+            one_hot=data.get('one_hot', False),
+            precision=data.get('precision', 'float64')
         )
         
         # Ensure we have the expected structure
@@ -342,15 +713,16 @@ def preprocess():
             preprocessing_results = {}
         
         # Add basic shape information if not present
-        if 'train_shape' not in preprocessing_results and hasattr(ml_processor, 'X_train'):
+        split = ws.ml_processor.split
+        if 'train_shape' not in preprocessing_results and split is not None:
             preprocessing_results['train_shape'] = {
-                'X': list(ml_processor.X_train.shape),
-                'y': list(np.shape(ml_processor.y_train))
+                'X': list(split.X_train.shape),
+                'y': list(np.shape(split.y_train))
             }
-        if 'test_shape' not in preprocessing_results and hasattr(ml_processor, 'X_test'):
+        if 'test_shape' not in preprocessing_results and split is not None:
             preprocessing_results['test_shape'] = {
-                'X': list(ml_processor.X_test.shape),
-                'y': list(np.shape(ml_processor.y_test))
+                'X': list(split.X_test.shape),
+                'y': list(np.shape(split.y_test))
             }
         
         return jsonify({
@@ -367,10 +739,11 @@ def preprocess():
 
 @app.route('/train_model', methods=['POST'])
 def train_model():
+    ws = current_workspace()
     try:
         app.logger.info("Received training request")
         
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
@@ -393,9 +766,28 @@ def train_model():
             model_type = MODEL_ALIASES[model_type]
             app.logger.info(f"Mapped model type from {original_type} to {model_type}")
 
+        if _is_async_request():
+            processor = ws.ml_processor
+            split = processor.split
+            if split is None:
+                return jsonify({
+                    'status': 'error',
+                    'message': 'Please preprocess the data first'
+                })
+
+            def hand_back(result):
+                # The fitted model comes back from the worker process into the workspace it was trained for
+                processor.publish_model(result['model_name'], result['entry'], split)
+                workspaces.refresh(ws)
+                return convert_to_json_serializable(result['response'])
+
+            job = job_manager.submit_process('training', train_model_job, split, model_type,
+                                             data.get('custom_params'), on_complete=hand_back, owner=ws.key)
+            return _accepted_job(job, f'Training {model_type} in the background')
+
         # Train the model and get results
         app.logger.info("Starting model training...")
-        results = ml_processor.train_model(model_type)
+        results = ws.ml_processor.train_model(model_type)
         
         # Log the complete results
         app.logger.info("Training completed. Results:")
@@ -416,6 +808,7 @@ def train_model():
 
 @app.route('/tune_hyperparameters', methods=['POST'])
 def tune_hyperparameters():
+    ws = current_workspace()
     try:
         data = request.get_json()
         n_trials = data.get('n_trials', 100)
@@ -426,7 +819,17 @@ def tune_hyperparameters():
         if not model_type:
             return jsonify({'error': 'Model type is required'}), 400
 
-        best_params = ml_processor.tune_hyperparameters(
+        if _is_async_request():
+            split = ws.ml_processor.split if ws.ml_processor else None
+            if split is None:
+                return jsonify({'error': 'Please preprocess the data first'}), 400
+            job = job_manager.submit_process('tuning', tune_hyperparameters_job, split, model_type,
+                                             n_trials=n_trials, cv_folds=cv_folds, cv_strategy=cv_strategy,
+                                             on_complete=lambda best_params: {'best_params': best_params},
+                                             owner=ws.key)
+            return _accepted_job(job, f'Tuning {model_type} in the background')
+
+        best_params = ws.ml_processor.tune_hyperparameters(
             model_type=model_type,
             n_trials=n_trials,
             cv_folds=cv_folds,
@@ -439,14 +842,15 @@ def tune_hyperparameters():
 
 @app.route('/visualizations', methods=['GET'])
 def get_visualizations():
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
             })
         
-        plots = ml_processor.create_visualizations()
+        plots = ws.ml_processor.create_visualizations()
         
         return jsonify({
             'status': 'success',
@@ -462,11 +866,12 @@ def get_visualizations():
 
 @app.route('/save_model', methods=['POST'])
 def save():
+    ws = current_workspace()
     try:
         data = request.get_json()
         model_name = data.get('model_name', 'model.joblib')
         
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
@@ -478,7 +883,7 @@ def save():
         
         # Save the model
         model_path = os.path.join(models_dir, model_name)
-        save_result = ml_processor.save_model(model_path)
+        save_result = ws.ml_processor.save_model(model_path)
         
         return jsonify({
             'status': 'success',
@@ -492,16 +897,57 @@ def save():
             'message': str(e)
         })
 
+@app.route('/predict', methods=['POST'])
+def predict():
+    """Score new rows (JSON `records` or an uploaded CSV `file`) with a trained model"""
+    ws = current_workspace()
+    try:
+        if not ws.ml_processor:
+            return jsonify({
+                'status': 'error',
+                'message': 'Please upload or select a dataset first'
+            })
+
+        if 'file' in request.files:
+            rows = pd.read_csv(request.files['file'])
+            model_type = request.form.get('model_type')
+        else:
+            data = request.get_json(silent=True) or {}
+            if not data.get('records'):
+                return jsonify({
+                    'status': 'error',
+                    'message': 'No records provided'
+                })
+            rows = pd.DataFrame(data['records'])
+            model_type = data.get('model_type')
+
+        result = ws.ml_processor.predict(rows, model_name=model_type)
+        return jsonify({
+            'status': 'success',
+            'model': result['model'],
+            'rows': result['rows'],
+            'predictions': convert_to_json_serializable(result['predictions'])
+        })
+
+    except Exception as e:
+        app.logger.error(f"Error in predict: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': str(e)
+        })
+
 @app.route('/advanced_eda', methods=['GET'])
+@cached_by_dataset()
 def advanced_eda():
+    ws = current_workspace()
     try:
-        if ml_processor is None or ml_processor.data is None:
+        if ws.ml_processor is None or ws.ml_processor.data is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
 
-        data = ml_processor.data
+        data = ws.ml_processor.data
         numeric_cols = data.select_dtypes(include=[np.number]).columns
         categorical_cols = data.select_dtypes(exclude=[np.number]).columns
 
@@ -531,6 +977,7 @@ def advanced_eda():
         }
 
         # Distribution plots for numeric columns
+        from scipy.stats import gaussian_kde
         distribution_plots = {}
         for col in numeric_cols:
             data_col = data[col].dropna()
@@ -627,23 +1074,29 @@ def advanced_eda():
 @app.route('/post_eda', methods=['GET'])
 def post_eda():
     """Perform EDA on preprocessed data"""
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
             })
         
-        if not hasattr(ml_processor, 'X_train') or not hasattr(ml_processor, 'y_train'):
+        # Read one published split so a concurrent preprocess cannot mix versions
+        split = ws.ml_processor.split
+        if split is None:
             return jsonify({
                 'status': 'error',
                 'message': 'Please preprocess the data first'
             })
             
+        # Sparse splits are summarized by their dense (non one-hot) columns
+        X_train, X_test = split.feature_frames()
+        
         # Get feature correlations
         correlations = {}
-        if ml_processor.X_train.select_dtypes(include=['int64', 'float64']).columns.size > 0:
-            corr_matrix = ml_processor.X_train.corr()
+        if X_train.select_dtypes(include=[np.number]).columns.size > 0:
+            corr_matrix = X_train.corr()
             correlations = {
                 'matrix': corr_matrix.to_dict(),
                 'features': corr_matrix.columns.tolist()
@@ -651,22 +1104,22 @@ def post_eda():
         
         # Get feature importance if classification
         feature_importance = None
-        if ml_processor.problem_type == 'classification':
+        if split.problem_type == 'classification':
             from sklearn.ensemble import RandomForestClassifier
             rf = RandomForestClassifier(n_estimators=50, random_state=42)
-            rf.fit(ml_processor.X_train, ml_processor.y_train)
+            rf.fit(split.X_train, split.y_train)
             importance = rf.feature_importances_
             feature_importance = {
                 str(col): float(imp) for col, imp in 
-                zip(ml_processor.X_train.columns, importance)
+                zip(split.feature_names, importance)
             }
         
         # Get distribution plots for numerical features
         distributions = {}
-        numerical_features = ml_processor.X_train.select_dtypes(include=['int64', 'float64']).columns
+        numerical_features = X_train.select_dtypes(include=[np.number]).columns
         for col in numerical_features:
-            train_data = ml_processor.X_train[col].tolist()
-            test_data = ml_processor.X_test[col].tolist()
+            train_data = X_train[col].tolist()
+            test_data = X_test[col].tolist()
             distributions[str(col)] = {
                 'train': {
                     'mean': float(np.mean(train_data)),
@@ -686,9 +1139,9 @@ def post_eda():
         
         # Get target distribution
         target_distribution = None
-        if ml_processor.problem_type == 'classification':
-            train_dist = pd.Series(ml_processor.y_train).value_counts(normalize=True)
-            test_dist = pd.Series(ml_processor.y_test).value_counts(normalize=True)
+        if split.problem_type == 'classification':
+            train_dist = pd.Series(split.y_train).value_counts(normalize=True)
+            test_dist = pd.Series(split.y_test).value_counts(normalize=True)
             target_distribution = {
                 'train': {str(k): float(v) for k, v in train_dist.items()},
                 'test': {str(k): float(v) for k, v in test_dist.items()}
@@ -696,18 +1149,18 @@ def post_eda():
         else:
             target_distribution = {
                 'train': {
-                    'mean': float(np.mean(ml_processor.y_train)),
-                    'std': float(np.std(ml_processor.y_train)),
-                    'min': float(np.min(ml_processor.y_train)),
-                    'max': float(np.max(ml_processor.y_train)),
-                    'data': ml_processor.y_train[:1000].tolist()
+                    'mean': float(np.mean(split.y_train)),
+                    'std': float(np.std(split.y_train)),
+                    'min': float(np.min(split.y_train)),
+                    'max': float(np.max(split.y_train)),
+                    'data': split.y_train[:1000].tolist()
                 },
                 'test': {
-                    'mean': float(np.mean(ml_processor.y_test)),
-                    'std': float(np.std(ml_processor.y_test)),
-                    'min': float(np.min(ml_processor.y_test)),
-                    'max': float(np.max(ml_processor.y_test)),
-                    'data': ml_processor.y_test[:1000].tolist()
+                    'mean': float(np.mean(split.y_test)),
+                    'std': float(np.std(split.y_test)),
+                    'min': float(np.min(split.y_test)),
+                    'max': float(np.max(split.y_test)),
+                    'data': split.y_test[:1000].tolist()
                 }
             }
         
@@ -718,7 +1171,7 @@ def post_eda():
                 'feature_importance': feature_importance,
                 'distributions': distributions,
                 'target_distribution': target_distribution,
-                'problem_type': ml_processor.problem_type
+                'problem_type': split.problem_type
             }
         })
         
@@ -731,15 +1184,16 @@ def post_eda():
 
 @app.route('/perform_eda', methods=['POST'])
 def perform_eda():
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload data first.'
             })
             
         # Perform EDA
-        eda_results = ml_processor.perform_eda()
+        eda_results = ws.ml_processor.perform_eda()
         
         # Convert numpy values to native Python types for JSON serialization
         def convert_to_serializable(obj):
@@ -769,15 +1223,24 @@ def perform_eda():
 
 @app.route('/preprocess_data', methods=['POST'])
 def preprocess_data():
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload data first.'
             })
             
         # Preprocess the data
-        preprocessing_results = ml_processor.preprocess_data()
+        options = request.get_json(silent=True) or {}
+        preprocessing_results = ws.ml_processor.preprocess_data(
+            feature_store=_feature_store_for(options),
+            encodings=options.get('encodings'),
+            drop_uninformative=options.get('drop_uninformative', True),
+            keep_columns=options.get('keep_columns'),
+            one_hot=options.get('one_hot', False),
+            precision=options.get('precision', 'float64')
+        )
         
         # Convert numpy values to native Python types
         def convert_to_serializable(obj):
@@ -807,8 +1270,9 @@ def preprocess_data():
 
 @app.route('/set_target', methods=['POST'])
 def set_target():
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
@@ -824,25 +1288,25 @@ def set_target():
             })
 
         # Set target column in MLProcessor
-        ml_processor.set_target(target_column)
+        ws.ml_processor.set_target(target_column)
 
         # Get problem type and basic target analysis
-        target_data = ml_processor.data[target_column]
+        target_data = ws.ml_processor.data[target_column]
         
         target_analysis = {
-            'type': ml_processor.problem_type,
+            'type': ws.ml_processor.problem_type,
             'unique_values': int(target_data.nunique()),
             'missing_values': int(target_data.isnull().sum())
         }
 
         # For classification, add class distribution
-        if ml_processor.problem_type == 'classification':
+        if ws.ml_processor.problem_type == 'classification':
             class_dist = target_data.value_counts().to_dict()
             target_analysis['class_distribution'] = {str(k): int(v) for k, v in class_dist.items()}
 
         return jsonify({
             'status': 'success',
-            'problem_type': ml_processor.problem_type,
+            'problem_type': ws.ml_processor.problem_type,
             'target_analysis': target_analysis
         })
 
@@ -856,8 +1320,9 @@ def set_target():
 
 @app.route('/compare_models', methods=['POST'])
 def compare_models():
+    ws = current_workspace()
     try:
-        if not ml_processor:
+        if not ws.ml_processor:
             return jsonify({
                 'status': 'error',
                 'message': 'Please upload or select a dataset first'
@@ -870,7 +1335,7 @@ def compare_models():
         
         try:
             # Get model comparison
-            comparison = ml_processor.get_model_comparison(model_types)
+            comparison = ws.ml_processor.get_model_comparison(model_types)
             
             # Create comparison plots
             plots = create_comparison_plots(comparison)
@@ -906,6 +1371,7 @@ def create_comparison_plots(comparison):
         }
         
         # Create bar plot for each metric
+        import plotly.graph_objects as go
         common_metrics = set.intersection(*[set(model['metrics'].keys()) for model in comparison.values()])
         
         for metric in common_metrics:
@@ -945,46 +1411,9 @@ def create_comparison_plots(comparison):
 @app.route('/available_datasets')
 def available_datasets():
     try:
-        datasets = {
-            'iris': {
-                'name': 'Iris Dataset',
-                'description': 'Classic flower classification dataset',
-                'type': 'Classification',
-                'features': 4,
-                'samples': 150
-            },
-            'california': {
-                'name': 'California Housing',
-                'description': 'House price prediction dataset',
-                'type': 'Regression',
-                'features': 8,
-                'samples': 20640
-            },
-            'diabetes': {
-                'name': 'Diabetes Dataset',
-                'description': 'Disease progression prediction',
-                'type': 'Regression',
-                'features': 10,
-                'samples': 442
-            },
-            'breast_cancer': {
-                'name': 'Breast Cancer Dataset',
-                'description': 'Cancer diagnosis classification',
-                'type': 'Classification',
-                'features': 30,
-                'samples': 569
-            },
-            'wine': {
-                'name': 'Wine Dataset',
-                'description': 'Wine variety classification',
-                'type': 'Classification',
-                'features': 13,
-                'samples': 178
-            }
-        }
         return jsonify({
             'status': 'success',
-            'datasets': datasets
+            'datasets': example_datasets.available_datasets()
         })
     except Exception as e:
         return jsonify({
@@ -993,20 +1422,26 @@ def available_datasets():
         })
 
 # New Business Intelligence Routes
+def _restore_insights(ws, payload):
+    """Reports and dashboards read the insights from the workspace, so a cached response sets them too"""
+    if ws.business_intelligence is not None and not ws.business_intelligence.insights:
+        ws.business_intelligence.insights = payload['insights']
+
 @app.route('/business_insights', methods=['GET'])
+@cached_by_dataset(on_hit=_restore_insights)
 def get_business_insights():
     """Get automated business insights"""
-    global business_intelligence
+    ws = current_workspace()
     
     try:
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Analyze business metrics
-        insights = business_intelligence.analyze_business_metrics()
+        insights = ws.business_intelligence.analyze_business_metrics()
         
         return jsonify({
             'status': 'success',
@@ -1021,19 +1456,20 @@ def get_business_insights():
         })
 
 @app.route('/dashboard_data', methods=['GET'])
+@cached_by_dataset()
 def get_dashboard_data():
     """Get dashboard data for business intelligence"""
-    global business_intelligence
+    ws = current_workspace()
     
     try:
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Generate dashboard data
-        dashboard_data = business_intelligence.generate_dashboard_data()
+        dashboard_data = ws.business_intelligence.generate_dashboard_data()
         
         return jsonify({
             'status': 'success',
@@ -1050,10 +1486,10 @@ def get_dashboard_data():
 @app.route('/generate_report', methods=['POST'])
 def generate_report():
     """Generate business report"""
-    global business_reporter
+    ws = current_workspace()
     
     try:
-        if business_reporter is None:
+        if ws.business_reporter is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
@@ -1063,12 +1499,12 @@ def generate_report():
         report_type = data.get('report_type', 'executive')
         
         if report_type == 'executive':
-            report = business_reporter.generate_executive_summary()
+            report = ws.business_reporter.generate_executive_summary()
         else:
-            report = business_reporter.generate_detailed_report()
+            report = ws.business_reporter.generate_detailed_report()
         
         # Save report
-        filepath = business_reporter.save_report(report)
+        filepath = ws.business_reporter.save_report(report)
         
         return jsonify({
             'status': 'success',
@@ -1087,10 +1523,10 @@ def generate_report():
 @app.route('/email_report', methods=['POST'])
 def email_report():
     """Generate email report content"""
-    global business_reporter
+    ws = current_workspace()
     
     try:
-        if business_reporter is None:
+        if ws.business_reporter is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
@@ -1101,7 +1537,7 @@ def email_report():
         recipient_email = data.get('email', '')
         
         # Generate email content
-        email_content = business_reporter.generate_email_content(report_type)
+        email_content = ws.business_reporter.generate_email_content(report_type)
         
         return jsonify({
             'status': 'success',
@@ -1120,20 +1556,20 @@ def email_report():
 @app.route('/business_recommendations', methods=['GET'])
 def get_business_recommendations():
     """Get business recommendations"""
-    global business_intelligence
+    ws = current_workspace()
     
     try:
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        recommendations = business_intelligence.recommendations
+        recommendations = ws.business_intelligence.recommendations
         
         return jsonify({
             'status': 'success',
@@ -1150,20 +1586,20 @@ def get_business_recommendations():
 @app.route('/anomaly_analysis', methods=['GET'])
 def get_anomaly_analysis():
     """Get detailed anomaly analysis"""
-    global business_intelligence
+    ws = current_workspace()
     
     try:
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        anomalies = business_intelligence.insights.get('anomaly_detection', {})
+        anomalies = ws.business_intelligence.insights.get('anomaly_detection', {})
         
         return jsonify({
             'status': 'success',
@@ -1180,20 +1616,20 @@ def get_anomaly_analysis():
 @app.route('/trend_analysis', methods=['GET'])
 def get_trend_analysis():
     """Get trend analysis"""
-    global business_intelligence
+    ws = current_workspace()
     
     try:
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        trends = business_intelligence.insights.get('trend_analysis', {})
+        trends = ws.business_intelligence.insights.get('trend_analysis', {})
         
         return jsonify({
             'status': 'success',
@@ -1227,15 +1663,16 @@ def data_trends():
     return render_template('data_trends.html')
 
 @app.route('/data_trends_summary', methods=['GET'])
+@cached_by_dataset()
 def data_trends_summary():
     """Return real visualization data for the currently uploaded dataset.
     Uses the dataset loaded by /upload (ml_processor.data)."""
-    global ml_processor
+    ws = current_workspace()
     try:
-        if ml_processor is None or ml_processor.data is None:
+        if ws.ml_processor is None or ws.ml_processor.data is None:
             return jsonify({'status': 'error', 'message': 'No dataset uploaded yet.'})
 
-        df: pd.DataFrame = ml_processor.data.copy()
+        df: pd.DataFrame = ws.ml_processor.dataset.view()
 
         # Identify columns
         numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
@@ -1322,12 +1759,13 @@ def data_trends_summary():
 # ----------------------------
 
 def _ensure_dataset_loaded():
-    global ml_processor
-    if ml_processor is None or ml_processor.data is None:
+    ws = current_workspace()
+    if ws.ml_processor is None or ws.ml_processor.data is None:
         return None, jsonify({'status': 'error', 'message': 'No dataset uploaded. Use /upload first.'})
-    return ml_processor.data, None
+    return ws.ml_processor.data, None
 
 @app.route('/api/dataset', methods=['GET'])
+@cached_by_dataset()
 def api_dataset_info():
     """Return dataset meta: columns, dtypes, shapes, numeric/categorical lists."""
     df, err = _ensure_dataset_loaded()
@@ -1346,6 +1784,7 @@ def api_dataset_info():
     })
 
 @app.route('/api/visualize/scatter', methods=['GET'])
+@cached_by_dataset()
 def api_vis_scatter():
     df, err = _ensure_dataset_loaded();
     if err: return err
@@ -1363,6 +1802,7 @@ def api_vis_scatter():
     return jsonify({'status':'success','data': {'xName': x, 'yName': y, 'x': sample_df[x].astype(float).tolist(), 'y': sample_df[y].astype(float).tolist()}})
 
 @app.route('/api/visualize/bar', methods=['GET'])
+@cached_by_dataset()
 def api_vis_bar():
     df, err = _ensure_dataset_loaded();
     if err: return err
@@ -1386,11 +1826,13 @@ def api_vis_bar():
     return jsonify({'status':'success','data': {'labels': counts.index.tolist(), 'values': counts.values.tolist(), 'column': column}})
 
 @app.route('/api/visualize/donut', methods=['GET'])
+@cached_by_dataset()
 def api_vis_donut():
     # Same data as bar; client renders donut
     return api_vis_bar()
 
 @app.route('/api/visualize/correlation', methods=['GET'])
+@cached_by_dataset()
 def api_vis_corr():
     df, err = _ensure_dataset_loaded();
     if err: return err
@@ -1401,6 +1843,7 @@ def api_vis_corr():
     return jsonify({'status':'success','data': {'labels': numeric_cols, 'z': c.values.tolist()}})
 
 @app.route('/api/visualize/radar', methods=['GET'])
+@cached_by_dataset()
 def api_vis_radar():
     df, err = _ensure_dataset_loaded();
     if err: return err
@@ -1803,7 +2246,8 @@ def api_gemini_status():
             'initialized': gemini_ai is not None,
             'api_available': getattr(gemini_ai, 'api_available', False),
         }
-        if getattr(gemini_ai, 'model', None):
+        # Reporting the status must not set up (or probe) the model
+        if gemini_ai is not None and gemini_ai.initialized:
             status['model'] = getattr(gemini_ai.model, 'model_name', 'unknown')
         return jsonify({'status': 'success', 'data': status})
     except Exception as e:
@@ -1813,7 +2257,8 @@ def api_gemini_status():
 @app.route('/gemini_analysis', methods=['POST'])
 def gemini_analysis():
     """Get Gemini AI-powered business analysis"""
-    global gemini_ai, business_intelligence
+    global gemini_ai
+    ws = current_workspace()
     
     try:
         if gemini_ai is None:
@@ -1822,18 +2267,18 @@ def gemini_analysis():
                 'message': 'Gemini AI not available. Please set GEMINI_API_KEY environment variable.'
             })
         
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        data_summary = business_intelligence.insights['data_overview']
-        insights = business_intelligence.insights
+        data_summary = ws.business_intelligence.insights['data_overview']
+        insights = ws.business_intelligence.insights
         
         # Get Gemini analysis
         analysis = gemini_ai.analyze_business_data(data_summary, insights)
@@ -1853,7 +2298,8 @@ def gemini_analysis():
 @app.route('/gemini_executive_summary', methods=['POST'])
 def gemini_executive_summary():
     """Generate Gemini AI-powered executive summary"""
-    global gemini_ai, business_intelligence
+    global gemini_ai
+    ws = current_workspace()
     
     try:
         if gemini_ai is None:
@@ -1862,18 +2308,18 @@ def gemini_executive_summary():
                 'message': 'Gemini AI not available. Please set GEMINI_API_KEY environment variable.'
             })
         
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        business_data = business_intelligence.insights['data_overview']
-        metrics = business_intelligence.insights['business_metrics']
+        business_data = ws.business_intelligence.insights['data_overview']
+        metrics = ws.business_intelligence.insights['business_metrics']
         
         # Get Gemini executive summary
         summary = gemini_ai.generate_executive_summary(business_data, metrics)
@@ -1893,7 +2339,8 @@ def gemini_executive_summary():
 @app.route('/gemini_trends', methods=['POST'])
 def gemini_trends():
     """Get Gemini AI-powered trend predictions"""
-    global gemini_ai, business_intelligence
+    global gemini_ai
+    ws = current_workspace()
     
     try:
         if gemini_ai is None:
@@ -1902,18 +2349,18 @@ def gemini_trends():
                 'message': 'Gemini AI not available. Please set GEMINI_API_KEY environment variable.'
             })
         
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
             })
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        historical_data = business_intelligence.data.to_dict('records')[:100]  # Last 100 records
-        current_metrics = business_intelligence.insights['business_metrics']
+        historical_data = ws.business_intelligence.data.to_dict('records')[:100]  # Last 100 records
+        current_metrics = ws.business_intelligence.insights['business_metrics']
         
         # Get Gemini trend predictions
         predictions = gemini_ai.predict_business_trends(historical_data, current_metrics)
@@ -1933,7 +2380,8 @@ def gemini_trends():
 @app.route('/gemini_recommendations', methods=['POST'])
 def gemini_recommendations():
     """Get Gemini AI-powered recommendations"""
-    global gemini_ai, business_intelligence
+    global gemini_ai
+    ws = current_workspace()
     
     try:
         if gemini_ai is None:
@@ -1942,7 +2390,7 @@ def gemini_recommendations():
                 'message': 'Gemini AI not available. Please set GEMINI_API_KEY environment variable.'
             })
         
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
@@ -1952,10 +2400,10 @@ def gemini_recommendations():
         industry_context = data.get('industry_context', 'General Business')
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        business_insights = business_intelligence.insights
+        business_insights = ws.business_intelligence.insights
         
         # Get Gemini recommendations
         recommendations = gemini_ai.generate_ai_recommendations(business_insights, industry_context)
@@ -1975,7 +2423,8 @@ def gemini_recommendations():
 @app.route('/gemini_report', methods=['POST'])
 def gemini_report():
     """Generate Gemini AI-powered report"""
-    global gemini_ai, business_intelligence
+    global gemini_ai
+    ws = current_workspace()
     
     try:
         if gemini_ai is None:
@@ -1984,7 +2433,7 @@ def gemini_report():
                 'message': 'Gemini AI not available. Please set GEMINI_API_KEY environment variable.'
             })
         
-        if business_intelligence is None:
+        if ws.business_intelligence is None:
             return jsonify({
                 'status': 'error',
                 'message': 'No data loaded. Please upload a dataset first.'
@@ -1994,11 +2443,11 @@ def gemini_report():
         report_type = data.get('report_type', 'executive')
         
         # Ensure insights are generated
-        if not business_intelligence.insights:
-            business_intelligence.analyze_business_metrics()
+        if not ws.business_intelligence.insights:
+            ws.business_intelligence.analyze_business_metrics()
         
-        business_data = business_intelligence.insights
-        insights = business_intelligence.recommendations
+        business_data = ws.business_intelligence.insights
+        insights = ws.business_intelligence.recommendations
         
         # Get Gemini report
         report = gemini_ai.create_ai_powered_report(report_type, business_data, insights)
@@ -2018,7 +2467,7 @@ def gemini_report():
 @app.route('/comprehensive_ai_analysis', methods=['POST'])
 def comprehensive_ai_analysis():
     """Comprehensive AI analysis of uploaded data - fully automated"""
-    global most_recent_uploaded_file
+    ws = current_workspace()
     
     try:
         # Get the uploaded file
@@ -2032,99 +2481,21 @@ def comprehensive_ai_analysis():
         if file and allowed_file(file.filename):
             # Save and load the file
             filename = secure_filename(file.filename)
-            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-            file.save(filepath)
-            
-            # Update global variable
-            most_recent_uploaded_file = filepath
-            print(f"📁 File uploaded and tracked: {filename}")
+            filepath, dataset_key, cache_hit = _fingerprint_upload(file)
             
             # Load data
-            data = pd.read_csv(filepath)
-            
-            # Initialize AI and Business Intelligence
-            gemini = GeminiAI()
-            bi = BusinessIntelligence(data)
-            
-            # Run comprehensive analysis
-            print("🤖 Starting Comprehensive AI Analysis...")
-            
-            # 1. Business Intelligence Analysis
-            print("📊 Running Business Intelligence...")
-            bi.analyze_business_metrics()
-            
-            # 2. AI Business Analysis
-            print("🧠 Running AI Business Analysis...")
-            ai_analysis = gemini.analyze_business_data(bi.insights['data_overview'], bi.insights)
-            
-            # 3. AI Executive Summary
-            print("📋 Generating AI Executive Summary...")
-            executive_summary = gemini.generate_executive_summary(bi.insights['data_overview'], bi.insights.get('business_metrics', {}))
-            
-            # 4. AI Trend Predictions
-            print("🔮 Generating AI Trend Predictions...")
-            trend_predictions = gemini.predict_business_trends(bi.insights['data_overview'], bi.insights.get('business_metrics', {}))
-            
-            # 5. AI Recommendations for different industries
-            print("💡 Generating AI Recommendations...")
-            industry_recommendations = {}
-            industries = ['General Business', 'Retail', 'Manufacturing', 'Finance']
-            
-            for industry in industries:
-                recommendations = gemini.generate_ai_recommendations(bi.insights, industry)
-                industry_recommendations[industry] = recommendations
-            
-            # 6. AI Report Generation
-            print("📄 Generating AI Report...")
-            ai_report = gemini.create_ai_powered_report('executive', bi.insights['data_overview'], bi.insights)
-            
-            # 7. Data Insights Summary
-            print("📈 Creating Data Insights Summary...")
-            data_insights = {
-                'dataset_info': {
-                    'filename': filename,
-                    'total_records': len(data),
-                    'total_columns': len(data.columns),
-                    'columns': list(data.columns),
-                    'data_types': data.dtypes.to_dict(),
-                    'missing_values': data.isnull().sum().to_dict(),
-                    'memory_usage': data.memory_usage(deep=True).sum()
-                },
-                'statistical_summary': {
-                    'numeric_summary': data.describe().to_dict() if data.select_dtypes(include=[np.number]).shape[1] > 0 else {},
-                    'categorical_summary': {col: data[col].value_counts().to_dict() for col in data.select_dtypes(include=['object']).columns} if data.select_dtypes(include=['object']).shape[1] > 0 else {}
-                }
-            }
+            if cache_hit:
+                data = dataset_cache.load(dataset_key)
+            else:
+                data, dataset_key, _ = _ingest_stream(file.stream, filepath)
             
-            # Compile comprehensive results
-            comprehensive_results = {
-                'status': 'success',
-                'timestamp': datetime.now().isoformat(),
-                'filename': filename,
-                'data_insights': convert_to_json_serializable(data_insights),
-                'business_intelligence': convert_to_json_serializable(bi.insights),
-                'ai_analysis': convert_to_json_serializable(ai_analysis),
-                'executive_summary': convert_to_json_serializable(executive_summary),
-                'trend_predictions': convert_to_json_serializable(trend_predictions),
-                'industry_recommendations': convert_to_json_serializable(industry_recommendations),
-                'ai_report': convert_to_json_serializable(ai_report),
-                'analysis_summary': {
-                    'total_analyses': 6,
-                    'ai_features_used': [
-                        'Business Intelligence Analysis',
-                        'AI Business Analysis', 
-                        'AI Executive Summary',
-                        'AI Trend Predictions',
-                        'AI Industry Recommendations',
-                        'AI Report Generation'
-                    ],
-                    'industries_analyzed': industries,
-                    'data_quality_score': _calculate_data_quality_score(data),
-                    'ai_confidence_score': _calculate_ai_confidence_score(ai_analysis, executive_summary, trend_predictions)
-                }
-            }
+            # Track the upload in the caller's workspace
+            ws.most_recent_uploaded_file = filepath if not cache_hit else None
+            ws.most_recent_dataset_key = dataset_key
+            print(f"📁 File uploaded and tracked: {filename}")
             
-            print("✅ Comprehensive AI Analysis Completed!")
+            comprehensive_results = _compile_comprehensive_results(
+                data, filename, dict(_comprehensive_analysis_stages(data, filename)))
             
             # Use json.dumps with custom encoder to ensure proper serialization
             try:
@@ -2138,11 +2509,7 @@ def comprehensive_ai_analysis():
                     'timestamp': datetime.now().isoformat(),
                     'filename': filename,
                     'message': 'Analysis completed successfully',
-                    'analysis_summary': {
-                        'total_analyses': 6,
-                        'data_quality_score': _calculate_data_quality_score(data),
-                        'ai_confidence_score': _calculate_ai_confidence_score(ai_analysis, executive_summary, trend_predictions)
-                    }
+                    'analysis_summary': comprehensive_results['analysis_summary']
                 })
             
         else:
@@ -2152,6 +2519,123 @@ def comprehensive_ai_analysis():
         print(f"❌ Error in comprehensive AI analysis: {str(e)}")
         return jsonify({'status': 'error', 'message': f'Analysis failed: {str(e)}'})
 
+COMPREHENSIVE_INDUSTRIES = ['General Business', 'Retail', 'Manufacturing', 'Finance']
+
+def _comprehensive_analysis_stages(data, filename):
+    """Run the comprehensive AI analysis, yielding (stage, result) as soon as each stage is done.
+    Industry recommendations are yielded once per industry, with the results so far."""
+    # Initialize AI and Business Intelligence
+    gemini = GeminiAI()
+    bi = BusinessIntelligence(data)
+
+    app.logger.info("Starting Comprehensive AI Analysis...")
+
+    # 1. Business Intelligence Analysis
+    bi.analyze_business_metrics()
+    yield 'business_intelligence', bi.insights
+
+    # 2. AI Business Analysis
+    yield 'ai_analysis', gemini.analyze_business_data(bi.insights['data_overview'], bi.insights)
+
+    # 3. AI Executive Summary
+    yield 'executive_summary', gemini.generate_executive_summary(bi.insights['data_overview'],
+                                                                 bi.insights.get('business_metrics', {}))
+
+    # 4. AI Trend Predictions
+    yield 'trend_predictions', gemini.predict_business_trends(bi.insights['data_overview'],
+                                                              bi.insights.get('business_metrics', {}))
+
+    # 5. AI Recommendations for different industries
+    industry_recommendations = {}
+    for industry in COMPREHENSIVE_INDUSTRIES:
+        industry_recommendations[industry] = gemini.generate_ai_recommendations(bi.insights, industry)
+        yield 'industry_recommendations', dict(industry_recommendations)
+
+    # 6. AI Report Generation
+    yield 'ai_report', gemini.create_ai_powered_report('executive', bi.insights['data_overview'], bi.insights)
+
+    # 7. Data Insights Summary
+    yield 'data_insights', {
+        'dataset_info': {
+            'filename': filename,
+            'total_records': len(data),
+            'total_columns': len(data.columns),
+            'columns': list(data.columns),
+            'data_types': data.dtypes.to_dict(),
+            'missing_values': data.isnull().sum().to_dict(),
+            'memory_usage': data.memory_usage(deep=True).sum()
+        },
+        'statistical_summary': {
+            'numeric_summary': data.describe().to_dict() if data.select_dtypes(include=[np.number]).shape[1] > 0 else {},
+            'categorical_summary': {col: data[col].value_counts().to_dict() for col in data.select_dtypes(include=['object']).columns} if data.select_dtypes(include=['object']).shape[1] > 0 else {}
+        }
+    }
+    app.logger.info("Comprehensive AI Analysis completed")
+
+def _compile_comprehensive_results(data, filename, stages):
+    """Assemble the full comprehensive analysis response from the results of every stage"""
+    results = {
+        'status': 'success',
+        'timestamp': datetime.now().isoformat(),
+        'filename': filename
+    }
+    for stage in ('data_insights', 'business_intelligence', 'ai_analysis', 'executive_summary',
+                  'trend_predictions', 'industry_recommendations', 'ai_report'):
+        results[stage] = convert_to_json_serializable(stages[stage])
+    results['analysis_summary'] = {
+        'total_analyses': 6,
+        'ai_features_used': [
+            'Business Intelligence Analysis',
+            'AI Business Analysis',
+            'AI Executive Summary',
+            'AI Trend Predictions',
+            'AI Industry Recommendations',
+            'AI Report Generation'
+        ],
+        'industries_analyzed': COMPREHENSIVE_INDUSTRIES,
+        'data_quality_score': _calculate_data_quality_score(data),
+        'ai_confidence_score': _calculate_ai_confidence_score(stages['ai_analysis'], stages['executive_summary'],
+                                                              stages['trend_predictions'])
+    }
+    return results
+
+def _sse_event(event, payload):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(payload, cls=CustomJSONEncoder, default=str)}\n\n"
+
+def _stream_comprehensive_analysis(data, filename):
+    """Run the analysis on a worker thread and relay each stage as an SSE event.
+    While a stage is running, comment lines are sent so proxies keep the connection open."""
+    events = queue.Queue()
+    done = object()
+
+    def run():
+        stages = {}
+        try:
+            for stage, result in _comprehensive_analysis_stages(data, filename):
+                stages[stage] = result
+                events.put(('stage', {'stage': stage, 'completed': len(stages), 'total': 7,
+                                      'result': convert_to_json_serializable(result)}))
+            summary = _compile_comprehensive_results(data, filename, stages)['analysis_summary']
+            events.put(('complete', {'status': 'success', 'filename': filename, 'analysis_summary': summary}))
+        except Exception as e:
+            app.logger.error(f"Error in comprehensive AI analysis stream: {str(e)}")
+            events.put(('error', {'status': 'error', 'message': f'Analysis failed: {str(e)}'}))
+        finally:
+            events.put(done)
+
+    threading.Thread(target=run, name='comprehensive-analysis', daemon=True).start()
+    yield _sse_event('started', {'filename': filename, 'total': 7})
+    while True:
+        try:
+            item = events.get(timeout=app.config['SSE_KEEPALIVE_SECONDS'])
+        except queue.Empty:
+            yield ': keep-alive\n\n'
+            continue
+        if item is done:
+            return
+        yield _sse_event(*item)
+
 def _calculate_data_quality_score(data):
     """Calculate data quality score based on various metrics"""
     try:
@@ -2193,119 +2677,61 @@ def comprehensive_dashboard():
     """Serve the comprehensive AI dashboard"""
     return render_template('comprehensive_ai_dashboard.html')
 
+def _current_analysis_dataset(ws):
+    """Return (data, filename) of the workspace's current dataset, or None if nothing is loaded"""
+    # Check if we have a tracked uploaded file
+    filepath = None
+    if ws.most_recent_dataset_key and dataset_cache.has(ws.most_recent_dataset_key):
+        filename = dataset_cache.metadata(ws.most_recent_dataset_key).get('filename') or 'dataset.csv'
+    elif ws.most_recent_uploaded_file and os.path.exists(ws.most_recent_uploaded_file):
+        filepath = ws.most_recent_uploaded_file
+        filename = os.path.basename(filepath)
+    elif ws.ml_processor is not None and ws.ml_processor.data is not None:
+        # e.g. an example dataset, mapped from its bundled snapshot
+        source = ws.ml_processor.snapshot_source
+        filename = DatasetCache(source[0]).metadata(source[1]).get('filename') if source else None
+        return ws.ml_processor.data, filename or 'dataset.csv'
+    else:
+        # Only the caller's own uploads are considered; other users' files stay private
+        return None
+
+    # Load data
+    if filepath is None:
+        data = dataset_cache.load(ws.most_recent_dataset_key)
+    else:
+        data, _ = _load_cached_dataset(filepath)
+    return data, filename
+
+@app.route('/comprehensive_ai_analysis/stream', methods=['GET'])
+def comprehensive_ai_analysis_stream():
+    """Stream the comprehensive AI analysis of the current dataset as Server-Sent Events:
+    `started`, one `stage` event per finished stage (with its result), then `complete` or `error`."""
+    ws = current_workspace()
+    try:
+        dataset = _current_analysis_dataset(ws)
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': f'Analysis failed: {str(e)}'})
+    if dataset is None:
+        return jsonify({'status': 'error', 'message': 'No dataset loaded. Please upload a file first.'})
+    return Response(_stream_comprehensive_analysis(*dataset), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
 @app.route('/comprehensive_ai_analysis_existing', methods=['POST'])
 def comprehensive_ai_analysis_existing():
     """Comprehensive AI analysis of already uploaded data - fully automated"""
-    global most_recent_uploaded_file
+    ws = current_workspace()
     
     try:
-        # Check if we have a tracked uploaded file
-        if most_recent_uploaded_file and os.path.exists(most_recent_uploaded_file):
-            filepath = most_recent_uploaded_file
-            filename = os.path.basename(filepath)
-            print(f"📁 Using most recently uploaded file: {filename}")
-        else:
-            # Fallback: Get the latest uploaded file from directory
-            upload_folder = app.config['UPLOAD_FOLDER']
-            csv_files = [f for f in os.listdir(upload_folder) if f.endswith('.csv')]
-            if not csv_files:
-                return jsonify({'status': 'error', 'message': 'No CSV files found. Please upload a file first.'})
-            # Use the most recent file by modification time
-            csv_files_with_time = []
-            for f in csv_files:
-                file_path = os.path.join(upload_folder, f)
-                mod_time = os.path.getmtime(file_path)
-                csv_files_with_time.append((f, mod_time))
-            # Sort by modification time (most recent first)
-            csv_files_with_time.sort(key=lambda x: x[1], reverse=True)
-            filename = csv_files_with_time[0][0]
-            filepath = os.path.join(upload_folder, filename)
-            print(f"📁 Using most recently modified file: {filename}")
-
-        # Load data
-        data = pd.read_csv(filepath)
+        dataset = _current_analysis_dataset(ws)
+        if dataset is None:
+            return jsonify({'status': 'error', 'message': 'No dataset loaded. Please upload a file first.'})
+        data, filename = dataset
         print(f"📊 Loaded data: {len(data)} records, {len(data.columns)} columns")
 
-        # Initialize AI and Business Intelligence
-        gemini = GeminiAI()
-        bi = BusinessIntelligence(data)
-
-        # Run comprehensive analysis
-        print("🤖 Starting Comprehensive AI Analysis...")
-
-        # 1. Business Intelligence Analysis
-        print("📊 Running Business Intelligence...")
-        bi.analyze_business_metrics()
-
-        # 2. AI Business Analysis
-        print("🧠 Running AI Business Analysis...")
-        ai_analysis = gemini.analyze_business_data(bi.insights['data_overview'], bi.insights)
-
-        # 3. AI Executive Summary
-        print("📋 Generating AI Executive Summary...")
-        executive_summary = gemini.generate_executive_summary(bi.insights['data_overview'], bi.insights.get('business_metrics', {}))
-
-        # 4. AI Trend Predictions
-        print("🔮 Generating AI Trend Predictions...")
-        trend_predictions = gemini.predict_business_trends(bi.insights['data_overview'], bi.insights.get('business_metrics', {}))
-
-        # 5. AI Recommendations for different industries
-        print("💡 Generating AI Recommendations...")
-        industry_recommendations = {}
-        industries = ['General Business', 'Retail', 'Manufacturing', 'Finance']
-        for industry in industries:
-            recommendations = gemini.generate_ai_recommendations(bi.insights, industry)
-            industry_recommendations[industry] = recommendations
-
-        # 6. AI Report Generation
-        print("📄 Generating AI Report...")
-        ai_report = gemini.create_ai_powered_report('executive', bi.insights['data_overview'], bi.insights)
-
-        # 7. Data Insights Summary
-        print("📈 Creating Data Insights Summary...")
-        data_insights = {
-            'dataset_info': {
-                'filename': filename,
-                'total_records': len(data),
-                'total_columns': len(data.columns),
-                'columns': list(data.columns),
-                'data_types': data.dtypes.to_dict(),
-                'missing_values': data.isnull().sum().to_dict(),
-                'memory_usage': data.memory_usage(deep=True).sum()
-            },
-            'statistical_summary': {
-                'numeric_summary': data.describe().to_dict() if data.select_dtypes(include=[np.number]).shape[1] > 0 else {},
-                'categorical_summary': {col: data[col].value_counts().to_dict() for col in data.select_dtypes(include=['object']).columns} if data.select_dtypes(include=['object']).shape[1] > 0 else {}
-            }
-        }
-
-        # Compile comprehensive results
-        comprehensive_results = {
-            'status': 'success',
-            'timestamp': datetime.now().isoformat(),
-            'filename': filename,
-            'data_insights': convert_to_json_serializable(data_insights),
-            'business_intelligence': convert_to_json_serializable(bi.insights),
-            'ai_analysis': convert_to_json_serializable(ai_analysis),
-            'executive_summary': convert_to_json_serializable(executive_summary),
-            'trend_predictions': convert_to_json_serializable(trend_predictions),
-            'industry_recommendations': convert_to_json_serializable(industry_recommendations),
-            'ai_report': convert_to_json_serializable(ai_report),
-            'analysis_summary': {
-                'total_analyses': 6,
-                'ai_features_used': [
-                    'Business Intelligence Analysis',
-                    'AI Business Analysis', 
-                    'AI Executive Summary',
-                    'AI Trend Predictions',
-                    'AI Industry Recommendations',
-                    'AI Report Generation'
-                ],
-                'industries_analyzed': industries,
-                'data_quality_score': _calculate_data_quality_score(data),
-                'ai_confidence_score': _calculate_ai_confidence_score(ai_analysis, executive_summary, trend_predictions)
-            }
-        }
+        comprehensive_results = _compile_comprehensive_results(
+            data, filename, dict(_comprehensive_analysis_stages(data, filename)))
 
         print("✅ Comprehensive AI Analysis Completed!")
         return jsonify(comprehensive_results)
@@ -1,19 +1,41 @@
 import pandas as pd
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
-from sklearn.cluster import KMeans
 import warnings
+from profiling import DataProfile
 warnings.filterwarnings('ignore')
 
+def _column_anomalies(series):
+    """Fit an IsolationForest to one numeric column (runs in worker processes too)"""
+    series = series.dropna()
+    if len(series) <= 10:
+        return None
+    from sklearn.ensemble import IsolationForest
+    iso_forest = IsolationForest(contamination=0.1, random_state=42)
+    anomalies_detected = iso_forest.fit_predict(series.to_numpy().reshape(-1, 1))
+    
+    anomaly_indices = np.where(anomalies_detected == -1)[0]
+    anomaly_values = series.iloc[anomaly_indices].tolist()
+    
+    return {
+        'anomaly_count': len(anomaly_indices),
+        'anomaly_percentage': (len(anomaly_indices) / len(series)) * 100,
+        'anomaly_values': anomaly_values
+    }
+
 class BusinessIntelligence:
     """
     Automated Business Intelligence module for generating insights,
     detecting anomalies, and providing business recommendations.
+    
+    With a ParallelFrame (see shared_frames.py), per-column models run in
+    worker processes that attach to the dataset in shared memory. Column
+    statistics come from a DataProfile, the dataset version's own when given.
     """
     
-    def __init__(self, data):
+    def __init__(self, data, parallel=None, profile=None):
         self.data = data
+        self.parallel = parallel
+        self.profile = profile if profile is not None else DataProfile(data)
         self.insights = {}
         self.recommendations = []
         
@@ -29,6 +51,12 @@ class BusinessIntelligence:
         
         self.insights = insights
         return insights
+
+    def ensure_insights(self):
+        """The insights, analyzed first if this instance has none yet (e.g. a workspace restored in another worker)"""
+        if not self.insights:
+            self.analyze_business_metrics()
+        return self.insights
     
     def _get_data_overview(self):
         """Get comprehensive data overview"""
@@ -49,11 +77,11 @@ class BusinessIntelligence:
             'total_columns': len(self.data.columns),
             'columns': list(self.data.columns),
             'data_types': data_types,
-            'missing_values': self.data.isnull().sum().to_dict(),
-            'unique_values': {col: self.data[col].nunique() for col in self.data.columns},
+            'missing_values': {col: self.profile[col]['missing'] for col in self.data.columns},
+            'unique_values': {col: self.profile[col]['unique'] for col in self.data.columns},
             'memory_usage': self.data.memory_usage(deep=True).sum(),
-            'numeric_columns': list(self.data.select_dtypes(include=[np.number]).columns),
-            'categorical_columns': list(self.data.select_dtypes(include=['object']).columns),
+            'numeric_columns': self.profile.numeric_columns,
+            'categorical_columns': list(self.data.select_dtypes(include=['object', 'category']).columns),
             'date_columns': list(self.data.select_dtypes(include=['datetime']).columns)
         }
         
@@ -66,18 +94,12 @@ class BusinessIntelligence:
         
         # Add basic statistics for numeric columns
         if overview['numeric_columns']:
-            numeric_stats = self.data[overview['numeric_columns']].describe()
             overview['numeric_stats'] = {}
-            for col in numeric_stats.columns:
+            for col in overview['numeric_columns']:
+                stats = self.profile[col]
                 overview['numeric_stats'][col] = {
-                    'count': float(numeric_stats[col]['count']),
-                    'mean': float(numeric_stats[col]['mean']),
-                    'std': float(numeric_stats[col]['std']),
-                    'min': float(numeric_stats[col]['min']),
-                    '25%': float(numeric_stats[col]['25%']),
-                    '50%': float(numeric_stats[col]['50%']),
-                    '75%': float(numeric_stats[col]['75%']),
-                    'max': float(numeric_stats[col]['max'])
+                    'count': float(stats['count']),
+                    **{name: stats[name] for name in ('mean', 'std', 'min', '25%', '50%', '75%', 'max')}
                 }
         
         return overview
@@ -85,16 +107,16 @@ class BusinessIntelligence:
     def _calculate_business_metrics(self):
         """Calculate business-relevant metrics"""
         metrics = {}
-        numeric_data = self.data.select_dtypes(include=[np.number])
         
-        for col in numeric_data.columns:
+        for col in self.profile.numeric_columns:
+            stats = self.profile[col]
             metrics[col] = {
-                'mean': float(numeric_data[col].mean()),
-                'median': float(numeric_data[col].median()),
-                'std': float(numeric_data[col].std()),
-                'min': float(numeric_data[col].min()),
-                'max': float(numeric_data[col].max()),
-                'growth_rate': self._calculate_growth_rate(numeric_data[col])
+                'mean': stats['mean'],
+                'median': stats['50%'],
+                'std': stats['std'],
+                'min': stats['min'],
+                'max': stats['max'],
+                'growth_rate': self._calculate_growth_rate(self.data[col])
             }
         
         # Calculate business-specific KPIs
@@ -116,24 +138,24 @@ class BusinessIntelligence:
     def _calculate_business_kpis(self):
         """Calculate business-specific KPIs"""
         kpis = {}
-        numeric_data = self.data.select_dtypes(include=[np.number])
+        numeric_columns = self.profile.numeric_columns
         
         # Revenue-related metrics
-        revenue_cols = [col for col in numeric_data.columns if any(keyword in col.lower() 
+        revenue_cols = [col for col in numeric_columns if any(keyword in col.lower() 
                        for keyword in ['revenue', 'sales', 'income', 'profit'])]
         
         if revenue_cols:
-            kpis['total_revenue'] = float(numeric_data[revenue_cols[0]].sum())
-            kpis['avg_revenue'] = float(numeric_data[revenue_cols[0]].mean())
-            kpis['revenue_growth'] = self._calculate_growth_rate(numeric_data[revenue_cols[0]])
+            kpis['total_revenue'] = self.profile[revenue_cols[0]]['sum']
+            kpis['avg_revenue'] = self.profile[revenue_cols[0]]['mean']
+            kpis['revenue_growth'] = self._calculate_growth_rate(self.data[revenue_cols[0]])
         
         # Customer-related metrics
-        customer_cols = [col for col in numeric_data.columns if any(keyword in col.lower() 
+        customer_cols = [col for col in numeric_columns if any(keyword in col.lower() 
                         for keyword in ['customer', 'user', 'client'])]
         
         if customer_cols:
-            kpis['total_customers'] = float(numeric_data[customer_cols[0]].sum())
-            kpis['avg_customers'] = float(numeric_data[customer_cols[0]].mean())
+            kpis['total_customers'] = self.profile[customer_cols[0]]['sum']
+            kpis['avg_customers'] = self.profile[customer_cols[0]]['mean']
         
         return kpis
     
@@ -158,25 +180,14 @@ class BusinessIntelligence:
     
     def _detect_anomalies(self):
         """Detect anomalies in the data"""
-        anomalies = {}
         numeric_data = self.data.select_dtypes(include=[np.number])
         
-        for col in numeric_data.columns:
-            series = numeric_data[col].dropna()
-            if len(series) > 10:
-                iso_forest = IsolationForest(contamination=0.1, random_state=42)
-                anomalies_detected = iso_forest.fit_predict(series.values.reshape(-1, 1))
-                
-                anomaly_indices = np.where(anomalies_detected == -1)[0]
-                anomaly_values = series.iloc[anomaly_indices].tolist()
-                
-                anomalies[col] = {
-                    'anomaly_count': len(anomaly_indices),
-                    'anomaly_percentage': (len(anomaly_indices) / len(series)) * 100,
-                    'anomaly_values': anomaly_values
-                }
+        if self.parallel is not None and len(numeric_data.columns) > 1:
+            results = self.parallel.map_columns(numeric_data, _column_anomalies, list(numeric_data.columns))
+        else:
+            results = {col: _column_anomalies(numeric_data[col]) for col in numeric_data.columns}
         
-        return anomalies
+        return {col: result for col, result in results.items() if result is not None}
     
     def _generate_recommendations(self):
         """Generate business recommendations based on analysis"""
@@ -220,6 +231,7 @@ class BusinessIntelligence:
     
     def generate_dashboard_data(self):
         """Generate data for interactive dashboard"""
+        self.ensure_insights()
         dashboard_data = {
             'kpi_cards': self._generate_kpi_cards(),
             'charts': self._generate_charts(),
@@ -8,12 +8,13 @@ class Config:
     """Application configuration"""
     
     # Flask Configuration
-    SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here'
+    SECRET_KEY = os.environ.get('SECRET_KEY')  # unset: app.py generates one shared by all workers
     DEBUG = os.environ.get('DEBUG', 'True').lower() == 'true'
     
     # File Upload Configuration
     UPLOAD_FOLDER = 'uploads'
-    MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
+    MAX_CONTENT_LENGTH = int(os.environ.get('MAX_UPLOAD_SIZE_MB', 512)) * 1024 * 1024  # max upload size
+    INGEST_CHUNK_SIZE = int(os.environ.get('INGEST_CHUNK_SIZE', 100000))  # rows per parsed CSV block
     
     # Database Configuration
     DATABASE_URL = os.environ.get('DATABASE_URL') or 'sqlite:///app.db'
@@ -32,6 +33,11 @@ class Config:
     REPORTS_DIR = 'reports'
     DEFAULT_REPORT_TYPE = 'executive'
     
+    # Production server (gunicorn) configuration
+    WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', os.cpu_count() or 1))  # worker processes
+    WEB_THREADS = int(os.environ.get('WEB_THREADS', 4))  # request threads per worker
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT', 300))  # seconds before a stuck worker is restarted
+    
     # Security Configuration
     SESSION_COOKIE_SECURE = os.environ.get('SESSION_COOKIE_SECURE', 'False').lower() == 'true'
     SESSION_COOKIE_HTTPONLY = True
@@ -45,9 +51,11 @@ class Config:
         os.makedirs(Config.REPORTS_DIR, exist_ok=True)
         
         # Set Flask configuration
-        app.config['SECRET_KEY'] = Config.SECRET_KEY
+        if Config.SECRET_KEY:
+            app.config['SECRET_KEY'] = Config.SECRET_KEY
         app.config['UPLOAD_FOLDER'] = Config.UPLOAD_FOLDER
         app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+        app.config['INGEST_CHUNK_SIZE'] = Config.INGEST_CHUNK_SIZE
 
 class DevelopmentConfig(Config):
     """Development configuration"""
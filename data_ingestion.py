@@ -0,0 +1,384 @@
+import pandas as pd
+import numpy as np
+from pandas.api.types import union_categoricals
+import hashlib
+import io
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Rows parsed per block when reading CSV files in chunked mode
+DEFAULT_CHUNK_SIZE = 100000
+
+# String columns are stored as 'category' while their distinct values stay under
+# both limits (absolute count and share of the rows read so far)
+CATEGORY_MAX_UNIQUE = 1000
+CATEGORY_MAX_RATIO = 0.5
+
+# Fixed formats tried, in order, on a sample of each string column to detect dates.
+# Ambiguous day/month samples resolve to the first format that parses them all.
+DATE_FORMATS = (
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M',
+    '%d-%m-%Y', '%m-%d-%Y', '%d-%m-%Y %H:%M',
+    '%m/%d/%Y', '%d/%m/%Y', '%Y/%m/%d', '%m/%d/%Y %H:%M', '%d/%m/%Y %H:%M',
+    '%d.%m.%Y', '%d %b %Y', '%b %d, %Y', '%d-%b-%Y', '%Y-%m'
+)
+DATE_SAMPLE_SIZE = 1000
+
+
+class HashingReader(io.RawIOBase):
+    """
+    Read-only binary stream wrapper that hashes (SHA-256) and counts every byte
+    passing through it, optionally copying the bytes to a file as they are read.
+
+    Lets a request body be parsed, fingerprinted and saved in a single pass
+    without ever holding the whole upload in memory.
+    """
+
+    def __init__(self, stream, tee_path=None):
+        self._stream = stream
+        self._digest = hashlib.sha256()
+        self._tee = open(tee_path, 'wb') if tee_path else None
+        self.bytes_read = 0
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        data = self._stream.read(len(buffer))
+        if not data:
+            return 0
+        size = len(data)
+        buffer[:size] = data
+        self._digest.update(data)
+        if self._tee is not None:
+            self._tee.write(data)
+        self.bytes_read += size
+        return size
+
+    def drain(self, block_size=1024 * 1024):
+        """Consume whatever the parser left unread so the hash covers the full stream"""
+        buffer = bytearray(block_size)
+        while self.readinto(buffer):
+            pass
+
+    def hexdigest(self):
+        return self._digest.hexdigest()
+
+    def close(self):
+        if self._tee is not None:
+            self._tee.close()
+            self._tee = None
+        super().close()
+
+
+def _is_string_column(series):
+    """Check whether a column holds plain (non-categorical) strings"""
+    return (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)) \
+        and not isinstance(series.dtype, pd.CategoricalDtype)
+
+
+def downcast_numeric(frame, downcast_floats=True):
+    """Downcast numeric columns in place to the narrowest dtype holding their values"""
+    downcasted = {}
+    for col in frame.columns:
+        dtype = frame[col].dtype
+        if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+            continue
+        if pd.api.types.is_integer_dtype(dtype):
+            frame[col] = pd.to_numeric(frame[col], downcast='integer')
+        elif pd.api.types.is_float_dtype(dtype) and downcast_floats:
+            frame[col] = pd.to_numeric(frame[col], downcast='float')
+        if frame[col].dtype != dtype:
+            downcasted[col] = str(frame[col].dtype)
+    return downcasted
+
+
+def detect_date_format(series, sample_size=DATE_SAMPLE_SIZE):
+    """Return the fixed format that parses a sample of a string column, or None"""
+    sample = pd.Series(series.dropna().unique()[:sample_size]).astype(str)
+    if sample.empty or not sample.str.contains(r'\d', regex=True).all():
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            pd.to_datetime(sample, format=fmt)
+            return fmt
+        except (ValueError, TypeError):
+            continue
+    return None
+
+
+def detect_date_columns(frame):
+    """Map each string column that holds dates to its detected format"""
+    formats = {}
+    for col in frame.columns:
+        if _is_string_column(frame[col]):
+            fmt = detect_date_format(frame[col])
+            if fmt:
+                formats[col] = fmt
+    return formats
+
+
+def _parse_date_column(series, fmt):
+    """Vectorised parse with a fixed format; None if any non-null value does not match"""
+    parsed = pd.to_datetime(series, format=fmt, errors='coerce', cache=True)
+    if parsed.isna().sum() > series.isna().sum():
+        return None
+    return parsed
+
+
+def parse_date_columns(frame):
+    """Detect date columns and convert them in place; returns {column: format}"""
+    formats = {}
+    for col, fmt in detect_date_columns(frame).items():
+        parsed = _parse_date_column(frame[col], fmt)
+        if parsed is not None:
+            frame[col] = parsed
+            formats[col] = fmt
+    return formats
+
+
+BLOCK_OPTIONS = ('downcast_floats', 'category_max_unique', 'category_max_ratio', 'detect_dates')
+
+
+def _combine_column(parts):
+    """Concatenate the per-chunk pieces of one column, merging categories where possible"""
+    if len(parts) == 1:
+        return parts[0]
+    if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+        return pd.Series(union_categoricals(parts, ignore_order=True), name=parts[0].name)
+    if any(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+        parts = [part.astype(object) if isinstance(part.dtype, pd.CategoricalDtype) else part for part in parts]
+    return pd.concat(parts, ignore_index=True)
+
+
+def read_csv_chunked(source, chunksize=None, progress=None, **read_csv_kwargs):
+    """Read a CSV file (path or binary stream) in bounded blocks, shrinking dtypes while it reads.
+    Keyword arguments of read_blocks are accepted; the rest go to pd.read_csv."""
+    options = {name: read_csv_kwargs.pop(name) for name in BLOCK_OPTIONS if name in read_csv_kwargs}
+    chunksize = chunksize or DEFAULT_CHUNK_SIZE
+    reader = pd.read_csv(source, chunksize=chunksize, **read_csv_kwargs)
+    return read_blocks(reader, chunksize=chunksize, progress=progress, **options)
+
+
+def read_blocks(blocks, chunksize=None, downcast_floats=True,
+                category_max_unique=CATEGORY_MAX_UNIQUE,
+                category_max_ratio=CATEGORY_MAX_RATIO, detect_dates=True, progress=None):
+    """Assemble a DataFrame from an iterable of blocks, shrinking dtypes as they arrive.
+
+    Every block is downcast to the narrowest numeric dtypes and low-cardinality
+    string columns are converted to 'category' before the next block is parsed,
+    so only one block is ever held at its default (wide) dtypes.
+
+    With detect_dates, the date format of each string column is inferred once
+    from the first block and every block is parsed with that fixed format.
+
+    If given, `progress` is called with the number of rows parsed so far after
+    every block.
+
+    Returns a tuple of (DataFrame, stats) where stats reports the parse time,
+    the memory before and after optimisation and the estimated peak memory.
+    """
+    start = time.perf_counter()
+
+    columns = None
+    parts = {}
+    seen_values = {}
+    non_categorical = set()
+    downcasted = {}
+    date_formats = None
+    rows = 0
+    chunks = 0
+    raw_bytes = 0
+    retained_bytes = 0
+    peak_bytes = 0
+    first_chunk_seconds = None
+
+    try:
+        for chunk in blocks:
+            if first_chunk_seconds is None:
+                first_chunk_seconds = round(time.perf_counter() - start, 4)
+            chunk_raw_bytes = int(chunk.memory_usage(deep=True).sum())
+            raw_bytes += chunk_raw_bytes
+            rows += len(chunk)
+            chunks += 1
+
+            if columns is None:
+                columns = list(chunk.columns)
+                parts = {col: [] for col in columns}
+                date_formats = detect_date_columns(chunk) if detect_dates else {}
+
+            for col, fmt in list(date_formats.items()):
+                parsed = _parse_date_column(chunk[col], fmt)
+                if parsed is None:
+                    # A later block does not match the format: keep the column as text
+                    del date_formats[col]
+                    parts[col] = [part.dt.strftime(fmt) for part in parts[col]]
+                    non_categorical.add(col)
+                else:
+                    chunk[col] = parsed
+
+            downcasted.update(downcast_numeric(chunk, downcast_floats=downcast_floats))
+
+            for col in columns:
+                series = chunk[col]
+                if not _is_string_column(series) or col in non_categorical:
+                    continue
+                values = seen_values.setdefault(col, set())
+                values.update(series.dropna().unique())
+                if len(values) > category_max_unique or len(values) > category_max_ratio * rows:
+                    non_categorical.add(col)
+                    seen_values.pop(col, None)
+                    continue
+                chunk[col] = series.astype('category')
+
+            for col in columns:
+                parts[col].append(chunk[col].reset_index(drop=True))
+
+            chunk_bytes = int(chunk.memory_usage(deep=True).sum())
+            peak_bytes = max(peak_bytes, retained_bytes + chunk_raw_bytes + chunk_bytes)
+            retained_bytes += chunk_bytes
+            if progress is not None:
+                progress(rows)
+    finally:
+        close = getattr(blocks, 'close', None)
+        if close:
+            close()
+
+    if columns is None:
+        raise ValueError("The uploaded file contains no data")
+
+    # Stitching the blocks together briefly holds the parts and the result
+    peak_bytes = max(peak_bytes, retained_bytes * 2)
+    data = pd.DataFrame({col: _combine_column(parts.pop(col)) for col in columns})
+    downcasted.update(downcast_numeric(data, downcast_floats=downcast_floats))
+
+    category_columns = [col for col in columns if isinstance(data[col].dtype, pd.CategoricalDtype)]
+    memory_bytes = int(data.memory_usage(deep=True).sum())
+    stats = {
+        'mode': 'chunked',
+        'rows': rows,
+        'columns': len(columns),
+        'chunks': chunks,
+        'chunksize': chunksize,
+        'parse_seconds': round(time.perf_counter() - start, 4),
+        'first_chunk_seconds': first_chunk_seconds,
+        'raw_memory_bytes': raw_bytes,
+        'memory_bytes': memory_bytes,
+        'peak_memory_bytes': max(peak_bytes, memory_bytes),
+        'memory_reduction_pct': round((1 - memory_bytes / raw_bytes) * 100, 1) if raw_bytes else 0.0,
+        'downcast_columns': {col: str(data[col].dtype) for col in downcasted if col in data.columns},
+        'category_columns': category_columns,
+        'date_columns': date_formats
+    }
+    logger.info(f"Chunked load: {rows} rows in {chunks} chunks, "
+                f"{raw_bytes / 1e6:.1f}MB -> {memory_bytes / 1e6:.1f}MB in {stats['parse_seconds']}s")
+    return data, stats
+
+
+# File name suffix -> (format, compression); the longest matching suffix wins
+FILE_FORMATS = {
+    '.csv': ('csv', None),
+    '.csv.gz': ('csv', 'gzip'),
+    '.gz': ('csv', 'gzip'),
+    '.csv.zst': ('csv', 'zstd'),
+    '.zst': ('csv', 'zstd'),
+    '.zip': ('csv', 'zip'),
+    '.xlsx': ('xlsx', None),
+    '.xls': ('xls', None),
+    '.parquet': ('parquet', None),
+    '.pq': ('parquet', None)
+}
+
+
+def detect_format(filename):
+    """Return (format, compression) for a file name, or None if it is not supported"""
+    name = (filename or '').lower()
+    for suffix in sorted(FILE_FORMATS, key=len, reverse=True):
+        if name.endswith(suffix):
+            return FILE_FORMATS[suffix]
+    return None
+
+
+def needs_random_access(filename):
+    """Zip archives, Excel workbooks and Parquet files cannot be parsed from a one-pass stream"""
+    file_format = detect_format(filename)
+    return file_format is not None and (file_format[0] != 'csv' or file_format[1] == 'zip')
+
+
+def _excel_blocks(source, chunksize):
+    """Yield blocks of rows from an .xlsx workbook read sheet by sheet in read-only (streaming) mode.
+    Sheets whose header differs from the first sheet's are skipped."""
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        header = None
+        for sheet in workbook.worksheets:
+            rows = sheet.iter_rows(values_only=True)
+            sheet_header = next(rows, None)
+            if sheet_header is None:
+                continue
+            sheet_header = [str(value) if value is not None else f'Unnamed: {i}'
+                            for i, value in enumerate(sheet_header)]
+            if header is None:
+                header = sheet_header
+            elif sheet_header != header:
+                logger.info(f"Skipping sheet '{sheet.title}': its columns differ from the first sheet")
+                continue
+
+            width = len(header)
+            block = []
+            for row in rows:
+                if all(value is None for value in row):
+                    continue
+                block.append(tuple(row[:width]) + (None,) * (width - len(row)))
+                if len(block) >= chunksize:
+                    yield pd.DataFrame.from_records(block, columns=header)
+                    block = []
+            if block:
+                yield pd.DataFrame.from_records(block, columns=header)
+    finally:
+        workbook.close()
+
+
+def _parquet_blocks(source, chunksize):
+    """Yield record batches of a Parquet file as DataFrames"""
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def read_tabular(source, filename, chunksize=None, progress=None, **options):
+    """Read any supported file through its fastest block reader into a compact DataFrame.
+
+    `source` is a path or binary stream; `filename` selects the format. Plain,
+    gzip and zstd CSV can be read from a one-pass stream, while zip, Excel and
+    Parquet need a path or seekable file (see needs_random_access).
+    Returns (DataFrame, stats) like read_csv_chunked, with stats['format'] added.
+    """
+    file_format = detect_format(filename)
+    if file_format is None:
+        raise ValueError("Unsupported file format. Please use CSV (optionally gzip/zip/zstd compressed), "
+                         "Excel or Parquet files.")
+    kind, compression = file_format
+    chunksize = chunksize or DEFAULT_CHUNK_SIZE
+
+    if kind == 'csv':
+        data, stats = read_csv_chunked(source, chunksize=chunksize, progress=progress,
+                                       compression=compression, **options)
+    elif kind == 'xlsx':
+        data, stats = read_blocks(_excel_blocks(source, chunksize), chunksize=chunksize,
+                                  progress=progress, **options)
+    elif kind == 'xls':
+        # Legacy workbooks have no streaming reader
+        data, stats = read_blocks(iter([pd.read_excel(source)]), chunksize=chunksize,
+                                  progress=progress, **options)
+    else:
+        data, stats = read_blocks(_parquet_blocks(source, chunksize), chunksize=chunksize,
+                                  progress=progress, **options)
+
+    stats['format'] = f'{kind}+{compression}' if compression else kind
+    return data, stats
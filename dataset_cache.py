@@ -0,0 +1,126 @@
+import pandas as pd
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+class DatasetCache:
+    """
+    Content-addressed store of parsed datasets.
+
+    Each dataset is written once as an uncompressed Arrow IPC (Feather v2) snapshot
+    named after the SHA-256 of its source content. Loading a snapshot memory-maps
+    the file instead of re-parsing text, and identical uploads resolve to the same
+    key so they skip both the parse and the write.
+    """
+
+    SNAPSHOT_SUFFIX = '.feather'
+    METADATA_SUFFIX = '.json'
+
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def fingerprint_file(path):
+        """Hash a file on disk without reading it into memory at once"""
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint_stream(stream):
+        """Hash a seekable binary stream and rewind it for the next reader"""
+        digest = hashlib.sha256()
+        stream.seek(0)
+        for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+        stream.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def fingerprint_frame(data):
+        """Hash the contents of an in-memory DataFrame (values, column names and dtypes)"""
+        digest = hashlib.sha256()
+        digest.update(json.dumps([[str(col), str(dtype)] for col, dtype in data.dtypes.items()]).encode('utf-8'))
+        digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def snapshot_path(self, key):
+        return os.path.join(self.cache_dir, key + self.SNAPSHOT_SUFFIX)
+
+    def _metadata_path(self, key):
+        return os.path.join(self.cache_dir, key + self.METADATA_SUFFIX)
+
+    def has(self, key):
+        """Check whether a snapshot exists for the given key"""
+        return bool(key) and os.path.exists(self.snapshot_path(key))
+
+    def metadata(self, key):
+        """Return the metadata recorded alongside a snapshot"""
+        try:
+            with open(self._metadata_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception:
+            return {}
+
+    def load(self, key):
+        """Memory-map a snapshot and return it as a DataFrame"""
+        from pyarrow import feather
+
+        start = time.perf_counter()
+        table = feather.read_table(self.snapshot_path(key), memory_map=True)
+        # split_blocks keeps one block per column so numeric columns stay views of the mapping
+        data = table.to_pandas(split_blocks=True)
+        logger.info(f"Loaded snapshot {key[:12]} ({len(data)} rows) in {time.perf_counter() - start:.4f}s")
+        return data
+
+    def store(self, key, data, filename=None, **metadata):
+        """Write a DataFrame snapshot under the given key; returns False if it cannot be cached.
+        Extra keyword arguments are recorded in the snapshot's metadata."""
+        if self.has(key):
+            return True
+        try:
+            from pyarrow import feather
+
+            if not all(isinstance(col, str) for col in data.columns):
+                raise ValueError("Snapshot columns must be strings")
+            path = self.snapshot_path(key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            feather.write_feather(data.reset_index(drop=True), tmp_path, compression='uncompressed')
+
+            # Metadata goes first so a visible snapshot always has it
+            with open(self._metadata_path(key), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'filename': filename,
+                    'rows': int(len(data)),
+                    'columns': [str(col) for col in data.columns],
+                    'created': datetime.now().isoformat(),
+                    **metadata
+                }, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, path)
+            return True
+        except Exception as e:
+            logger.warning(f"Could not cache dataset snapshot: {str(e)}")
+            if 'tmp_path' in locals() and os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return False
+
+    def load_or_parse(self, path, parser, key=None):
+        """Return (data, key, hit) for a file, parsing it with `parser` only on a cache miss"""
+        key = key or self.fingerprint_file(path)
+        if self.has(key):
+            return self.load(key), key, True
+        data = parser(path)
+        self.store(key, data, filename=os.path.basename(path))
+        return data, key, False
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Registry of the bundled example datasets.
+
+Examples are served from Arrow snapshots under datasets/snapshots, so loading one
+memory-maps a local file: no CSV round trip and no network access. Most snapshots
+are committed; those whose source is downloaded (California Housing) are built at
+deploy time by render-build.sh, or on first load if that step could not fetch them.
+Run this module to (re)build the snapshots, e.g. after adding an entry below, or
+with --missing to build only the ones not present yet.
+"""
+
+import os
+import sys
+import logging
+import pandas as pd
+from dataset_cache import DatasetCache
+
+logger = logging.getLogger(__name__)
+
+DATASETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'datasets')
+SNAPSHOT_DIR = os.path.join(DATASETS_DIR, 'snapshots')
+
+# name -> description shown in the UI plus where the data comes from when building snapshots
+EXAMPLE_DATASETS = {
+    'iris': {
+        'name': 'Iris Dataset',
+        'description': 'Classic flower classification dataset',
+        'type': 'Classification',
+        'source': ('sklearn', 'load_iris')
+    },
+    'california': {
+        'name': 'California Housing',
+        'description': 'House price prediction dataset',
+        'type': 'Regression',
+        'source': ('sklearn', 'fetch_california_housing'),
+        # Shown until the snapshot has been built
+        'features': 8,
+        'samples': 20640
+    },
+    'diabetes': {
+        'name': 'Diabetes Dataset',
+        'description': 'Disease progression prediction',
+        'type': 'Regression',
+        'source': ('sklearn', 'load_diabetes')
+    },
+    'breast_cancer': {
+        'name': 'Breast Cancer Dataset',
+        'description': 'Cancer diagnosis classification',
+        'type': 'Classification',
+        'source': ('sklearn', 'load_breast_cancer')
+    },
+    'wine': {
+        'name': 'Wine Dataset',
+        'description': 'Wine variety classification',
+        'type': 'Classification',
+        'source': ('sklearn', 'load_wine')
+    },
+    'boston_housing': {
+        'name': 'Boston Housing',
+        'description': 'Median home value prediction',
+        'type': 'Regression',
+        'source': ('csv', 'BostonHousing.csv')
+    },
+    'walmart_sales': {
+        'name': 'Walmart Sales',
+        'description': 'Weekly store sales with economic indicators',
+        'type': 'Regression',
+        'source': ('csv', 'Walmart_Sales.csv')
+    },
+    'marketing_performance': {
+        'name': 'Marketing & Product Performance',
+        'description': 'Campaign spend, conversions and revenue',
+        'type': 'Regression',
+        'source': ('csv', 'marketing_and_product_performance.csv')
+    }
+}
+
+snapshots = DatasetCache(SNAPSHOT_DIR)
+
+
+def _build_frame(name):
+    """Build the DataFrame for an example dataset from its original source;
+    returns (data, {date column: format it was parsed with})"""
+    kind, source = EXAMPLE_DATASETS[name]['source']
+    if kind == 'csv':
+        from data_ingestion import read_csv_chunked
+        data, stats = read_csv_chunked(os.path.join(DATASETS_DIR, source))
+        return data, stats.get('date_columns') or {}
+
+    import sklearn.datasets
+    bunch = getattr(sklearn.datasets, source)()
+    data = pd.DataFrame(bunch.data, columns=bunch.feature_names)
+    if hasattr(bunch, 'target'):
+        data['target'] = bunch.target
+    return data, {}
+
+
+def materialize(name, force=False):
+    """Write the snapshot for one example dataset; returns its metadata"""
+    if name not in EXAMPLE_DATASETS:
+        raise ValueError(f"Unknown example dataset: {name}")
+    if force and snapshots.has(name):
+        os.remove(snapshots.snapshot_path(name))
+    if not snapshots.has(name):
+        data, date_formats = _build_frame(name)
+        if not snapshots.store(name, data, filename=f'{name}.csv', date_formats=date_formats,
+                               fingerprint=DatasetCache.fingerprint_frame(data)):
+            raise RuntimeError(f"Could not write snapshot for {name}")
+        logger.info(f"Materialized example dataset {name}: {data.shape}")
+    return snapshots.metadata(name)
+
+
+def is_available(name):
+    """Check whether an example dataset exists and has a snapshot built"""
+    return name in EXAMPLE_DATASETS and snapshots.has(name)
+
+
+def available_datasets():
+    """Describe the example datasets that can be loaded"""
+    datasets = {}
+    for key, info in EXAMPLE_DATASETS.items():
+        if snapshots.has(key):
+            metadata = snapshots.metadata(key)
+            features = max(len(metadata.get('columns', [])) - 1, 0)
+            samples = metadata.get('rows', 0)
+        else:
+            features, samples = info.get('features', 0), info.get('samples', 0)
+        datasets[key] = {
+            'name': info['name'],
+            'description': info['description'],
+            'type': info['type'],
+            'features': features,
+            'samples': samples
+        }
+    return datasets
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    args = sys.argv[1:]
+    missing_only = '--missing' in args
+    names = [arg for arg in args if arg != '--missing'] or list(EXAMPLE_DATASETS)
+    failed = []
+    for dataset in names:
+        try:
+            meta = materialize(dataset, force=not missing_only)
+            print(f"{dataset}: {meta['rows']} rows, {len(meta['columns'])} columns")
+        except Exception as e:
+            logger.error(f"Could not materialize {dataset}: {str(e)}")
+            failed.append(dataset)
+    sys.exit(1 if failed else 0)
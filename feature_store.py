@@ -0,0 +1,101 @@
+import numpy as np
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class FeatureStore:
+    """
+    On-disk store for preprocessed train/test matrices.
+
+    Each split is written once as contiguous .npy files and reopened with
+    np.load(mmap_mode='r'), so every trainer, CV call and joblib worker reading
+    the split shares the same page-cache pages instead of holding its own copy.
+    """
+
+    ARRAY_NAMES = ('X_train', 'X_test', 'y_train', 'y_test')
+
+    def __init__(self, store_dir):
+        self.store_dir = store_dir
+        os.makedirs(self.store_dir, exist_ok=True)
+
+    @staticmethod
+    def make_key(fingerprint, target, **config):
+        """Build a stable key for a split from the dataset fingerprint, target and preprocessing config"""
+        payload = json.dumps({'fingerprint': fingerprint, 'target': target, 'config': config},
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _array_path(self, key, name):
+        return os.path.join(self.store_dir, key, f'{name}.npy')
+
+    def _classes_path(self, key, name):
+        return os.path.join(self.store_dir, key, f'{name}.classes.npy')
+
+    @staticmethod
+    def _write(path, values, allow_pickle=False):
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, values, allow_pickle=allow_pickle)
+        os.replace(tmp_path, path)
+
+    def has(self, key):
+        """Check whether every array of a split is present"""
+        return all(os.path.exists(self._array_path(key, name)) for name in self.ARRAY_NAMES)
+
+    def save(self, key, **arrays):
+        """Write the arrays of a split (skipping ones already on disk) and return them memory-mapped.
+
+        Object arrays (e.g. string labels) are stored label-encoded, as integer codes
+        plus their classes, and come back decoded into memory. Raises TypeError for
+        object arrays whose values cannot be ordered (mixed types).
+        """
+        os.makedirs(os.path.join(self.store_dir, key), exist_ok=True)
+        mapped = {}
+        for name, values in arrays.items():
+            values = np.asarray(values)
+            path = self._array_path(key, name)
+            if values.dtype == object:
+                if not os.path.exists(path):
+                    classes, codes = np.unique(values, return_inverse=True)
+                    # The classes go first: the codes file is what has() looks for
+                    self._write(self._classes_path(key, name), classes, allow_pickle=True)
+                    self._write(path, codes.reshape(values.shape).astype(np.min_scalar_type(len(classes))))
+            elif not os.path.exists(path):
+                self._write(path, np.ascontiguousarray(values))
+            mapped[name] = self._load_array(key, name)
+        logger.info(f"Feature store split {key[:12]} ready: " +
+                    ", ".join(f"{name}{tuple(arr.shape)}" for name, arr in mapped.items()))
+        return mapped
+
+    def load(self, key):
+        """Reopen a stored split memory-mapped; label-encoded arrays are decoded into memory"""
+        return {name: self._load_array(key, name) for name in self.ARRAY_NAMES}
+
+    def _load_array(self, key, name):
+        values = np.load(self._array_path(key, name), mmap_mode='r')
+        classes_path = self._classes_path(key, name)
+        if os.path.exists(classes_path):
+            values = np.load(classes_path, allow_pickle=True)[values]
+        return values
+
+    def save_object(self, key, name, obj):
+        """Store a small fitted object (e.g. the preprocessing pipeline) next to a split's arrays"""
+        import joblib
+
+        os.makedirs(os.path.join(self.store_dir, key), exist_ok=True)
+        path = os.path.join(self.store_dir, key, f'{name}.joblib')
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        joblib.dump(obj, tmp_path)
+        os.replace(tmp_path, path)
+
+    def load_object(self, key, name):
+        """Load an object stored with save_object(), or None if there is none"""
+        import joblib
+
+        path = os.path.join(self.store_dir, key, f'{name}.joblib')
+        return joblib.load(path) if os.path.exists(path) else None
@@ -1,4 +1,3 @@
-import google.generativeai as genai
 import pandas as pd
 import json
 import os
@@ -12,9 +11,13 @@ import re
 class GeminiAI:
     """
     Gemini AI integration for advanced business intelligence.
+    
+    Construction is cheap and offline: the Gemini SDK is imported and a model
+    chosen on first use of `model`. Live test calls to pick the first working
+    model only happen with probe=True (or GEMINI_PROBE_MODELS=true).
     """
     
-    def __init__(self, api_key=None):
+    def __init__(self, api_key=None, probe=None):
         """Initialize Gemini AI with API key"""
         self.api_key = api_key or os.environ.get('GEMINI_API_KEY')
         if not self.api_key:
@@ -23,8 +26,9 @@ class GeminiAI:
         # Set up logging first
         self.logger = logging.getLogger(__name__)
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
+        if probe is None:
+            probe = os.environ.get('GEMINI_PROBE_MODELS', 'False').lower() == 'true'
+        self.probe = probe
         
         # Try different models in order of preference
         self.models = [
@@ -34,9 +38,19 @@ class GeminiAI:
             'gemini-2.0-flash-lite'  # Lightweight
         ]
         
-        self.model = None
+        self._model = None
         self.api_available = False
-        self._initialize_model()
+    
+    @property
+    def model(self):
+        """The Gemini model, set up on first use"""
+        if self._model is None:
+            self._initialize_model()
+        return self._model
+    
+    @property
+    def initialized(self):
+        return self._model is not None
     
     def _convert_to_json_serializable(self, obj):
         """Convert numpy types to JSON serializable types"""
@@ -57,11 +71,24 @@ class GeminiAI:
     
     def _initialize_model(self):
         """Initialize the best available model"""
+        import google.generativeai as genai
+        
+        # Configure Gemini
+        genai.configure(api_key=self.api_key)
+        
+        if not self.probe:
+            # Use the preferred model; failed calls fall back to demo mode via _retry_with_backoff
+            self._model = genai.GenerativeModel(self.models[0])
+            self.api_available = True
+            self.logger.info(f"Using model {self.models[0]} (not probed)")
+            return
+        
         for model_name in self.models:
             try:
-                self.model = genai.GenerativeModel(model_name)
+                model = genai.GenerativeModel(model_name)
                 # Test the model with a simple request
-                response = self.model.generate_content("Test")
+                response = model.generate_content("Test")
+                self._model = model
                 self.logger.info(f"Successfully initialized model: {model_name}")
                 self.api_available = True
                 return
@@ -70,8 +97,8 @@ class GeminiAI:
                 continue
         
         # If all models fail, use the first one as fallback
-        if not self.model:
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
+        if not self._model:
+            self._model = genai.GenerativeModel('gemini-1.5-flash')
             self.logger.warning("Using fallback model: gemini-1.5-flash")
             self.api_available = False
     
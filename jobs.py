@@ -0,0 +1,357 @@
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+
+class JobCancelled(Exception):
+    """Raised by a job function when it notices that cancellation was requested"""
+
+
+class JobProgress:
+    """
+    Progress/cancellation handle passed to functions running in the process pool.
+
+    Backed by a multiprocessing.Manager dict shared with the web process, so it
+    can be pickled into the worker while /jobs/<id> reads the same state.
+    """
+
+    def __init__(self, state):
+        self._state = state
+
+    def update(self, stage=None, partial=None, **fields):
+        changes = dict(fields)
+        if stage is not None:
+            changes['stage'] = stage
+        if partial is not None:
+            changes['partial'] = partial
+        self._state.update(changes)
+
+    def cancelled(self):
+        return bool(self._state.get('cancel'))
+
+
+def _run_in_process(func, progress, args, kwargs):
+    """Process-pool entry point: mark the job running, then call func(progress, *args, **kwargs)"""
+    progress.update(status='running', started=time.time())
+    return func(progress, *args, **kwargs)
+
+
+class Job:
+    """State of one background job, updated by the worker and read by /jobs/<id>"""
+
+    def __init__(self, kind, total_bytes=None, owner=None):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        # Key of the workspace that submitted the job; only it may see or cancel the job
+        self.owner = owner
+        self.status = 'queued'
+        self.stage = 'queued'
+        self.rows_processed = 0
+        self.bytes_processed = 0
+        self.total_bytes = total_bytes
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self.result = None
+        self.partial = None
+        self.error = None
+        self.cancel_requested = False
+        # Set for process-pool jobs: shared state dict and the pool future
+        self._state = None
+        self._future = None
+
+    def update(self, stage=None, rows=None, bytes_processed=None, partial=None):
+        """Record progress from the worker"""
+        if stage is not None:
+            self.stage = stage
+        if rows is not None:
+            self.rows_processed = int(rows)
+        if bytes_processed is not None:
+            self.bytes_processed = int(bytes_processed)
+        if partial is not None:
+            self.partial = partial
+
+    def cancelled(self):
+        """Check whether cancellation was requested (for cooperative job functions)"""
+        return self.cancel_requested
+
+    def cancel(self):
+        """Request cancellation; a job that has not started yet is cancelled at once"""
+        if self.status not in ('queued', 'running'):
+            return False
+        self.cancel_requested = True
+        if self._state is not None:
+            self._state['cancel'] = True
+        if self._future is not None and self._future.cancel():
+            self.status = self.stage = 'cancelled'
+            self.finished = time.time()
+        return True
+
+    def _sync(self):
+        """Pull progress reported by a process-pool worker"""
+        if self._state is None or self.finished:
+            return
+        try:
+            state = dict(self._state)
+        except Exception:
+            return
+        if state.get('status') == 'running' and self.status == 'queued':
+            self.status = 'running'
+            self.started = state.get('started')
+        self.stage = state.get('stage', self.stage)
+        self.partial = state.get('partial', self.partial)
+
+    def progress(self):
+        """Fraction of the input consumed so far, if the input size is known"""
+        if self.status == 'completed':
+            return 1.0
+        if not self.total_bytes:
+            return None
+        return min(self.bytes_processed / self.total_bytes, 1.0)
+
+    def eta_seconds(self):
+        """Estimate remaining time by extrapolating the throughput so far"""
+        progress = self.progress()
+        if self.status != 'running' or not progress or self.started is None:
+            return None
+        elapsed = time.time() - self.started
+        return round(elapsed / progress * (1 - progress), 1)
+
+    def to_dict(self):
+        self._sync()
+        progress = self.progress()
+        end = self.finished or time.time()
+        return {
+            'id': self.id,
+            'kind': self.kind,
+            'status': self.status,
+            'stage': self.stage,
+            'rows_processed': self.rows_processed,
+            'bytes_processed': self.bytes_processed,
+            'total_bytes': self.total_bytes,
+            'progress': round(progress * 100, 1) if progress is not None else None,
+            'eta_seconds': self.eta_seconds(),
+            'elapsed_seconds': round(end - self.started, 2) if self.started else 0.0,
+            'partial': self.partial,
+            'result': self.result,
+            'error': self.error,
+            'cancel_requested': self.cancel_requested
+        }
+
+
+class RemoteJob:
+    """Read-only view of a job owned by another server process, read from the shared job directory"""
+
+    def __init__(self, state, cancel_path):
+        self._state = state
+        self._cancel_path = cancel_path
+        self.owner = state.pop('owner', None)
+        self.id = state.get('id')
+        self.status = state.get('status')
+
+    def cancel(self):
+        """Leave a cancellation marker for the owning process to pick up"""
+        if self.status not in ('queued', 'running'):
+            return False
+        with open(self._cancel_path, 'w') as f:
+            f.write(str(time.time()))
+        self._state['cancel_requested'] = True
+        return True
+
+    def to_dict(self):
+        return dict(self._state)
+
+
+class JobManager:
+    """
+    Runs long tasks on worker pools so request threads return immediately with
+    a job id that clients can poll.
+
+    I/O-bound work (parsing, profiling) runs on threads via submit(); CPU-bound
+    work (training, tuning) runs in a process pool via submit_process(), where
+    it neither holds the GIL of the web process nor dies with a request.
+
+    With a state_dir shared by several server processes, every process
+    publishes the status of its jobs there about once a second, so a poll or a
+    cancel request may arrive at any process.
+
+    Jobs submitted with an owner (a workspace key) are only found by get() and
+    cancel() calls made for the same owner.
+    """
+
+    def __init__(self, max_workers=2, process_workers=2, retention_seconds=3600, state_dir=None,
+                 publish_interval=1.0):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job')
+        self.process_workers = process_workers
+        self._process_executor = None
+        self._manager = None
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self.retention_seconds = retention_seconds
+        self.state_dir = state_dir
+        self.publish_interval = publish_interval
+        self._publisher = None
+        if state_dir:
+            os.makedirs(state_dir, exist_ok=True)
+
+    def submit(self, kind, func, *args, total_bytes=None, owner=None, **kwargs):
+        """Queue func(job, *args, **kwargs); its return value becomes the job result"""
+        job = Job(kind, total_bytes=total_bytes, owner=owner)
+        self._register(job)
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    def submit_process(self, kind, func, *args, on_complete=None, owner=None, **kwargs):
+        """Run func(progress, *args, **kwargs) in the process pool.
+
+        func must be a picklable module-level function; it reports through a
+        JobProgress and should raise JobCancelled when progress.cancelled().
+        on_complete(result) runs back in this process (e.g. to hand a fitted
+        model to its workspace) and its return value becomes the job result.
+        """
+        job = Job(kind, owner=owner)
+        executor, manager = self._process_pool()
+        job._state = manager.dict({'stage': 'queued', 'cancel': False})
+        self._register(job)
+        job._future = executor.submit(_run_in_process, func, JobProgress(job._state), args, kwargs)
+        job._future.add_done_callback(lambda future: self._finish(job, future, on_complete))
+        return job
+
+    def get(self, job_id, owner=None):
+        """Return a job of this process, or a RemoteJob view of one published by another process.
+        With an owner, jobs submitted by anyone else are treated as unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None and self.state_dir:
+            job = self._load_remote(job_id)
+        if job is not None and owner is not None and job.owner != owner:
+            return None
+        return job
+
+    def cancel(self, job_id, owner=None):
+        """Request cancellation of a job; returns the job, or None if unknown"""
+        job = self.get(job_id, owner=owner)
+        if job is not None:
+            job.cancel()
+        return job
+
+    def _register(self, job):
+        with self._lock:
+            self._prune()
+            self._jobs[job.id] = job
+            if self.state_dir and self._publisher is None:
+                self._publisher = threading.Thread(target=self._publish_loop, name='job-publisher', daemon=True)
+                self._publisher.start()
+
+    def _state_path(self, job_id, suffix='.json'):
+        return os.path.join(self.state_dir, job_id + suffix)
+
+    def _load_remote(self, job_id):
+        if not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(self._state_path(job_id), 'r', encoding='utf-8') as f:
+                return RemoteJob(json.load(f), self._state_path(job_id, '.cancel'))
+        except (OSError, ValueError):
+            return None
+
+    def _publish(self, job):
+        """Write a job's status to the shared directory (atomically, for readers in other processes)"""
+        try:
+            path = self._state_path(job.id)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({**job.to_dict(), 'owner': job.owner}, f, default=str)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not publish job {job.id}: {str(e)}")
+
+    def _publish_loop(self):
+        """Publish running jobs and pick up cancellation requests left by other processes"""
+        published = set()
+        while True:
+            with self._lock:
+                published &= set(self._jobs)
+                jobs = [job for job in self._jobs.values() if job.id not in published]
+            for job in jobs:
+                cancel_path = self._state_path(job.id, '.cancel')
+                if not job.finished and os.path.exists(cancel_path):
+                    job.cancel()
+                finished = job.finished
+                self._publish(job)
+                if finished:
+                    published.add(job.id)
+                    if os.path.exists(cancel_path):
+                        os.remove(cancel_path)
+            time.sleep(self.publish_interval)
+
+    def process_executor(self):
+        """The process pool, for callers that fan their own work out to it"""
+        return self._process_pool()[0]
+
+    def _process_pool(self):
+        """Start the process pool and the shared-state manager on first use"""
+        with self._lock:
+            if self._process_executor is None:
+                context = multiprocessing.get_context('spawn')
+                self._manager = context.Manager()
+                self._process_executor = ProcessPoolExecutor(max_workers=self.process_workers,
+                                                             mp_context=context)
+            return self._process_executor, self._manager
+
+    def _finish(self, job, future, on_complete):
+        if job.finished:
+            return
+        job._sync()
+        try:
+            if future.cancelled():
+                raise JobCancelled()
+            result = future.result()
+            job.result = on_complete(result) if on_complete else result
+            job.status = 'completed'
+            job.stage = 'done'
+        except JobCancelled:
+            job.status = job.stage = 'cancelled'
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished = time.time()
+            job._state = None
+
+    def _run(self, job, func, args, kwargs):
+        if job.cancel_requested:
+            job.status = job.stage = 'cancelled'
+            job.finished = time.time()
+            return
+        job.status = 'running'
+        job.started = time.time()
+        try:
+            job.result = func(job, *args, **kwargs)
+            job.status = 'completed'
+            job.stage = 'done'
+        except JobCancelled:
+            job.status = job.stage = 'cancelled'
+        except Exception as e:
+            logger.error(f"Job {job.id} ({job.kind}) failed: {str(e)}")
+            job.error = str(e)
+            job.status = 'failed'
+        finally:
+            job.finished = time.time()
+
+    def _prune(self):
+        """Forget finished jobs older than the retention window"""
+        cutoff = time.time() - self.retention_seconds
+        expired = [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]
+        for job_id in expired:
+            del self._jobs[job_id]
+            if self.state_dir and os.path.exists(self._state_path(job_id)):
+                os.remove(self._state_path(job_id))
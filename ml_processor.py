@@ -1,26 +1,30 @@
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split, cross_val_score, learning_curve, KFold, StratifiedKFold, TimeSeriesSplit
-from sklearn.preprocessing import StandardScaler, LabelEncoder
-from sklearn.impute import SimpleImputer
-from sklearn.metrics import (accuracy_score, precision_score, recall_score, f1_score,
-                           mean_squared_error, r2_score, mean_absolute_error)
-from sklearn.ensemble import (RandomForestClassifier, RandomForestRegressor,
-                            GradientBoostingClassifier, GradientBoostingRegressor,
-                            ExtraTreesClassifier, ExtraTreesRegressor,
-                            AdaBoostClassifier, AdaBoostRegressor,
-                            BaggingClassifier, BaggingRegressor,
-                            VotingClassifier, VotingRegressor,
-                            StackingClassifier, StackingRegressor)
-# Heavy libraries (xgboost, lightgbm, catboost, shap, optuna) are imported lazily where needed
-import plotly.graph_objects as go
-import plotly.express as px
-from imblearn.over_sampling import SMOTE
+# Heavy libraries (scikit-learn, xgboost, lightgbm, catboost, shap, optuna, plotly,
+# imblearn) are imported lazily where needed, so importing this module stays cheap
 import joblib
 import logging
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 import traceback
+from data_ingestion import read_tabular, detect_format, parse_date_columns
+from dataset_cache import DatasetCache
+from feature_store import FeatureStore
+from jobs import JobCancelled
+from model_store import ModelStore
+from preprocessing import PIPELINE_VERSION, PreprocessingPipeline, is_sparse_matrix, matrix_bytes, _private_copy
+from profiling import DataProfile
+
+# Preprocessed splits remembered per processor, by (dataset fingerprint, target, configuration)
+SPLIT_MEMO_SIZE = 4
+
+# Models that fit and predict on SciPy sparse matrices directly; the others get a dense copy
+SPARSE_NATIVE_MODELS = {'rf', 'et', 'dt', 'gb', 'ada', 'bag', 'lr', 'lasso', 'ridge', 'svm', 'knn', 'xgb', 'lgb'}
+# Models that compute in float64 only (libsvm) and would copy float32 input internally anyway
+FLOAT64_MODELS = {'svm'}
 
 # Model aliases for better user experience
 MODEL_ALIASES = {
@@ -46,48 +50,258 @@ MODEL_ALIASES.update({
     'stack': 'stacking'
 })
 
+class PreprocessedSplit:
+    """
+    Immutable result of one preprocess_data run: the train/test split plus the
+    target and feature names it was built for, and the fitted pipeline that
+    turns raw rows into those features. When SMOTE resampled the training part,
+    original_train_rows counts its leading real rows (the synthetic ones follow).
+
+    A new preprocess builds the next split on its own and publishes it with a
+    single assignment, so trainers and visualizations holding the previous
+    split keep reading a consistent version without taking any lock.
+    """
+
+    __slots__ = ('version', 'target', 'problem_type', 'is_classification', 'X_train', 'X_test',
+                 'y_train', 'y_test', 'feature_names', 'feature_store_key', 'feature_store_dir', 'pipeline',
+                 'original_train_rows')
+
+    def __init__(self, version, target, problem_type, is_classification, X_train, X_test, y_train, y_test,
+                 feature_names, feature_store_key=None, feature_store_dir=None, pipeline=None,
+                 original_train_rows=None):
+        values = locals()
+        for name in self.__slots__:
+            object.__setattr__(self, name, values[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("PreprocessedSplit is immutable; run preprocess_data to build a new one")
+
+    @property
+    def is_sparse(self):
+        return is_sparse_matrix(self.X_train)
+
+    def feature_frames(self):
+        """X_train and X_test as frames; a sparse split gives only its dense leading columns
+        (numeric and dense-encoded), without the one-hot indicators"""
+        if not self.is_sparse:
+            return self.X_train, self.X_test
+        names = self.pipeline.dense_feature_names
+        return tuple(pd.DataFrame(X[:, :len(names)].toarray(), columns=names)
+                     for X in (self.X_train, self.X_test))
+
+    def __reduce__(self):
+        # A split stored in a FeatureStore (with its pipeline) travels to worker processes by
+        # key and is memory-mapped there again instead of being copied through the pickle
+        if self.feature_store_key and self.feature_store_dir and \
+                FeatureStore(self.feature_store_dir).has(self.feature_store_key):
+            meta = tuple(getattr(self, name) for name in ('version', 'target', 'problem_type',
+                                                          'is_classification', 'feature_names',
+                                                          'original_train_rows'))
+            return _load_stored_split, (self.feature_store_dir, self.feature_store_key) + meta
+        return PreprocessedSplit, tuple(getattr(self, name) for name in self.__slots__)
+
+
+class DatasetVersion:
+    """
+    Immutable version of a loaded dataset.
+
+    Every stage reads the same column buffers: with pandas copy-on-write
+    enabled, view(), columns() and without() share them, so nothing is copied
+    unless a stage writes to a column, and then only that column. Replacing the dataset publishes
+    a new version instead of changing this one. Column statistics are
+    profiled once per version, on first use (see profiling.DataProfile).
+    """
+
+    __slots__ = ('version', 'frame', 'profile')
+
+    def __init__(self, version, frame):
+        object.__setattr__(self, 'version', version)
+        object.__setattr__(self, 'frame', frame)
+        object.__setattr__(self, 'profile', DataProfile(frame))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("DatasetVersion is immutable; assign MLProcessor.data to publish a new one")
+
+    def view(self):
+        """The whole dataset as a frame the caller may modify without affecting this version"""
+        return _private_copy(self.frame)
+
+    def columns(self, names):
+        """A subset of the columns, without copying them"""
+        return self.frame[list(names)]
+
+    def without(self, names):
+        """All but the given columns, without copying the rest"""
+        return self.frame.drop(columns=list(names))
+
+
+def _load_stored_split(store_dir, key, version, target, problem_type, is_classification, feature_names,
+                       original_train_rows=None):
+    """Rebuild a PreprocessedSplit over the memory-mapped arrays (and stored pipeline) of a FeatureStore"""
+    store = FeatureStore(store_dir)
+    arrays = store.load(key)
+    return PreprocessedSplit(
+        version, target, problem_type, is_classification,
+        pd.DataFrame(arrays['X_train'], columns=feature_names, copy=False),
+        pd.DataFrame(arrays['X_test'], columns=feature_names, copy=False),
+        pd.Series(arrays['y_train'], name=target, copy=False),
+        pd.Series(arrays['y_test'], name=target, copy=False),
+        feature_names, key, store_dir, store.load_object(key, 'pipeline'), original_train_rows
+    )
+
+
+def _model_input(model_type, X):
+    """X as a model takes it: sparse matrices are densified for models without sparse support,
+    and float32 features are widened only for models that strictly need float64"""
+    key = {v: k for k, v in MODEL_ALIASES.items()}.get(model_type, model_type)
+    if is_sparse_matrix(X) and key not in SPARSE_NATIVE_MODELS:
+        logging.getLogger(__name__).warning(f"{model_type} does not take sparse input; densifying the features")
+        X = X.toarray()
+    if key in FLOAT64_MODELS:
+        dtypes = X.dtypes if isinstance(X, pd.DataFrame) else [X.dtype]
+        if any(dtype == np.float32 for dtype in dtypes):
+            X = X.astype(np.float64)
+    return X
+
+
+def _check_cancelled(progress):
+    """Stop a job between stages if its cancellation was requested"""
+    if progress is not None and progress.cancelled():
+        raise JobCancelled()
+
+
+def train_model_job(progress, split, model_type, custom_params=None):
+    """Process-pool entry point: train a model on a split and return the fitted model with its results"""
+    processor = MLProcessor(split=split)
+    response = processor.train_model(model_type, custom_params, progress=progress)
+    model_name = processor.current_model['name']
+    return {'model_name': model_name, 'entry': processor.models[model_name], 'response': response}
+
+
+def tune_hyperparameters_job(progress, split, model_type, n_trials=100, cv_folds=5, cv_strategy='kfold'):
+    """Process-pool entry point: run an Optuna study on a split's training data and return the best params"""
+    processor = MLProcessor(split=split)
+    return processor.tune_hyperparameters(model_type, n_trials=n_trials, cv_folds=cv_folds,
+                                          cv_strategy=cv_strategy, progress=progress)
+
+
 class MLProcessor:
-    def __init__(self, data_path=None, data=None):
-        """Initialize MLProcessor with either a data path or pandas DataFrame"""
-        self.data = None
+    def __init__(self, data_path=None, data=None, chunked=False, chunksize=None, cache=None, fingerprint=None,
+                 split=None):
+        """Initialize MLProcessor with a data path, a cached snapshot key or a pandas DataFrame.
+        With only a PreprocessedSplit (as in training worker processes) there is no raw data."""
+        self.dataset = None
+        self.load_stats = None
+        # {column: strftime format} of date columns parsed from text at load, to parse new rows alike
+        self.date_formats = {}
+        self.fingerprint = fingerprint
+        # (cache_dir, key) of the snapshot the data was mapped from, so other processes can map it too
+        self.snapshot_source = None
         self.target = None
         self.problem_type = None
         self.is_classification = None
-        self.models = {}
+        # Readers take a reference to `split`/`current_model` once and never lock; writers build
+        # new objects and publish them under _write_lock. `models` locks internally and may
+        # spill idle models to disk (see ModelStore); the app installs a spilling store.
+        self.models = ModelStore()
         self.current_model = None
-        self.X_train = None
-        self.X_test = None
-        self.y_train = None
-        self.y_test = None
-        self.feature_names = None  
+        self.split = None
+        self._split_version = 0
+        # (dataset version, split key) -> (PreprocessedSplit, preprocess summary), most recent last
+        self._split_memo = OrderedDict()
+        self._write_lock = threading.Lock()
         self.logger = logging.getLogger(__name__)
 
         try:
             if data_path:
-                self.load_data(data_path)
+                self.load_data(data_path, chunked=chunked, chunksize=chunksize, cache=cache)
+            elif cache is not None and fingerprint:
+                self.load_snapshot(cache, fingerprint)
             elif isinstance(data, pd.DataFrame):
-                self.data = data.copy()
+                # Copy-on-write: the caller's later changes to `data` do not reach this processor
+                self.data = _private_copy(data)
+            elif split is not None:
+                self.target, self.problem_type, self.is_classification = \
+                    split.target, split.problem_type, split.is_classification
+                self.split = split
             else:
                 raise ValueError("Either data_path or data must be provided")
         except Exception as e:
             self.logger.error(f"Initialization error: {str(e)}")
             raise
 
-    def load_data(self, data_path):
-        """Load data from file"""
+    def load_data(self, data_path, chunked=False, chunksize=None, cache=None):
+        """Load data from file.
+
+        Supports CSV (plain, gzip, zip or zstd compressed), Excel and Parquet.
+        With chunked=True, files are read in blocks of `chunksize` rows with
+        narrow numeric dtypes and categorical strings; parse time and memory are
+        recorded in self.load_stats.
+
+        With a DatasetCache, the file's content hash is looked up first and a hit
+        memory-maps the stored snapshot instead of parsing; a miss is parsed and
+        written to the cache.
+        """
         try:
-            if data_path.endswith('.csv'):
-                self.data = pd.read_csv(data_path)
-            elif data_path.endswith(('.xls', '.xlsx')):
+            if cache is not None:
+                self.fingerprint = self.fingerprint or cache.fingerprint_file(data_path)
+                if cache.has(self.fingerprint):
+                    self.load_snapshot(cache, self.fingerprint)
+                    return
+
+            file_format = detect_format(data_path)
+            if file_format is None:
+                raise ValueError("Unsupported file format. Please use CSV (optionally gzip/zip/zstd compressed), "
+                                 "Excel or Parquet files.")
+            kind, compression = file_format
+            if chunked:
+                self.data, self.load_stats = read_tabular(data_path, data_path, chunksize=chunksize)
+                self.date_formats = dict(self.load_stats.get('date_columns') or {})
+            elif kind == 'csv':
+                self.data = pd.read_csv(data_path, compression=compression)
+                self.date_formats = parse_date_columns(self.data)
+            elif kind in ('xls', 'xlsx'):
                 self.data = pd.read_excel(data_path)
+                self.date_formats = parse_date_columns(self.data)
             else:
-                raise ValueError("Unsupported file format. Please use CSV or Excel files.")
+                self.data = pd.read_parquet(data_path)
+                self.date_formats = parse_date_columns(self.data)
+
+            if cache is not None:
+                if cache.store(self.fingerprint, self.data, filename=os.path.basename(data_path),
+                               date_formats=self.date_formats):
+                    self.snapshot_source = (os.path.abspath(cache.cache_dir), self.fingerprint)
+                if self.load_stats is not None:
+                    self.load_stats['cache_hit'] = False
             
             self.logger.info(f"Successfully loaded data from {data_path}")
         except Exception as e:
             self.logger.error(f"Error loading data: {str(e)}")
             raise
 
+    def load_snapshot(self, cache, fingerprint):
+        """Load a dataset from its memory-mapped snapshot in a DatasetCache.
+        Snapshots stored under a name rather than a content hash carry their
+        content fingerprint in the snapshot metadata."""
+        try:
+            start = time.perf_counter()
+            self.data = cache.load(fingerprint)
+            metadata = cache.metadata(fingerprint)
+            self.fingerprint = metadata.get('fingerprint') or fingerprint
+            self.date_formats = metadata.get('date_formats') or {}
+            self.snapshot_source = (os.path.abspath(cache.cache_dir), fingerprint)
+            self.load_stats = {
+                'mode': 'snapshot',
+                'cache_hit': True,
+                'rows': len(self.data),
+                'columns': len(self.data.columns),
+                'load_seconds': round(time.perf_counter() - start, 4)
+            }
+            self.logger.info(f"Loaded dataset {fingerprint[:12]} from snapshot cache")
+        except Exception as e:
+            self.logger.error(f"Error loading snapshot: {str(e)}")
+            raise
+
     def set_target(self, target_column):
         """Set the target column and determine the problem type."""
         try:
@@ -142,14 +356,15 @@ class MLProcessor:
                 bias_report['needs_smote'] = bool(bias_report['imbalance_ratio'] > 3)
             
             # Check feature distributions and skewness
-            numerical_features = self.X.select_dtypes(include=['int64', 'float64']).columns
+            profile = self.dataset.profile
             feature_stats = {}
-            
-            for col in numerical_features:
-                col_stats = self.X[col].describe()
-                skewness = float(self.X[col].skew())
-                mean = float(col_stats['mean'])
-                std = float(col_stats['std'])
+
+            for col in self.X.columns:
+                if not profile.is_numeric(col):
+                    continue
+                skewness = profile[col]['skew']
+                mean = profile[col]['mean']
+                std = profile[col]['std']
                 needs_scaling = bool(abs(mean) > 1 or std > 1)
                 
                 feature_stats[str(col)] = {
@@ -172,7 +387,7 @@ class MLProcessor:
         try:
             self.target_column = target_column
             self.y = self.data[target_column]
-            self.X = self.data.drop(columns=[target_column])
+            self.X = self.dataset.without([target_column])
             
             # Check if target is categorical or numerical
             unique_count = self.y.nunique()
@@ -199,18 +414,20 @@ class MLProcessor:
             if self.target_column is None:
                 raise ValueError("Target column not set. Please set target column first.")
 
+            profile = self.dataset.profile
+
             # Basic data summary
             summary = {
                 'total_samples': len(self.data),
                 'num_features': len(self.data.columns),
-                'missing_values': self.data.isnull().sum().sum()
+                'missing_values': profile.missing_total
             }
 
             # Target analysis
             target_data = self.data[self.target_column]
             target_analysis = {
                 'type': str(target_data.dtype),
-                'unique_values': target_data.nunique()
+                'unique_values': profile[self.target_column]['unique']
             }
 
             if target_data.dtype in ['object', 'category'] or self.problem_type == 'classification':
@@ -221,20 +438,20 @@ class MLProcessor:
             feature_analysis = {}
             for column in self.data.columns:
                 if column != self.target_column:
-                    col_data = self.data[column]
+                    stats = profile[column]
                     analysis = {
-                        'type': str(col_data.dtype),
-                        'missing': int(col_data.isnull().sum()),
-                        'unique': int(col_data.nunique())
+                        'type': stats['dtype'],
+                        'missing': stats['missing'],
+                        'unique': stats['unique']
                     }
-                    
-                    if col_data.dtype in ['int64', 'float64']:
+
+                    if profile.is_numeric(column):
                         analysis.update({
-                            'mean': float(col_data.mean()),
-                            'std': float(col_data.std()),
-                            'skew': float(col_data.skew())
+                            'mean': stats['mean'],
+                            'std': stats['std'],
+                            'skew': stats['skew']
                         })
-                    
+
                     feature_analysis[column] = analysis
 
             # Generate recommendations
@@ -250,15 +467,14 @@ class MLProcessor:
             recommendations['encoding'].extend([str(col) for col in cat_features])
 
             # Recommend scaling for numerical features with large values or high variance
-            num_features = self.data.select_dtypes(include=['int64', 'float64']).columns
-            for col in num_features:
+            for col in profile.numeric_columns:
                 if col != self.target_column:
-                    if abs(self.data[col].mean()) > 1 or self.data[col].std() > 1:
+                    if abs(profile[col]['mean']) > 1 or profile[col]['std'] > 1:
                         recommendations['scaling'].append(str(col))
 
             # Recommend imputation for features with missing values
             for col in self.data.columns:
-                if col != self.target_column and self.data[col].isnull().sum() > 0:
+                if col != self.target_column and profile[col]['missing'] > 0:
                     recommendations['imputation'].append(str(col))
 
             # Recommend feature selection if there are many features
@@ -277,162 +493,354 @@ class MLProcessor:
             self.logger.error(f"Error in EDA: {str(e)}")
             raise
 
-    def preprocess_data(self, test_size=0.2, handle_imbalance=True):
-        """Preprocess the data for model training."""
+    # Views of the latest published split and model, for callers that read a single field
+    @property
+    def X_train(self):
+        return self.split.X_train if self.split is not None else None
+
+    @property
+    def X_test(self):
+        return self.split.X_test if self.split is not None else None
+
+    @property
+    def y_train(self):
+        return self.split.y_train if self.split is not None else None
+
+    @property
+    def y_test(self):
+        return self.split.y_test if self.split is not None else None
+
+    @property
+    def feature_names(self):
+        return self.split.feature_names if self.split is not None else None
+
+    @property
+    def feature_store_key(self):
+        return self.split.feature_store_key if self.split is not None else None
+
+    @property
+    def model(self):
+        """The latest fitted model, reloaded from disk if it was spilled"""
+        current = self.current_model
+        return self.models[current['name']]['model'] if current else None
+
+    @property
+    def feature_importance(self):
+        return self.current_model['importance'] if self.current_model else None
+
+    @property
+    def data(self):
+        """The current dataset version's frame; treat it as read-only and use dataset.view() to modify"""
+        return self.dataset.frame if self.dataset is not None else None
+
+    @data.setter
+    def data(self, frame):
+        version = self.dataset.version + 1 if self.dataset is not None else 1
+        self.dataset = DatasetVersion(version, frame) if frame is not None else None
+
+    def dataset_fingerprint(self):
+        """Return the content hash of the loaded dataset, computing it on first use"""
+        if self.fingerprint is None and self.data is not None:
+            self.fingerprint = DatasetCache.fingerprint_frame(self.data)
+        return self.fingerprint
+
+    def preprocess_data(self, test_size=0.2, handle_imbalance=True, feature_store=None, encodings=None,
+                        drop_uninformative=True, keep_columns=None, one_hot=False, precision='float64'):
+        """Preprocess the data for model training.
+
+        The result is published as a new PreprocessedSplit (self.split) once it is
+        complete; readers of the previous split are unaffected.
+
+        If a FeatureStore is given, the resulting train/test matrices are written
+        to it once and X_train/X_test/y_train/y_test become views over the
+        memory-mapped arrays, shared by every trainer and joblib worker.
+
+        Categorical columns are encoded by cardinality (ordinal, frequency, hashed or
+        out-of-fold target encoding); `encodings` ({column: name}) overrides the choice.
+        Identifier-like and (near) constant columns are dropped first unless
+        drop_uninformative is False or they are listed in keep_columns. With one_hot,
+        moderate-cardinality categoricals are one-hot encoded and X_train/X_test are
+        SciPy CSR matrices (kept in memory; the FeatureStore holds dense arrays only).
+        precision='float32' keeps the feature matrices in float32 from preprocessing
+        through training, CV and plots, halving their memory.
+        Every step is fitted on the training rows only and then applied to the test rows.
+
+        Results are memoized per (dataset fingerprint, target, configuration), in
+        memory and in the FeatureStore, so repeating a preprocess republishes the
+        earlier split instead of recomputing it; `cache_hit` in the result says which.
+        """
         try:
+            from sklearn.model_selection import train_test_split
             if self.data is None or self.target is None:
                 raise ValueError("Data or target not set")
+            target, problem_type, is_classification = self.target, self.problem_type, self.is_classification
                 
             if len(self.data) == 0:
                 raise ValueError("Dataset is empty")
 
+            config = {'test_size': test_size, 'handle_imbalance': handle_imbalance,
+                      'pipeline_version': PIPELINE_VERSION}
+            if encodings:
+                config['encodings'] = dict(encodings)
+            if not drop_uninformative:
+                config['drop_uninformative'] = False
+            if keep_columns:
+                config['keep_columns'] = sorted(keep_columns)
+            if one_hot:
+                config['one_hot'] = True
+            if precision != 'float64':
+                config['precision'] = precision
+            split_key = FeatureStore.make_key(self.dataset_fingerprint(), target, **config)
+            cached = self._reuse_split(split_key, feature_store)
+            if cached is not None:
+                return cached
+
             preprocessing_steps = []
             
             # Store original shapes for logging
             original_shape = self.data.shape
             self.logger.info(f"Original data shape: {original_shape}")
             
-            # Separate features and target
-            X = self.data.drop(columns=[self.target])
-            y = self.data[self.target]
+            # Separate features and target (copy-on-write: columns are copied only when transformed)
+            dataset = self.dataset
+            X = dataset.without([target])
+            y = dataset.frame[target]
             
             # Store initial feature names
             initial_features = list(X.columns)
             
-            # Identify column types
-            numeric_cols = X.select_dtypes(include=['int64', 'float64']).columns
-            categorical_cols = X.select_dtypes(include=['object', 'category']).columns
-            datetime_cols = X.select_dtypes(include=['datetime64']).columns
-            
-            # Handle datetime features
-            for col in datetime_cols:
-                X[f'{col}_year'] = X[col].dt.year
-                X[f'{col}_month'] = X[col].dt.month
-                X[f'{col}_day'] = X[col].dt.day
-                X = X.drop(columns=[col])
-                preprocessing_steps.append(f"Extracted year, month, day from {col}")
-            
-            # Handle missing values
-            if X.isnull().sum().sum() > 0:
-                # Numeric imputation
-                if len(numeric_cols) > 0:
-                    num_imputer = SimpleImputer(strategy='mean')
-                    X[numeric_cols] = num_imputer.fit_transform(X[numeric_cols])
-                    preprocessing_steps.append("Imputed missing numeric values with mean")
-                
-                # Categorical imputation
-                if len(categorical_cols) > 0:
-                    cat_imputer = SimpleImputer(strategy='most_frequent')
-                    X[categorical_cols] = cat_imputer.fit_transform(X[categorical_cols])
-                    preprocessing_steps.append("Imputed missing categorical values with mode")
-            
-            # Encode categorical variables
-            encoders = {}
-            for col in categorical_cols:
-                encoder = LabelEncoder()
-                X[col] = encoder.fit_transform(X[col])
-                encoders[col] = encoder
-                preprocessing_steps.append(f"Encoded categorical column: {col}")
-            
-            # Scale numeric features
-            if len(numeric_cols) > 0:
-                scaler = StandardScaler()
-                X[numeric_cols] = scaler.fit_transform(X[numeric_cols])
-                preprocessing_steps.append("Scaled numeric features")
-            
-            # Store final feature names
-            self.feature_names = list(X.columns)
-            
-            # Split the data
-            self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
+            pipeline = PreprocessingPipeline(target, encodings=encodings, drop_uninformative=drop_uninformative,
+                                             keep_columns=keep_columns, one_hot=one_hot, precision=precision,
+                                             date_formats=self.date_formats)
+            # Which columns carry no information (constants, identifiers) is decided on all rows,
+            # without the target: a row number is only recognizable as a whole
+            pipeline.select_columns(X)
+
+            # Split the raw rows first, so nothing fitted below sees the test rows or their labels
+            X_train, X_test, y_train, y_test = train_test_split(
                 X, y, test_size=test_size, random_state=42, 
-                stratify=y if self.is_classification else None
+                stratify=y if is_classification else None
             )
             preprocessing_steps.append(f"Split data into train/test sets (test_size={test_size})")
+
+            # Fit the feature preprocessing on the training rows once; it is kept with the split
+            # (and its models) to transform the test rows and new rows at inference time
+            X_train = pipeline.fit_transform(X_train, y_train, is_classification)
+            X_test = pipeline.transform(X_test)
+            preprocessing_steps.extend(pipeline.steps)
+            feature_names = pipeline.feature_names
             
             # Handle class imbalance if needed
-            if handle_imbalance and self.is_classification:
+            original_train_rows = None
+            if handle_imbalance and is_classification:
                 # Check class distribution
-                class_dist = pd.Series(self.y_train).value_counts()
+                class_dist = pd.Series(y_train).value_counts()
                 min_samples = class_dist.min()
-                if min_samples < len(self.y_train) * 0.2:  # If minority class < 20%
+                if min_samples < len(y_train) * 0.2:  # If minority class < 20%
+                    from imblearn.over_sampling import SMOTE
                     smote = SMOTE(random_state=42)
-                    self.X_train, self.y_train = smote.fit_resample(self.X_train, self.y_train)
+                    # SMOTE returns the original rows first, then the synthetic ones
+                    original_train_rows = X_train.shape[0]
+                    X_train, y_train = smote.fit_resample(X_train, y_train)
                     preprocessing_steps.append("Applied SMOTE to handle class imbalance")
             
+            feature_store_key = None
+            if feature_store is not None and not pipeline.sparse:
+                (X_train, X_test, y_train, y_test), feature_store_key = self._persist_split(
+                    feature_store, split_key, target, feature_names, (X_train, X_test, y_train, y_test), pipeline)
+                if feature_store_key:
+                    preprocessing_steps.append("Stored train/test matrices as memory-mapped arrays")
+
+            # Publish the finished split in one step
+            with self._write_lock:
+                self._split_version += 1
+                split = PreprocessedSplit(self._split_version, target, problem_type, is_classification,
+                                          X_train, X_test, y_train, y_test, feature_names, feature_store_key,
+                                          os.path.abspath(feature_store.store_dir) if feature_store_key else None,
+                                          pipeline, original_train_rows)
+                self.split = split
+
             # Log shapes after preprocessing
-            self.logger.info(f"Data shapes after preprocessing - Train: {self.X_train.shape}, Test: {self.X_test.shape}")
+            self.logger.info(f"Data shapes after preprocessing (split v{split.version}) - "
+                             f"Train: {split.X_train.shape}, Test: {split.X_test.shape}")
             
-            return {
+            summary = {
                 'status': 'success',
                 'message': 'Data preprocessing completed successfully',
                 'steps': preprocessing_steps,
+                'split_version': split.version,
                 'shapes': {
                     'original': original_shape,
-                    'train': self.X_train.shape,
-                    'test': self.X_test.shape
+                    'train': split.X_train.shape,
+                    'test': split.X_test.shape
                 },
-                'feature_names': self.feature_names,
+                'feature_names': split.feature_names,
                 'initial_features': initial_features,
-                'target_distribution': pd.Series(self.y_train).value_counts().to_dict() if self.is_classification else None
+                'encodings': {col: encoder.name for col, encoder in pipeline.encoders.items()},
+                'feature_matrix': {
+                    'format': 'csr' if pipeline.sparse else 'dense',
+                    'dtype': pipeline.dtype.name,
+                    'bytes': matrix_bytes(split.X_train) + matrix_bytes(split.X_test),
+                    'dense_bytes': (split.X_train.shape[0] + split.X_test.shape[0]) * split.X_train.shape[1]
+                                   * pipeline.dtype.itemsize
+                },
+                'dropped_columns': pipeline.dropped_columns,
+                'estimated_savings': pipeline.estimated_savings(),
+                'original_train_rows': original_train_rows,
+                'target_distribution': pd.Series(split.y_train).value_counts().to_dict() if is_classification else None
             }
+            self._remember_split(split_key, split, summary)
+            if feature_store_key:
+                feature_store.save_object(feature_store_key, 'summary', summary)
+            return {**summary, 'cache_hit': False}
             
         except Exception as e:
             self.logger.error(f"Error in preprocessing: {str(e)}")
             raise
 
-    def train_model(self, model_type, custom_params=None):
-        """Train a model and store it for comparison."""
+    def memoized_splits(self):
+        """Splits kept for reuse by preprocess_data (the current one included)"""
+        return [split for split, _ in self._split_memo.values()]
+
+    def _remember_split(self, key, split, summary):
+        """Memoize a finished split in memory, keeping only the most recent few"""
+        with self._write_lock:
+            memo = self._split_memo
+            memo[(self.dataset.version, key)] = (split, summary)
+            memo.move_to_end((self.dataset.version, key))
+            while len(memo) > SPLIT_MEMO_SIZE:
+                memo.popitem(last=False)
+
+    def _reuse_split(self, key, feature_store=None):
+        """Republish a memoized split for key and return its preprocess summary, or None on a miss.
+        Splits found only in the FeatureStore are memory-mapped back in under a new version."""
+        memo_key = (self.dataset.version, key)
+        with self._write_lock:
+            cached = self._split_memo.get(memo_key)
+            if cached is not None:
+                self._split_memo.move_to_end(memo_key)
+        if cached is None and feature_store is not None and feature_store.has(key):
+            summary = feature_store.load_object(key, 'summary')
+            pipeline = feature_store.load_object(key, 'pipeline')
+            if summary is None or pipeline is None:
+                return None
+            with self._write_lock:
+                self._split_version += 1
+                version = self._split_version
+            split = _load_stored_split(os.path.abspath(feature_store.store_dir), key, version, self.target,
+                                       self.problem_type, self.is_classification, pipeline.feature_names,
+                                       summary.get('original_train_rows'))
+            cached = (split, {**summary, 'split_version': version})
+            self._remember_split(key, *cached)
+        if cached is None:
+            return None
+        split, summary = cached
+        self.publish_split(split)
+        self.logger.info(f"Reusing preprocessed split v{split.version} ({key[:12]})")
+        return {**summary, 'cache_hit': True}
+
+    def _persist_split(self, feature_store, key, target, feature_names, split, pipeline):
+        """Write a split and its fitted pipeline to a FeatureStore under key and return (memory-mapped
+        views of the split, key). Falls back to the in-memory split (and no key) if it cannot be stored."""
+        X_train, X_test, y_train, y_test = split
+        try:
+            arrays = feature_store.save(
+                key,
+                X_train=X_train.to_numpy(dtype=pipeline.dtype),
+                X_test=X_test.to_numpy(dtype=pipeline.dtype),
+                y_train=np.asarray(y_train),
+                y_test=np.asarray(y_test)
+            )
+            feature_store.save_object(key, 'pipeline', pipeline)
+            # copy=False keeps the frames as views over the mapped files
+            return (
+                pd.DataFrame(arrays['X_train'], columns=feature_names, copy=False),
+                pd.DataFrame(arrays['X_test'], columns=feature_names, copy=False),
+                pd.Series(arrays['y_train'], name=target, copy=False),
+                pd.Series(arrays['y_test'], name=target, copy=False)
+            ), key
+        except Exception as e:
+            self.logger.warning(f"Could not memory-map preprocessed data, keeping it in memory: {str(e)}")
+            return split, None
+
+    def _training_data(self, split=None):
+        """Return the (X, y) used for cross-validation: the training part of `split` (default:
+        the latest) as plain arrays when available (memory-mapped if persisted), else the raw features.
+        Synthetic SMOTE rows are left out: interpolated from real neighbours that land in other
+        folds, they would leak those folds into each other and inflate the scores."""
+        split = split or self.split
+        if split is not None:
+            X = split.X_train if split.is_sparse else split.X_train.to_numpy()
+            y = np.asarray(split.y_train)
+            rows = split.original_train_rows
+            return (X[:rows], y[:rows]) if rows is not None else (X, y)
+        return self.X, self.y
+
+    def train_model(self, model_type, custom_params=None, progress=None):
+        """Train a model and store it for comparison.
+
+        `progress` (a job handle with update()/cancelled()) receives the current
+        stage and partial results; cancellation is honoured between stages.
+        """
         try:
             self.logger.info("Starting model training...")
             
-            if self.X_train is None or self.y_train is None:
+            # Train on one consistent split even if a new preprocess is published meanwhile
+            split = self.split
+            if split is None:
                 raise ValueError("Data not preprocessed. Please preprocess data first.")
             
-            if not self.feature_names:
-                self.feature_names = list(self.X_train.columns)
-                self.logger.warning("Feature names not found, using column names from training data")
+            feature_names = split.feature_names or list(split.X_train.columns)
+            X_train, X_test = split.X_train, split.X_test
             
-            self.logger.info(f"Current shapes - Train: {self.X_train.shape}, Test: {self.X_test.shape}")
+            self.logger.info(f"Current shapes (split v{split.version}) - Train: {split.X_train.shape}, Test: {split.X_test.shape}")
             
             # Get model instance
             self.logger.info(f"Getting model instance for type: {model_type}")
-            model = self._get_model(model_type)
+            model = self._get_model(model_type, is_classification=split.is_classification)
             
             # Set custom parameters if provided
             if custom_params:
                 model.set_params(**custom_params)
             
+            X_train, X_test = _model_input(model_type, X_train), _model_input(model_type, X_test)
+            
             # Train model
             self.logger.info("Training model...")
-            model.fit(self.X_train, self.y_train)
+            _check_cancelled(progress)
+            if progress is not None:
+                progress.update(stage='fitting')
+            model.fit(X_train, split.y_train)
             
             # Get predictions
-            train_predictions = model.predict(self.X_train)
-            test_predictions = model.predict(self.X_test)
+            _check_cancelled(progress)
+            if progress is not None:
+                progress.update(stage='evaluating')
+            train_predictions = model.predict(X_train)
+            test_predictions = model.predict(X_test)
             
             # Calculate metrics
-            train_metrics = self._calculate_metrics(self.y_train, train_predictions)
-            test_metrics = self._calculate_metrics(self.y_test, test_predictions)
+            train_metrics = self._calculate_metrics(split.y_train, train_predictions, split.problem_type)
+            test_metrics = self._calculate_metrics(split.y_test, test_predictions, split.problem_type)
+            if progress is not None:
+                progress.update(partial={'train_metrics': {k: float(v) for k, v in train_metrics.items()},
+                                         'test_metrics': {k: float(v) for k, v in test_metrics.items()}})
             
             # Get feature importance if available
             importance_dict = {}
             if hasattr(model, 'feature_importances_'):
-                importance_dict = dict(zip(self.feature_names, model.feature_importances_))
+                importance_dict = dict(zip(feature_names, model.feature_importances_))
                 importance_dict = dict(sorted(importance_dict.items(), key=lambda x: x[1], reverse=True))
             
-            # Keep references for downstream operations (save/visualizations)
-            self.model = model
-            self.feature_importance = importance_dict
-
-            # Store model and results
             model_name = MODEL_ALIASES.get(model_type, model_type)
-            self.models[model_name] = {
+            self.publish_model(model_name, {
                 'model': model,
                 'metrics': test_metrics,
                 'predictions': test_predictions,
-                'importance': importance_dict
-            }
+                'importance': importance_dict,
+                'split_version': split.version,
+                'preprocessing': split.pipeline
+            }, split)
             
             self.logger.info(f"Model {model_name} trained and stored. Total models: {len(self.models)}")
             
@@ -446,24 +854,43 @@ class MLProcessor:
                     'type': 'feature_importance',
                     'data': importance_dict
                 },
+                'split_version': split.version,
                 'data_shapes': {
-                    'train_shape': list(self.X_train.shape),
-                    'test_shape': list(self.X_test.shape)
+                    'train_shape': list(split.X_train.shape),
+                    'test_shape': list(split.X_test.shape)
                 }
             }
             
             self.logger.info("Complete response: " + str(response))
             return response
             
+        except JobCancelled:
+            self.logger.info("Training cancelled")
+            raise
         except Exception as e:
             self.logger.error(f"Error in train_model: {str(e)}")
             self.logger.error(f"Stack trace: {traceback.format_exc()}")
             raise
 
-    def _calculate_metrics(self, y_true, y_pred):
+    def publish_split(self, split):
+        """Make an existing PreprocessedSplit (e.g. one restored from a FeatureStore) the current one"""
+        with self._write_lock:
+            self._split_version = max(self._split_version, split.version)
+            self.split = split
+
+    def publish_model(self, model_name, entry, split):
+        """Make a fitted model (and its results) available for comparison, saving and plots"""
+        with self._write_lock:
+            self.models.put(model_name, entry)
+            # The fitted model itself is looked up by name, so it can be spilled like the others
+            self.current_model = {'name': model_name, 'importance': entry['importance'], 'split': split}
+
+    def _calculate_metrics(self, y_true, y_pred, problem_type=None):
         """Calculate evaluation metrics based on problem type."""
         try:
-            if self.problem_type == 'classification':
+            from sklearn.metrics import (accuracy_score, precision_score, recall_score, f1_score,
+                                         mean_squared_error, r2_score, mean_absolute_error)
+            if (problem_type or self.problem_type) == 'classification':
                 return {
                     'accuracy': accuracy_score(y_true, y_pred),
                     'precision': precision_score(y_true, y_pred, average='weighted'),
@@ -481,8 +908,10 @@ class MLProcessor:
             logging.error(f"Error calculating metrics: {str(e)}")
             raise
 
-    def _get_model(self, model_type: str):
+    def _get_model(self, model_type: str, is_classification=None):
         """Get the model instance based on type"""
+        if is_classification is None:
+            is_classification = self.is_classification
         try:
             # Convert display name to key if needed
             if model_type in MODEL_ALIASES.values():
@@ -491,63 +920,63 @@ class MLProcessor:
             # Get base model
             if model_type == 'rf':
                 from sklearn.ensemble import RandomForestRegressor, RandomForestClassifier
-                return RandomForestClassifier(n_estimators=100, random_state=42) if self.is_classification else RandomForestRegressor(n_estimators=100, random_state=42)
+                return RandomForestClassifier(n_estimators=100, random_state=42) if is_classification else RandomForestRegressor(n_estimators=100, random_state=42)
                 
             elif model_type == 'xgb':
                 import xgboost as xgb
-                return xgb.XGBClassifier(random_state=42) if self.is_classification else xgb.XGBRegressor(random_state=42)
+                return xgb.XGBClassifier(random_state=42) if is_classification else xgb.XGBRegressor(random_state=42)
                 
             elif model_type == 'lgb':
                 import lightgbm as lgb
-                return lgb.LGBMClassifier(random_state=42) if self.is_classification else lgb.LGBMRegressor(random_state=42)
+                return lgb.LGBMClassifier(random_state=42) if is_classification else lgb.LGBMRegressor(random_state=42)
                 
             elif model_type == 'cat':
                 from catboost import CatBoostClassifier, CatBoostRegressor
-                return CatBoostClassifier(verbose=False, random_state=42) if self.is_classification else CatBoostRegressor(verbose=False, random_state=42)
+                return CatBoostClassifier(verbose=False, random_state=42) if is_classification else CatBoostRegressor(verbose=False, random_state=42)
                 
             elif model_type == 'gb':
                 from sklearn.ensemble import GradientBoostingClassifier, GradientBoostingRegressor
-                return GradientBoostingClassifier(random_state=42) if self.is_classification else GradientBoostingRegressor(random_state=42)
+                return GradientBoostingClassifier(random_state=42) if is_classification else GradientBoostingRegressor(random_state=42)
                 
             elif model_type == 'et':
                 from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor
-                return ExtraTreesClassifier(random_state=42) if self.is_classification else ExtraTreesRegressor(random_state=42)
+                return ExtraTreesClassifier(random_state=42) if is_classification else ExtraTreesRegressor(random_state=42)
                 
             elif model_type == 'ada':
                 from sklearn.ensemble import AdaBoostClassifier, AdaBoostRegressor
-                return AdaBoostClassifier(random_state=42) if self.is_classification else AdaBoostRegressor(random_state=42)
+                return AdaBoostClassifier(random_state=42) if is_classification else AdaBoostRegressor(random_state=42)
                 
             elif model_type == 'bag':
                 from sklearn.ensemble import BaggingClassifier, BaggingRegressor
-                return BaggingClassifier(random_state=42) if self.is_classification else BaggingRegressor(random_state=42)
+                return BaggingClassifier(random_state=42) if is_classification else BaggingRegressor(random_state=42)
                 
             elif model_type == 'lr':
                 from sklearn.linear_model import LogisticRegression, LinearRegression
-                return LogisticRegression(random_state=42) if self.is_classification else LinearRegression()
+                return LogisticRegression(random_state=42) if is_classification else LinearRegression()
                 
             elif model_type == 'lasso':
                 from sklearn.linear_model import Lasso
-                if self.is_classification:
+                if is_classification:
                     raise ValueError("Lasso regression is not suitable for classification problems")
                 return Lasso(random_state=42)
                 
             elif model_type == 'ridge':
                 from sklearn.linear_model import Ridge
-                if self.is_classification:
+                if is_classification:
                     raise ValueError("Ridge regression is not suitable for classification problems")
                 return Ridge(random_state=42)
                 
             elif model_type == 'svm':
                 from sklearn.svm import SVC, SVR
-                return SVC(random_state=42) if self.is_classification else SVR()
+                return SVC(random_state=42) if is_classification else SVR()
                 
             elif model_type == 'dt':
                 from sklearn.tree import DecisionTreeClassifier, DecisionTreeRegressor
-                return DecisionTreeClassifier(random_state=42) if self.is_classification else DecisionTreeRegressor(random_state=42)
+                return DecisionTreeClassifier(random_state=42) if is_classification else DecisionTreeRegressor(random_state=42)
                 
             elif model_type == 'knn':
                 from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor
-                return KNeighborsClassifier() if self.is_classification else KNeighborsRegressor()
+                return KNeighborsClassifier() if is_classification else KNeighborsRegressor()
                 
             else:
                 available_models = set(MODEL_ALIASES.keys()) | set(MODEL_ALIASES.values())
@@ -560,14 +989,15 @@ class MLProcessor:
     def get_model_comparison(self, model_types=None):
         """Compare multiple trained models."""
         try:
-            self.logger.info(f"Starting model comparison. Available models: {list(self.models.keys())}")
+            models = self.models
+            self.logger.info(f"Starting model comparison. Available models: {list(models.keys())}")
             
-            if not self.models:
+            if not models:
                 raise ValueError("No trained models available for comparison")
 
             # If no specific models requested, compare all trained models
             if model_types is None:
-                model_types = list(self.models.keys())
+                model_types = list(models.keys())
             elif isinstance(model_types, list):
                 # Convert model aliases to full names
                 model_types = [MODEL_ALIASES.get(mt, mt) for mt in model_types]
@@ -576,11 +1006,11 @@ class MLProcessor:
 
             comparison = {}
             for model_type in model_types:
-                if model_type not in self.models:
+                if model_type not in models:
                     self.logger.warning(f"Model {model_type} not found in trained models")
                     continue
                     
-                model_info = self.models[model_type]
+                model_info = models[model_type]
                 comparison[model_type] = {
                     'metrics': model_info['metrics'],
                     'predictions': model_info['predictions'].tolist() if isinstance(model_info['predictions'], np.ndarray) else model_info['predictions']
@@ -596,12 +1026,19 @@ class MLProcessor:
             self.logger.error(f"Error in model comparison: {str(e)}")
             raise
 
-    def tune_hyperparameters(self, model_type, n_trials=100, cv_folds=5, cv_strategy='kfold'):
-        """Perform hyperparameter tuning using Optuna"""
+    def tune_hyperparameters(self, model_type, n_trials=100, cv_folds=5, cv_strategy='kfold', progress=None):
+        """Perform hyperparameter tuning using Optuna.
+
+        `progress` (a job handle) receives the best result after every trial, and
+        the study stops after the current trial once cancellation is requested.
+        """
         try:
+            from sklearn.model_selection import cross_val_score, KFold, StratifiedKFold, TimeSeriesSplit
             import optuna
-            if not hasattr(self, 'X') or not hasattr(self, 'y'):
+            if self.split is None and (not hasattr(self, 'X') or not hasattr(self, 'y')):
                 raise ValueError("Data not loaded. Please load data first.")
+            X, y = self._training_data()
+            X = _model_input(model_type, X)
 
             def objective(trial):
                 params = self._get_hyperparameter_space(trial, model_type)
@@ -617,17 +1054,31 @@ class MLProcessor:
                     raise ValueError(f"Unknown cross-validation strategy: {cv_strategy}")
 
                 try:
-                    scores = cross_val_score(model, self.X, self.y, cv=cv, scoring='neg_mean_squared_error')
+                    scores = cross_val_score(model, X, y, cv=cv, scoring='neg_mean_squared_error', n_jobs=-1)
                     return -np.mean(scores)  # We minimize the objective
                 except Exception as e:
                     print(f"Error during cross-validation: {str(e)}")
                     return float('inf')  # Return worst possible score on error
 
+            def report(study, trial):
+                completed = [t for t in study.trials if t.value is not None and np.isfinite(t.value)]
+                progress.update(stage=f'trial {trial.number + 1}/{n_trials}', partial={
+                    'trials_completed': trial.number + 1,
+                    'best_value': float(study.best_value) if completed else None,
+                    'best_params': study.best_params if completed else None
+                })
+                if progress.cancelled():
+                    study.stop()
+
             study = optuna.create_study(direction='minimize')
-            study.optimize(objective, n_trials=n_trials)
+            study.optimize(objective, n_trials=n_trials, callbacks=[report] if progress is not None else None)
+            _check_cancelled(progress)
 
             return study.best_params
 
+        except JobCancelled:
+            self.logger.info("Hyperparameter tuning cancelled")
+            raise
         except Exception as e:
             self.logger.error(f"Error in hyperparameter tuning: {str(e)}")
             raise
@@ -672,26 +1123,76 @@ class MLProcessor:
             raise ValueError(f"Unknown model type: {model_type}")
 
     def save_model(self, filepath):
-        """Save the trained model"""
+        """Save the trained model together with the preprocessing pipeline it was trained behind.
+
+        The file holds {'model', 'preprocessing', 'target', 'problem_type', 'feature_names'};
+        `preprocessing.transform(rows)` turns raw rows into the model's input.
+        """
         try:
-            if self.model is None:
+            current = self.current_model
+            if current is None:
                 raise ValueError("No model has been trained yet")
+            entry = self.models[current['name']]
+            pipeline = entry.get('preprocessing')
+            split = current.get('split')
             
-            joblib.dump(self.model, filepath)
+            joblib.dump({
+                'model': entry['model'],
+                'preprocessing': pipeline,
+                'target': pipeline.target if pipeline is not None else self.target,
+                'problem_type': split.problem_type if split is not None else self.problem_type,
+                'feature_names': pipeline.feature_names if pipeline is not None else None
+            }, filepath)
             return {'message': f'Model saved successfully to {filepath}'}
             
         except Exception as e:
             self.logger.error(f"Error saving model: {str(e)}")
             raise
 
+    def predict(self, data, model_name=None):
+        """Score new rows with a trained model (default: the latest), running them through the
+        preprocessing pipeline fitted with it instead of refitting anything"""
+        try:
+            current = self.current_model
+            model_name = MODEL_ALIASES.get(model_name, model_name) or (current['name'] if current else None)
+            if model_name is None:
+                raise ValueError("No model has been trained yet")
+            if model_name not in self.models:
+                raise ValueError(f"Model {model_name} not found in trained models")
+            entry = self.models[model_name]
+            pipeline = entry.get('preprocessing')
+            if pipeline is None:
+                raise ValueError(f"Model {model_name} has no preprocessing pipeline; train it again to score new data")
+            
+            X = _model_input(model_name, pipeline.transform(data))
+            return {
+                'model': model_name,
+                'rows': X.shape[0],
+                'predictions': entry['model'].predict(X)
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Error in predict: {str(e)}")
+            raise
+
     def create_visualizations(self):
         """Create comprehensive visualizations"""
         try:
+            import plotly.graph_objects as go
+            from sklearn.model_selection import learning_curve
             plots = {}
+
+            # Plot the latest model against the split it was trained on
+            current = self.current_model or {}
+            model = self.model
+            split = current.get('split') or self.split
+            X_test = _model_input(current.get('name'), split.X_test) if split is not None else None
+            y_test = split.y_test if split is not None else None
+            problem_type = split.problem_type if split is not None else self.problem_type
             
             # Feature Importance Plot
-            if getattr(self, 'feature_importance', None):
-                sorted_features = sorted(self.feature_importance.items(), key=lambda x: x[1], reverse=True)
+            if current.get('importance'):
+                sorted_features = sorted(current['importance'].items(), key=lambda x: x[1], reverse=True)
                 feature_names = [x[0] for x in sorted_features]
                 importance_values = [x[1] for x in sorted_features]
                 
@@ -709,10 +1210,12 @@ class MLProcessor:
 
             # Learning Curves
             try:
-                if not getattr(self, 'model', None):
+                if not model:
                     raise ValueError("No trained model available for learning curves")
+                X, y = self._training_data(split)
+                X = _model_input(current.get('name'), X)
                 train_sizes, train_scores, test_scores = learning_curve(
-                    self.model, self.X, self.y,
+                    model, X, y,
                     cv=5, n_jobs=-1,
                     train_sizes=np.linspace(0.1, 1.0, 10)
                 )
@@ -759,22 +1262,22 @@ class MLProcessor:
 
             # Actual vs Predicted Plot
             try:
-                if not getattr(self, 'model', None):
+                if not model:
                     raise ValueError("No trained model available for prediction plot")
-                y_pred = self.model.predict(self.X_test)
+                y_pred = model.predict(X_test)
                 
-                if self.problem_type == 'regression':
+                if problem_type == 'regression':
                     fig = go.Figure(data=[
                         go.Scatter(
-                            x=self.y_test,
+                            x=y_test,
                             y=y_pred,
                             mode='markers',
                             marker=dict(size=8, opacity=0.6),
                             name='Test Data'
                         ),
                         go.Scatter(
-                            x=[min(self.y_test), max(self.y_test)],
-                            y=[min(self.y_test), max(self.y_test)],
+                            x=[min(y_test), max(y_test)],
+                            y=[min(y_test), max(y_test)],
                             mode='lines',
                             line=dict(color='red', dash='dash'),
                             name='Perfect Prediction'
@@ -787,11 +1290,11 @@ class MLProcessor:
                         height=500
                     )
                 else:  # Classification
-                    if hasattr(self.model, 'predict_proba'):
-                        y_proba = self.model.predict_proba(self.X_test)
+                    if hasattr(model, 'predict_proba'):
+                        y_proba = model.predict_proba(X_test)
                         fig = go.Figure()
                         for i in range(y_proba.shape[1]):
-                            mask = self.y_test == i
+                            mask = y_test == i
                             fig.add_trace(go.Box(
                                 y=y_proba[mask, i],
                                 name=f'Class {i}',
@@ -808,16 +1311,16 @@ class MLProcessor:
 
             # SHAP Values Plot
             try:
-                if self.X_test is not None and len(self.X_test) > 0 and getattr(self, 'model', None):
+                if X_test is not None and X_test.shape[0] > 0 and model:
                     import shap
-                    explainer = shap.TreeExplainer(self.model) if hasattr(self.model, 'estimators_') else shap.KernelExplainer(self.model.predict, shap.sample(self.X_test, 100))
-                    shap_values = explainer.shap_values(self.X_test.iloc[:100])  # Limit to 100 samples for performance
+                    explainer = shap.TreeExplainer(model) if hasattr(model, 'estimators_') else shap.KernelExplainer(model.predict, shap.sample(X_test, 100))
+                    shap_values = explainer.shap_values(X_test[:100] if is_sparse_matrix(X_test) else X_test.iloc[:100])  # Limit to 100 samples for performance
                     
                     if isinstance(shap_values, list):  # For multi-class classification
                         shap_values = np.abs(np.array(shap_values)).mean(0)  # Take mean of absolute values across classes
                     
                     feature_importance = np.abs(shap_values).mean(0)
-                    feature_importance_dict = dict(zip(self.X_test.columns, feature_importance))
+                    feature_importance_dict = dict(zip(split.feature_names, feature_importance))
                     sorted_features = sorted(feature_importance_dict.items(), key=lambda x: x[1], reverse=True)
                     
                     fig = go.Figure(data=[
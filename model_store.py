@@ -0,0 +1,224 @@
+import logging
+import os
+import shutil
+import sys
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Size of one node of a fitted scikit-learn tree (its NODE_DTYPE record)
+TREE_NODE_BYTES = 64
+
+
+def _entry_bytes(obj, seen=None, depth=0):
+    """Approximate memory held by a model entry, estimated from the arrays it references: the
+    entry's predictions and the fitted estimator's attributes (coef_, estimators_, tree_ nodes
+    and values, ...), walked without serializing anything. Other objects count their shallow size."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen or depth > 8:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, np.ndarray):
+        # Object arrays (e.g. the estimators_ of gradient boosting) hold references to what they contain
+        return int(obj.nbytes) + (sum(_entry_bytes(item, seen, depth + 1) for item in obj.flat)
+                                  if obj.dtype == object else 0)
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=False).sum())
+    if isinstance(obj, (pd.Series, pd.Index)):
+        return int(obj.memory_usage(deep=False))
+    if hasattr(obj, 'indptr') and hasattr(obj, 'data'):
+        # SciPy CSR/CSC matrix
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    if hasattr(obj, 'node_count') and hasattr(obj, 'value'):
+        # scikit-learn Tree: its node and value arrays are not attributes
+        return int(obj.node_count * TREE_NODE_BYTES + obj.value.nbytes)
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(_entry_bytes(value, seen, depth + 1) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(_entry_bytes(item, seen, depth + 1) for item in obj)
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return sys.getsizeof(obj) + _entry_bytes(vars(obj), seen, depth + 1)
+    # Shared singletons hold nothing of their own
+    return 0 if obj is None or isinstance(obj, bool) else sys.getsizeof(obj)
+
+
+class _Slot:
+    __slots__ = ('entry', 'path', 'size', 'revision', 'last_used')
+
+    def __init__(self, entry, size, revision):
+        self.entry = entry
+        self.path = None
+        self.size = size
+        self.revision = revision
+        self.last_used = time.time()
+
+
+class ModelStore(Mapping):
+    """
+    Trained models of one MLProcessor ({name: entry}), kept hot while in use.
+
+    Entries (fitted model, test predictions, metrics) idle for longer than
+    idle_seconds, or the least recently used ones once the resident entries
+    exceed max_bytes, are spilled to compressed joblib files under spill_dir
+    and dropped from memory. Reading an entry reloads it transparently. Without
+    a spill_dir (e.g. in training worker processes) everything stays in memory.
+    """
+
+    def __init__(self, spill_dir=None, idle_seconds=None, max_bytes=None, compress=3):
+        self.idle_seconds = idle_seconds
+        self.max_bytes = max_bytes
+        self.compress = compress
+        self.spill_dir = None
+        if spill_dir:
+            self.spill_dir = os.path.join(spill_dir, uuid.uuid4().hex)
+            # Spilled files belong to this store only
+            weakref.finalize(self, shutil.rmtree, self.spill_dir, True)
+        self._slots = OrderedDict()
+        self._revision = 0
+        self._lock = threading.RLock()
+        self.spills = 0
+        self.reloads = 0
+
+    def __getitem__(self, name):
+        with self._lock:
+            slot = self._slots[name]
+            self._slots.move_to_end(name)
+            slot.last_used = time.time()
+            if slot.entry is None:
+                self._reload(name, slot)
+            entry = slot.entry
+            self._enforce(keep=name)
+        return entry
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._slots))
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, name):
+        return name in self._slots
+
+    def put(self, name, entry):
+        """Store (or replace) an entry as the most recently used one"""
+        size = _entry_bytes(entry) if self.spill_dir else 0
+        with self._lock:
+            previous = self._slots.pop(name, None)
+            if previous is not None and previous.path:
+                self._remove_file(previous.path)
+            self._revision += 1
+            self._slots[name] = _Slot(entry, size, self._revision)
+            self._enforce(keep=name)
+
+    def revision(self, name):
+        """A number that changes whenever the entry stored under name is replaced"""
+        slot = self._slots.get(name)
+        return slot.revision if slot is not None else None
+
+    def resident_bytes(self):
+        with self._lock:
+            return sum(slot.size for slot in self._slots.values() if slot.entry is not None)
+
+    def sweep(self):
+        """Spill entries that have been idle for too long or do not fit the memory threshold;
+        returns how many were spilled"""
+        with self._lock:
+            spills = self.spills
+            self._enforce()
+            return self.spills - spills
+
+    def stats(self):
+        with self._lock:
+            return {
+                'models': len(self._slots),
+                'resident': sum(1 for slot in self._slots.values() if slot.entry is not None),
+                'resident_bytes': sum(slot.size for slot in self._slots.values() if slot.entry is not None),
+                'spilled_bytes': sum(os.path.getsize(slot.path) for slot in self._slots.values()
+                                     if slot.path and os.path.exists(slot.path)),
+                'spills': self.spills,
+                'reloads': self.reloads
+            }
+
+    def _enforce(self, keep=None):
+        if not self.spill_dir:
+            return
+        if self.idle_seconds is not None:
+            cutoff = time.time() - self.idle_seconds
+            for name, slot in self._slots.items():
+                if name != keep and slot.entry is not None and slot.last_used < cutoff:
+                    self._spill(name, slot)
+        if self.max_bytes is not None:
+            resident = sum(slot.size for slot in self._slots.values() if slot.entry is not None)
+            # Least recently used first
+            for name, slot in self._slots.items():
+                if resident <= self.max_bytes:
+                    break
+                if name != keep and slot.entry is not None:
+                    resident -= slot.size
+                    self._spill(name, slot)
+
+    def export(self, name, path):
+        """Write the entry stored under name to a joblib file at path. With a spill_dir the entry
+        is serialized once per revision: its spill file is written (if it was not yet) and linked
+        or copied to path, and spilling the entry later reuses it."""
+        import joblib
+
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with self._lock:
+            slot = self._slots[name]
+            if not self.spill_dir:
+                joblib.dump(slot.entry, tmp_path, compress=self.compress)
+            else:
+                source = self._write(slot)
+                try:
+                    os.link(source, tmp_path)
+                except OSError:
+                    # e.g. on another file system
+                    shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+
+    def _write(self, slot):
+        """Write a slot's entry to its spill file, once; the file stays valid as long as the slot"""
+        import joblib
+
+        if slot.path is None:
+            os.makedirs(self.spill_dir, exist_ok=True)
+            path = os.path.join(self.spill_dir, f'{slot.revision}.joblib')
+            joblib.dump(slot.entry, f'{path}.tmp', compress=self.compress)
+            os.replace(f'{path}.tmp', path)
+            slot.path = path
+        return slot.path
+
+    def _spill(self, name, slot):
+        try:
+            self._write(slot)
+            slot.entry = None
+            self.spills += 1
+            logger.info(f"Spilled model {name} ({slot.size / 1e6:.1f}MB) to {slot.path}")
+        except Exception as e:
+            logger.warning(f"Could not spill model {name}, keeping it in memory: {str(e)}")
+
+    def _reload(self, name, slot):
+        import joblib
+
+        start = time.perf_counter()
+        slot.entry = joblib.load(slot.path)
+        self.reloads += 1
+        # The file stays valid (the entry is never modified), so spilling it again is free
+        logger.info(f"Reloaded model {name} in {time.perf_counter() - start:.3f}s")
+
+    @staticmethod
+    def _remove_file(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
@@ -0,0 +1,498 @@
+import numpy as np
+import pandas as pd
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Part of every stored split's key: bump it whenever a change to the pipeline changes its output,
+# so splits persisted by an older version are recomputed instead of served
+PIPELINE_VERSION = 6
+# Columns with at most this many categories keep ordinal (label) codes
+ORDINAL_MAX_CATEGORIES = 32
+# In one-hot mode, columns with at most this many categories get one sparse indicator column each
+ONE_HOT_MAX_CATEGORIES = 1000
+# Columns where distinct values make up more than this share of the rows are identifier-like
+HASH_MIN_UNIQUE_RATIO = 0.5
+# Text columns this unique carry no signal a model can generalize from
+ID_MIN_UNIQUE_RATIO = 0.95
+# Columns where one value covers this share of the rows are (near) constant
+CONSTANT_MIN_SHARE = 0.995
+
+
+def _private_copy(frame):
+    """A frame the caller may write to without affecting frame. Under pandas copy-on-write (the app
+    turns it on) it shares frame's column buffers and a write copies only that column; otherwise
+    it is a deep copy."""
+    return frame.copy(deep=getattr(pd.options.mode, 'copy_on_write', False) is not True)
+
+
+def _codes(values, classes, missing_code=None):
+    """Vectorized lookup of each value's position in classes (-1 if absent); missing values
+    get missing_code if one is given"""
+    codes = pd.Categorical(values, categories=classes).codes.astype(np.int64)
+    if missing_code is not None:
+        codes[values.isna().to_numpy()] = missing_code
+    return codes
+
+
+class OrdinalEncoding:
+    """Sorted-category codes, as LabelEncoder assigns them; unseen categories become -1"""
+
+    name = 'ordinal'
+
+    def fit_transform(self, values, y=None):
+        from sklearn.preprocessing import LabelEncoder
+
+        classes = LabelEncoder().fit(values).classes_
+        self.classes = [value for value in classes if not pd.isna(value)]
+        # LabelEncoder sorts a missing value (left by the imputer, e.g. None) after the others
+        self.missing_code = len(self.classes) if len(self.classes) < len(classes) else None
+        return self.transform(values)
+
+    def transform(self, values):
+        return _codes(values, self.classes, self.missing_code).astype(np.float64)
+
+
+class OneHotEncoding:
+    """
+    One indicator column per category, built directly as a SciPy CSR block
+    (one stored value per row) instead of a dense frame. Missing values get an
+    indicator of their own; unseen categories leave the row empty.
+    """
+
+    name = 'onehot'
+
+    def fit_transform(self, values, y=None):
+        self.classes = sorted(values.dropna().unique(), key=str)
+        self.has_missing = bool(values.isna().any())
+        return self.transform(values)
+
+    def transform(self, values):
+        from scipy import sparse
+
+        codes = _codes(values, self.classes, len(self.classes) if self.has_missing else None)
+        present = codes >= 0
+        indptr = np.concatenate([[0], np.cumsum(present)])
+        return sparse.csr_matrix((np.ones(int(present.sum())), codes[present], indptr),
+                                 shape=(len(codes), self.width))
+
+    @property
+    def width(self):
+        return len(self.classes) + (1 if self.has_missing else 0)
+
+    def feature_names(self, column):
+        return [f'{column}={value}' for value in self.classes] + ([f'{column}=<missing>'] if self.has_missing else [])
+
+
+class FrequencyEncoding:
+    """Share of the training rows holding each category; unseen categories become 0"""
+
+    name = 'frequency'
+
+    def fit_transform(self, values, y=None):
+        frequencies = values.value_counts(normalize=True)
+        self.classes = list(frequencies.index)
+        # One slot per class, then missing values, then unseen categories (code -1)
+        self.frequencies = np.append(frequencies.to_numpy(dtype=np.float64),
+                                     [float(values.isna().mean()), 0.0])
+        return self.transform(values)
+
+    def transform(self, values):
+        return self.frequencies[_codes(values, self.classes, len(self.classes))]
+
+
+class HashEncoding:
+    """Stable hash bucket of each value, for identifier-like columns with no useful order"""
+
+    name = 'hashed'
+
+    def __init__(self, buckets=1024):
+        self.buckets = buckets
+
+    def fit_transform(self, values, y=None):
+        return self.transform(values)
+
+    def transform(self, values):
+        hashed = pd.util.hash_array(values.astype(str).to_numpy(dtype=object))
+        return (hashed % np.uint64(self.buckets)).astype(np.float64)
+
+
+class TargetEncoding:
+    """
+    Smoothed mean target per category. Training rows are encoded out of fold
+    (from the other folds' rows only), so a row never sees its own target;
+    new rows use the statistics of all training rows.
+    """
+
+    name = 'target'
+
+    def __init__(self, folds=5, smoothing=10.0, random_state=42):
+        self.folds = folds
+        self.smoothing = smoothing
+        self.random_state = random_state
+
+    def fit_transform(self, values, y=None):
+        codes, classes = pd.factorize(values)
+        self.classes = list(classes)
+        # Missing values are one more category; unseen ones (code -1) get the prior
+        codes[codes == -1] = len(self.classes)
+        n_classes = len(self.classes) + 1
+        target = np.asarray(y, dtype=np.float64)
+        self.prior = float(target.mean())
+
+        sums = np.bincount(codes, weights=target, minlength=n_classes)
+        counts = np.bincount(codes, minlength=n_classes).astype(np.float64)
+        self.means = np.append(self._smooth(sums, counts), self.prior)
+
+        fold_of_row = np.random.RandomState(self.random_state).randint(0, self.folds, len(codes))
+        encoded = np.empty(len(codes), dtype=np.float64)
+        for fold in range(self.folds):
+            in_fold = fold_of_row == fold
+            fold_sums = np.bincount(codes[in_fold], weights=target[in_fold], minlength=n_classes)
+            fold_counts = np.bincount(codes[in_fold], minlength=n_classes)
+            encoded[in_fold] = self._smooth(sums - fold_sums, counts - fold_counts)[codes[in_fold]]
+        return encoded
+
+    def transform(self, values):
+        return self.means[_codes(values, self.classes, len(self.classes))]
+
+    def _smooth(self, sums, counts):
+        return (sums + self.prior * self.smoothing) / (counts + self.smoothing)
+
+
+# Encodings preprocess_data can pick from (or be told to use per column)
+CATEGORICAL_ENCODERS = {encoder.name: encoder for encoder in
+                        (OrdinalEncoding, OneHotEncoding, FrequencyEncoding, HashEncoding, TargetEncoding)}
+
+
+def choose_encoding(n_unique, n_rows, target_encodable, one_hot=False):
+    """Pick an encoding for a categorical column from its cardinality"""
+    if one_hot and n_unique <= ONE_HOT_MAX_CATEGORIES and \
+            (n_unique <= ORDINAL_MAX_CATEGORIES or n_unique <= n_rows * HASH_MIN_UNIQUE_RATIO):
+        return 'onehot'
+    if n_unique <= ORDINAL_MAX_CATEGORIES:
+        return 'ordinal'
+    if n_unique > n_rows * HASH_MIN_UNIQUE_RATIO:
+        return 'hashed'
+    return 'target' if target_encodable else 'frequency'
+
+
+def is_sparse_matrix(matrix):
+    """Whether a feature matrix is a SciPy sparse matrix rather than a frame"""
+    return hasattr(matrix, 'tocsr')
+
+
+def matrix_bytes(matrix):
+    """Memory held by a dense frame/array or by the buffers of a sparse matrix"""
+    if is_sparse_matrix(matrix):
+        matrix = matrix.tocsr()
+        return int(matrix.data.nbytes + matrix.indices.nbytes + matrix.indptr.nbytes)
+    if isinstance(matrix, pd.DataFrame):
+        return int(matrix.memory_usage(index=False).sum())
+    return int(np.asarray(matrix).nbytes)
+
+
+def find_uninformative_columns(X, keep=()):
+    """
+    Fast profiling pass over raw feature columns; returns {column: reason} for
+    columns that would only add width to the model:
+
+    - constant: one value (missing included) or, for numbers, zero variance
+    - near-constant: one value covers at least CONSTANT_MIN_SHARE of the rows
+      (entropy close to zero)
+    - identifier: text columns whose uniqueness ratio is at least
+      ID_MIN_UNIQUE_RATIO, or integer columns holding a distinct value per row
+      that together form one run of consecutive integers (a row number, in any
+      order). Only the whole dataset shows that, so run this before splitting.
+
+    Only columns with few distinct values are counted in full, so the pass costs
+    about one hash of each column.
+    """
+    n_rows = len(X)
+    if n_rows == 0:
+        return {}
+    unique_counts = X.nunique(dropna=False)
+    # A value covering CONSTANT_MIN_SHARE of the rows leaves room for few others
+    max_unique_near_constant = int(n_rows * (1 - CONSTANT_MIN_SHARE)) + 1
+    flagged = {}
+    for col in X.columns:
+        if col in keep:
+            continue
+        values = X[col]
+        n_unique = int(unique_counts[col])
+        ratio = n_unique / n_rows
+        if n_unique <= 1:
+            flagged[col] = 'constant'
+        elif pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values) \
+                and values.notna().all() and values.std() == 0:
+            flagged[col] = 'constant'
+        elif n_unique <= max_unique_near_constant and n_rows >= 1000 and \
+                values.value_counts(normalize=True, dropna=False).iloc[0] >= CONSTANT_MIN_SHARE:
+            flagged[col] = 'near-constant'
+        elif (values.dtype == object or isinstance(values.dtype, pd.CategoricalDtype)
+              or pd.api.types.is_string_dtype(values)) and ratio >= ID_MIN_UNIQUE_RATIO:
+            flagged[col] = f'identifier ({ratio:.0%} unique)'
+        elif pd.api.types.is_integer_dtype(values) and n_unique == n_rows and n_rows >= 100 \
+                and values.notna().all() and int(values.max()) - int(values.min()) == n_rows - 1:
+            flagged[col] = 'identifier (row number)'
+    return flagged
+
+
+def _numeric_target(y, is_classification):
+    """The target as numbers target encoding can average, or None (multi-class targets)"""
+    if y is None:
+        return None
+    if not is_classification:
+        return pd.to_numeric(y, errors='coerce').fillna(0).to_numpy(dtype=np.float64)
+    classes = pd.unique(y.dropna())
+    if len(classes) != 2:
+        return None
+    # Binary targets: rate of the second (sorted) class
+    return (y == sorted(classes)[1]).to_numpy(dtype=np.float64)
+
+
+class PreprocessingPipeline:
+    """
+    The feature preprocessing of one preprocess_data run, fitted once.
+
+    fit_transform() learns the column roles, imputation values, category
+    encodings and scaling from the training frame; transform() applies exactly
+    those to new rows with vectorized operations and no refitting, so a model
+    can score data it has never seen. The pipeline pickles with the model.
+
+    With one_hot=True, categorical columns of moderate cardinality are one-hot
+    encoded and the features come out as a SciPy CSR matrix (the dense features
+    first, then the indicator blocks) instead of a frame.
+
+    With precision='float32', numeric columns are cast before imputation and
+    scaling and every encoded column is produced in float32, so the features
+    never exist in float64.
+    """
+
+    # Defaults for pipelines pickled (with their models) before these attributes existed
+    date_formats = {}
+    date_part_cols = []
+
+    def __init__(self, target=None, encodings=None, drop_uninformative=True, keep_columns=None, one_hot=False,
+                 precision='float64', date_formats=None):
+        if precision not in ('float32', 'float64'):
+            raise ValueError(f"Unknown precision '{precision}'; use float32 or float64")
+        self.target = target
+        # Requested encoding per column (a CATEGORICAL_ENCODERS name); others are chosen by cardinality
+        self.requested_encodings = dict(encodings or {})
+        self.drop_uninformative = drop_uninformative
+        self.keep_columns = list(keep_columns or [])
+        # Column -> why it was left out of the features (see find_uninformative_columns)
+        self.dropped_columns = {}
+        self.dropped_features = 0
+        self.columns_selected = False
+        self.one_hot = one_hot
+        self.dtype = np.dtype(precision)
+        # Whether the output is a CSR matrix, and the names of its dense leading columns
+        self.sparse = False
+        self.dense_feature_names = None
+        self.input_columns = None
+        self.numeric_cols = []
+        self.categorical_cols = []
+        self.datetime_cols = []
+        # {datetime column: the format it was parsed with at load}, so new rows given as text parse alike
+        self.date_formats = dict(date_formats or {})
+        # Year/month/day columns expanded from datetime_cols; imputed and scaled like the numeric ones
+        self.date_part_cols = []
+        self.num_imputer = None
+        self.cat_imputer = None
+        # column -> fitted categorical encoder
+        self.encoders = {}
+        self.scaler = None
+        self.feature_names = None
+        self.steps = []
+
+    def select_columns(self, X):
+        """Decide which columns are uninformative from X, normally the whole dataset before it is
+        split (row numbers are only recognizable in full); fit_transform then drops them.
+        Without a call, fit_transform decides on the rows it is given."""
+        if self.drop_uninformative:
+            # Columns the caller asked for (e.g. with an explicit encoding) are always kept
+            keep = set(self.keep_columns) | set(self.requested_encodings)
+            self.dropped_columns = find_uninformative_columns(X, keep=keep)
+        self.columns_selected = True
+        return self.dropped_columns
+
+    def fit_transform(self, X, y=None, is_classification=None):
+        """Fit every step on X (and the target y, for target encoding) and return the transformed features"""
+        from sklearn.preprocessing import StandardScaler
+        from sklearn.impute import SimpleImputer
+
+        X = _private_copy(X)
+        steps = []
+        if not self.columns_selected:
+            self.select_columns(X)
+        if self.dropped_columns:
+            # Datetime columns would have become three features each
+            self.dropped_features = sum(3 if pd.api.types.is_datetime64_any_dtype(X[col]) else 1
+                                        for col in self.dropped_columns)
+            X = X.drop(columns=list(self.dropped_columns))
+            steps.extend(f"Dropped {reason} column: {col}" for col, reason in self.dropped_columns.items())
+
+        self.input_columns = list(X.columns)
+        self.numeric_cols = list(X.select_dtypes(include=[np.number]).columns)
+        self.categorical_cols = list(X.select_dtypes(include=['object', 'category']).columns)
+        self.datetime_cols = list(X.select_dtypes(include=['datetime64']).columns)
+        self.date_formats = {col: fmt for col, fmt in self.date_formats.items() if col in self.datetime_cols}
+        self.date_part_cols = [f'{col}_{part}' for col in self.datetime_cols for part in ('year', 'month', 'day')]
+
+        X = self._cast_numeric(self._expand_datetimes(X))
+        steps.extend(f"Extracted year, month, day from {col}" for col in self.datetime_cols)
+
+        # Imputers are fitted even without missing values, so new rows with gaps can still be scored
+        has_missing = X.isnull().sum().sum() > 0
+        if self._continuous_cols:
+            self.num_imputer = SimpleImputer(strategy='mean').fit(X[self._continuous_cols])
+        if self.categorical_cols:
+            self.cat_imputer = SimpleImputer(strategy='most_frequent').fit(X[self.categorical_cols])
+        if has_missing:
+            X = self._impute(X)
+            if self._continuous_cols:
+                steps.append("Imputed missing numeric values with mean")
+            if self.categorical_cols:
+                steps.append("Imputed missing categorical values with mode")
+
+        blocks = []
+        if self.categorical_cols:
+            X, blocks = self._fit_encoders(X, _numeric_target(y, is_classification), steps)
+
+        if self._continuous_cols:
+            self.scaler = StandardScaler().fit(X[self._continuous_cols])
+            X = self._scale(X)
+            steps.append("Scaled numeric features")
+
+        self.dense_feature_names = list(X.columns)
+        self.feature_names = self.dense_feature_names + [
+            name for col, encoder in self.encoders.items() if encoder.name == 'onehot'
+            for name in encoder.feature_names(col)]
+        self.sparse = bool(blocks)
+        if self.sparse:
+            steps.append(f"Built a sparse CSR feature matrix ({len(self.feature_names)} features)")
+        if self.dtype == np.float32:
+            steps.append("Kept features in float32")
+        self.steps = steps
+        return self._assemble(X, blocks)
+
+    def transform(self, X):
+        """Apply the fitted steps to new rows (the target column, if present, is ignored)"""
+        if self.feature_names is None:
+            raise ValueError("Preprocessing pipeline has not been fitted")
+        missing = [col for col in self.input_columns if col not in X.columns]
+        if missing:
+            raise ValueError(f"Missing columns: {missing}")
+        X = _private_copy(X[self.input_columns])
+
+        # Rows from JSON or CSV may carry numbers and dates as strings
+        for col in self.numeric_cols:
+            if not pd.api.types.is_numeric_dtype(X[col]):
+                X[col] = pd.to_numeric(X[col], errors='coerce')
+        for col in self.datetime_cols:
+            if not pd.api.types.is_datetime64_any_dtype(X[col]):
+                X[col] = pd.to_datetime(X[col], format=self.date_formats.get(col), errors='coerce')
+
+        X = self._impute(self._cast_numeric(self._expand_datetimes(X)))
+        X, blocks = self._encode(X)
+        if self.scaler is not None:
+            X = self._scale(X)
+        return self._assemble(X[self.dense_feature_names], blocks)
+
+    def _expand_datetimes(self, X):
+        for col in self.datetime_cols:
+            X[f'{col}_year'] = X[col].dt.year
+            X[f'{col}_month'] = X[col].dt.month
+            X[f'{col}_day'] = X[col].dt.day
+            X = X.drop(columns=[col])
+        return X
+
+    @property
+    def _continuous_cols(self):
+        return self.numeric_cols + self.date_part_cols
+
+    def _cast_numeric(self, X):
+        if self.dtype != np.float64 and self._continuous_cols:
+            X[self._continuous_cols] = X[self._continuous_cols].astype(self.dtype)
+        return X
+
+    def _impute(self, X):
+        if self.num_imputer is not None:
+            X[self._continuous_cols] = self.num_imputer.transform(X[self._continuous_cols])
+        if self.cat_imputer is not None:
+            X[self.categorical_cols] = self.cat_imputer.transform(X[self.categorical_cols])
+        return X
+
+    def _fit_encoders(self, X, target, steps):
+        """Pick and fit an encoder per categorical column and write all dense encoded columns at once;
+        returns the frame and the sparse one-hot blocks"""
+        unique_counts = X[self.categorical_cols].nunique(dropna=False)
+        encoded = {}
+        for col in self.categorical_cols:
+            name = self.requested_encodings.get(col) or choose_encoding(
+                int(unique_counts[col]), len(X), target is not None, one_hot=self.one_hot)
+            if name not in CATEGORICAL_ENCODERS:
+                raise ValueError(f"Unknown encoding '{name}' for column {col}; "
+                                 f"choose from {sorted(CATEGORICAL_ENCODERS)}")
+            if name == 'target' and target is None:
+                raise ValueError(f"Target encoding of {col} needs a regression or binary target")
+            encoder = CATEGORICAL_ENCODERS[name]()
+            encoded[col] = encoder.fit_transform(X[col], target)
+            self.encoders[col] = encoder
+            steps.append(f"Encoded categorical column: {col} ({name}, {int(unique_counts[col])} categories)")
+        return self._place_encoded(X, encoded)
+
+    def _encode(self, X):
+        return self._place_encoded(X, {col: encoder.transform(X[col]) for col, encoder in self.encoders.items()})
+
+    def _place_encoded(self, X, encoded):
+        """Write dense encodings into X in one assignment; one-hot columns leave X as sparse blocks"""
+        dense = [col for col, encoder in self.encoders.items() if encoder.name != 'onehot']
+        one_hot = [col for col, encoder in self.encoders.items() if encoder.name == 'onehot']
+        if dense:
+            X[dense] = np.column_stack([encoded[col] for col in dense]).astype(self.dtype, copy=False)
+        if one_hot:
+            X = X.drop(columns=one_hot)
+        return X, [encoded[col] for col in one_hot]
+
+    def _assemble(self, X, blocks):
+        """The output matrix: X itself, or X followed by the one-hot blocks as one CSR matrix"""
+        if not self.sparse:
+            # float64 keeps integer columns (e.g. datetime parts) as they are
+            return X.astype(self.dtype) if self.dtype != np.float64 else X
+        from scipy import sparse
+
+        dense = sparse.csr_matrix(X.to_numpy(dtype=self.dtype)) if X.shape[1] else None
+        return sparse.hstack(([dense] if dense is not None else []) + blocks, format='csr', dtype=self.dtype)
+
+    def _scale(self, X):
+        X[self._continuous_cols] = self.scaler.transform(X[self._continuous_cols])
+        return X
+
+    def estimated_savings(self):
+        """Training width removed by dropping uninformative columns. Tree learners scan every
+        feature at every split, so fit time shrinks roughly in proportion to the width."""
+        kept = len(self.feature_names or [])
+        total = kept + self.dropped_features
+        share = self.dropped_features / total if total else 0.0
+        return {
+            'features_dropped': self.dropped_features,
+            'features_kept': kept,
+            'estimated_fit_time_reduction_pct': round(share * 100, 1)
+        }
+
+    def to_dict(self):
+        return {
+            'target': self.target,
+            'input_columns': self.input_columns,
+            'numeric_columns': self.numeric_cols,
+            'categorical_columns': self.categorical_cols,
+            'datetime_columns': self.datetime_cols,
+            'date_formats': self.date_formats,
+            'encodings': {col: encoder.name for col, encoder in self.encoders.items()},
+            'dropped_columns': self.dropped_columns,
+            'precision': self.dtype.name,
+            'feature_names': self.feature_names
+        }
@@ -0,0 +1,136 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Numeric columns are profiled in blocks of at most this many bytes (as float64)
+PROFILE_BLOCK_BYTES = 64 * 1024 * 1024
+QUANTILES = (0.25, 0.5, 0.75)
+
+
+def _numeric_block_stats(values):
+    """Per-column statistics of a 2-D float64 array (rows x columns, NaN for missing),
+    computed for all columns at once. The array is sorted in place."""
+    n_rows, n_cols = values.shape
+    present = ~np.isnan(values)
+    count = present.sum(axis=0)
+    total = np.where(present, values, 0.0).sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        centered = np.where(present, values - mean, 0.0)
+        squared = centered * centered
+        m2 = squared.sum(axis=0) / count
+        m3 = (squared * centered).sum(axis=0) / count
+        del centered, squared
+        # Same conventions as pandas: sample std (ddof=1) and adjusted Fisher-Pearson skewness
+        std = np.where(count > 1, np.sqrt(m2 * count / (count - 1)), np.nan)
+        m2 = np.where(np.abs(m2) < 1e-14, 0.0, m2)
+        skew = np.where(m2 == 0, 0.0,
+                        np.sqrt(count * (count - 1)) / (count - 2) * m3 / m2 ** 1.5)
+        skew = np.where(count > 2, skew, np.nan)
+
+    # Missing values sort last, so each column's values are its first `count` rows
+    values.sort(axis=0)
+    columns = np.arange(n_cols)
+    last = np.maximum(count - 1, 0)
+    empty = count == 0
+    stats = {
+        'count': count,
+        'sum': total,
+        'mean': mean,
+        'std': std,
+        'skew': skew,
+        'min': np.where(empty, np.nan, values[0, columns]) if n_rows else np.full(n_cols, np.nan),
+        'max': np.where(empty, np.nan, values[last, columns]) if n_rows else np.full(n_cols, np.nan),
+    }
+    for q in QUANTILES:
+        position = q * last
+        low = np.floor(position).astype(np.intp)
+        high = np.ceil(position).astype(np.intp)
+        if n_rows:
+            below, above = values[low, columns], values[high, columns]
+            with np.errstate(invalid='ignore'):
+                quantile = below + (above - below) * (position - low)
+            stats[f'{q:.0%}'] = np.where(empty, np.nan, quantile)
+        else:
+            stats[f'{q:.0%}'] = np.full(n_cols, np.nan)
+    if n_rows > 1:
+        changes = (values[1:] != values[:-1]) & (np.arange(n_rows - 1)[:, None] < last[None, :])
+        stats['unique'] = changes.sum(axis=0) + (count > 0)
+    else:
+        stats['unique'] = (count > 0).astype(np.intp)
+    return stats
+
+
+class DataProfile:
+    """
+    Per-column statistics of a frame, computed once and shared by every consumer
+    (EDA, bias analysis, business intelligence).
+
+    Numeric columns are profiled together in one vectorized pass over their
+    float64 block: counts, sums, moments (mean, std, skew), min/max, quartiles
+    and cardinality all come from the same array, sorted once. The remaining
+    columns get their null counts and cardinalities in one pass over the
+    non-numeric block. Nothing is computed until the first statistic is read.
+    """
+
+    def __init__(self, frame):
+        self.frame = frame
+        self._columns = None
+        self._lock = threading.Lock()
+
+    @property
+    def columns(self):
+        """{column: {'dtype', 'missing', 'unique'} plus, for numeric columns, 'count', 'sum',
+        'mean', 'std', 'skew', 'min', '25%', '50%', '75%' and 'max'}"""
+        if self._columns is None:
+            with self._lock:
+                if self._columns is None:
+                    self._columns = self._profile()
+        return self._columns
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    @property
+    def numeric_columns(self):
+        return [name for name, stats in self.columns.items() if 'mean' in stats]
+
+    @property
+    def missing_total(self):
+        return sum(stats['missing'] for stats in self.columns.values())
+
+    def is_numeric(self, column):
+        return 'mean' in self.columns[column]
+
+    def _profile(self):
+        frame = self.frame
+        numeric = list(frame.select_dtypes(include=[np.number]).columns)
+        numeric_set = set(numeric)
+        others = [col for col in frame.columns if col not in numeric_set]
+        columns = {col: {'dtype': str(frame[col].dtype)} for col in frame.columns}
+
+        block_size = max(1, PROFILE_BLOCK_BYTES // max(8 * len(frame), 1))
+        for start in range(0, len(numeric), block_size):
+            names = numeric[start:start + block_size]
+            values = frame[names].to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+            stats = _numeric_block_stats(values)
+            for i, col in enumerate(names):
+                entry = columns[col]
+                entry['missing'] = int(len(frame) - stats['count'][i])
+                entry['unique'] = int(stats['unique'][i])
+                entry['count'] = int(stats['count'][i])
+                for name in ('sum', 'mean', 'std', 'skew', 'min', '25%', '50%', '75%', 'max'):
+                    entry[name] = float(stats[name][i])
+
+        if others:
+            block = frame[others]
+            missing = block.isna().sum()
+            unique = block.nunique()
+            for col in others:
+                columns[col]['missing'] = int(missing[col])
+                columns[col]['unique'] = int(unique[col])
+        return columns
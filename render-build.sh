@@ -2,3 +2,5 @@
 # Pre-install numpy to ensure it is available for pmdarima and other scientific packages
 pip install numpy
 pip install -r requirements.txt
+# Build the example-dataset snapshots that are not committed (California Housing is downloaded)
+python example_datasets.py --missing || echo "Some example dataset snapshots could not be built; they are built on first load"
@@ -17,7 +17,7 @@ class BusinessReporter:
         
     def generate_executive_summary(self):
         """Generate executive summary report"""
-        insights = self.bi.insights
+        insights = self.bi.ensure_insights()
         
         summary = {
             'title': 'Business Intelligence Executive Summary',
@@ -38,7 +38,7 @@ class BusinessReporter:
     def _extract_key_findings(self):
         """Extract key findings from analysis"""
         findings = []
-        insights = self.bi.insights
+        insights = self.bi.ensure_insights()
         
         # Revenue findings
         if 'business_kpis' in insights:
@@ -72,7 +72,7 @@ class BusinessReporter:
             'opportunity_score': 'Medium'
         }
         
-        insights = self.bi.insights
+        insights = self.bi.ensure_insights()
         
         # Revenue impact
         if 'business_kpis' in insights:
@@ -135,7 +135,7 @@ class BusinessReporter:
     
     def generate_detailed_report(self):
         """Generate detailed technical report"""
-        insights = self.bi.insights
+        insights = self.bi.ensure_insights()
         
         report = {
             'title': 'Detailed Business Intelligence Report',
@@ -153,12 +153,12 @@ class BusinessReporter:
     def _assess_data_quality(self):
         """Assess overall data quality"""
         data = self.bi.data
-        overview = self.bi.insights['data_overview']
+        overview = self.bi.ensure_insights()['data_overview']
         
         quality_score = 100
         
         # Deduct points for missing data
-        total_missing = sum(overview['missing_data'].values())
+        total_missing = sum(overview['missing_values'].values())
         missing_percentage = (total_missing / (len(data) * len(data.columns))) * 100
         quality_score -= missing_percentage * 2
         
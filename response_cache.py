@@ -0,0 +1,77 @@
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """
+    LRU cache of rendered responses of read-only analysis endpoints.
+
+    Entries are keyed by (dataset fingerprint, endpoint, normalized query
+    parameters), so a workspace whose dataset changes simply stops matching
+    its old entries; invalidate() frees them early. The cache holds at most
+    max_bytes of response bodies, evicting the least recently used first.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(fingerprint, endpoint, params, *extra):
+        """Build a cache key; parameter order and repeated blank values do not matter"""
+        normalized = tuple(sorted((name, tuple(values)) for name, values in params.lists() if any(values)))
+        return (fingerprint, endpoint, normalized) + extra
+
+    def get(self, key):
+        """Return the cached (body, status, mimetype) for key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, body, status=200, mimetype='application/json'):
+        """Store a response body, evicting least recently used entries to stay within budget"""
+        size = len(body)
+        if size > self.max_bytes:
+            return False
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= len(previous[0])
+            self._entries[key] = (body, status, mimetype)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (evicted, _, _) = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+        return True
+
+    def invalidate(self, fingerprint):
+        """Drop every entry computed from a dataset"""
+        with self._lock:
+            stale = [key for key in self._entries if key[0] == fingerprint]
+            for key in stale:
+                self._bytes -= len(self._entries.pop(key)[0])
+        if stale:
+            logger.info(f"Invalidated {len(stale)} cached responses for dataset {str(fingerprint)[:12]}")
+        return len(stale)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses
+            }
@@ -1,32 +1,34 @@
 #!/usr/bin/env python3
 """
 AutoML Business Decision Assistant - Startup Script
+
+With FLASK_CONFIG=production (or --production) the app is served by gunicorn
+with WEB_CONCURRENCY worker processes (default: one per core). Workers share
+datasets, splits, models and job status through the on-disk stores under
+uploads/, so any worker can serve any request.
 """
 
 import os
 import sys
-from app import app
+import logging
 from config import config
 
-def main():
-    """Main application entry point"""
-    
-    # Get configuration from environment
-    config_name = os.environ.get('FLASK_CONFIG', 'development')
-    
-    # Initialize application
+def configure_app(app, config_name):
+    """Apply the configuration and logging for one server process"""
     app.config.from_object(config[config_name])
     config[config_name].init_app(app)
     
     # Set up logging
     if not app.debug:
-        import logging
         from logging.handlers import RotatingFileHandler
         
         if not os.path.exists('logs'):
-            os.mkdir('logs')
+            os.makedirs('logs', exist_ok=True)
         
-        file_handler = RotatingFileHandler('logs/automl_business_assistant.log', 
+        # One file per process: rotating a shared file from several workers loses records
+        log_name = 'automl_business_assistant.log' if config_name != 'production' else \
+            f'automl_business_assistant.{os.getpid()}.log'
+        file_handler = RotatingFileHandler(os.path.join('logs', log_name),
                                          maxBytes=10240, backupCount=10)
         file_handler.setFormatter(logging.Formatter(
             '%(asctime)s %(levelname)s: %(message)s [in %(pathname)s:%(lineno)d]'
@@ -36,8 +38,44 @@ def main():
         
         app.logger.setLevel(logging.INFO)
         app.logger.info('AutoML Business Decision Assistant startup')
+    return app
+
+def run_production(config_name):
+    """Serve the app with gunicorn worker processes"""
+    from gunicorn.app.base import BaseApplication
+
+    settings = config[config_name]
+
+    class ProductionServer(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f"0.0.0.0:{int(os.environ.get('PORT', 5000))}")
+            self.cfg.set('workers', settings.WEB_CONCURRENCY)
+            self.cfg.set('threads', settings.WEB_THREADS)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('timeout', settings.WEB_TIMEOUT)
+
+        def load(self):
+            # Imported in each worker after the fork, so no worker inherits another's pools or clients
+            from app import app
+            return configure_app(app, config_name)
+
+    ProductionServer().run()
+
+def main():
+    """Main application entry point"""
+    
+    # Get configuration from environment
+    config_name = os.environ.get('FLASK_CONFIG', 'development')
+    if '--production' in sys.argv[1:]:
+        config_name = 'production'
+    
+    if config_name == 'production':
+        run_production(config_name)
+        return
     
-    # Run the application
+    # Run the development server (single process)
+    from app import app
+    configure_app(app, config_name)
     app.run(
         host='0.0.0.0',
         port=int(os.environ.get('PORT', 5000)),
@@ -45,4 +83,4 @@ def main():
     )
 
 if __name__ == '__main__':
-    main() 
\ No newline at end of file
+    main()
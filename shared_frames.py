@@ -0,0 +1,229 @@
+import numpy as np
+import pandas as pd
+import logging
+import threading
+import uuid
+import weakref
+from multiprocessing import shared_memory
+
+logger = logging.getLogger(__name__)
+
+
+class SharedFrame:
+    """
+    Picklable handle to a DataFrame published as named shared-memory blocks.
+
+    Only the column layout travels through a pickle: numeric, boolean and
+    datetime columns are one block each, and categorical/string columns are
+    stored as integer codes with their categories kept in the handle. attach()
+    in any process on the same host rebuilds the frame as zero-copy views.
+    """
+
+    def __init__(self, key, rows, columns):
+        self.key = key
+        self.rows = rows
+        # [(column, block name, dtype str, categories or None)]
+        self.columns = columns
+
+    def attach(self, columns=None):
+        """Return the frame (or some of its columns) as read-only views over the shared blocks,
+        valid until detach()"""
+        data = {}
+        for column, block_name, dtype, categories in self.columns:
+            if columns is not None and column not in columns:
+                continue
+            values = np.ndarray((self.rows,), dtype=np.dtype(dtype), buffer=_open_block(block_name).buf)
+            values.flags.writeable = False
+            if categories is not None:
+                values = pd.Categorical.from_codes(values, categories=categories)
+            data[column] = values
+        return pd.DataFrame(data, copy=False)
+
+    def detach(self):
+        """Close this process's mappings of the blocks (the publisher still owns them)"""
+        for _, block_name, _, _ in self.columns:
+            block = _attached.pop(block_name, None)
+            if block is not None:
+                try:
+                    block.close()
+                except BufferError:
+                    # A view is still alive; the mapping goes away with the process
+                    _attached[block_name] = block
+
+
+# Blocks this process has attached to, kept open while views over them may exist
+_attached = {}
+_attached_lock = threading.Lock()
+
+
+def _open_block(name):
+    with _attached_lock:
+        block = _attached.get(name)
+        if block is None:
+            block = _attached[name] = shared_memory.SharedMemory(name=name)
+        return block
+
+
+def _column_layout(values):
+    """Split a column into (contiguous fixed-width array, categories or None)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return np.asarray(values.cat.codes), list(values.cat.categories)
+    if values.dtype == object or pd.api.types.is_string_dtype(values.dtype):
+        categorical = values.astype('category')
+        return np.asarray(categorical.cat.codes), list(categorical.cat.categories)
+    if isinstance(values.dtype, pd.DatetimeTZDtype):
+        return np.ascontiguousarray(values.dt.tz_convert(None).to_numpy()), None
+    if pd.api.types.is_extension_array_dtype(values.dtype):
+        # Nullable ints/floats/booleans: float64 keeps missing values as NaN
+        return values.to_numpy(dtype=np.float64, na_value=np.nan), None
+    return np.ascontiguousarray(values.to_numpy()), None
+
+
+class SharedFrameStore:
+    """
+    Reference-counted publisher of SharedFrames, keyed by dataset fingerprint.
+
+    acquire() publishes a frame the first time and otherwise hands out the
+    existing blocks; release() unlinks them once the last holder is done, so
+    concurrent fan-outs over the same dataset share one copy in shared memory.
+    """
+
+    def __init__(self):
+        self._frames = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key, frame):
+        """Return a SharedFrame for frame under key, publishing it if needed"""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                entry = self._frames[key] = [*self._publish(key, frame), 0]
+            entry[2] += 1
+            return entry[0]
+
+    def release(self, key):
+        """Drop one reference; the shared blocks are freed when none are left"""
+        with self._lock:
+            entry = self._frames.get(key)
+            if entry is None:
+                return
+            entry[2] -= 1
+            if entry[2] > 0:
+                return
+            del self._frames[key]
+        self._unlink(entry[1])
+        logger.info(f"Released shared frame {str(key)[:12]}")
+
+    def lease(self, key, frame):
+        """Context manager form of acquire()/release()"""
+        store = self
+
+        class _Lease:
+            def __enter__(self):
+                return store.acquire(key, frame)
+
+            def __exit__(self, *exc):
+                store.release(key)
+                return False
+
+        return _Lease()
+
+    def stats(self):
+        with self._lock:
+            return {str(key): {'references': refs, 'bytes': sum(block.size for block in blocks)}
+                    for key, (_, blocks, refs) in self._frames.items()}
+
+    def close(self):
+        """Free every published frame regardless of outstanding references"""
+        with self._lock:
+            entries = list(self._frames.values())
+            self._frames = {}
+        for _, blocks, _ in entries:
+            self._unlink(blocks)
+
+    @staticmethod
+    def _unlink(blocks):
+        for block in blocks:
+            try:
+                block.close()
+                block.unlink()
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                logger.warning(f"Could not free shared block {block.name}: {str(e)}")
+
+    def _publish(self, key, frame):
+        prefix = f"sf_{uuid.uuid4().hex[:12]}"
+        columns, blocks = [], []
+        try:
+            for position, (column, values) in enumerate(frame.items()):
+                array, categories = _column_layout(values)
+                block = shared_memory.SharedMemory(name=f"{prefix}_{position}", create=True,
+                                                   size=max(array.nbytes, 1))
+                blocks.append(block)
+                np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[:] = array
+                columns.append((column, block.name, array.dtype.str, categories))
+        except Exception:
+            self._unlink(blocks)
+            raise
+        logger.info(f"Published shared frame {str(key)[:12]}: {len(frame)} rows, {len(columns)} columns, "
+                    f"{sum(block.size for block in blocks) / 1e6:.1f}MB")
+        # Blocks stay with the store so the handle pickles without them
+        return SharedFrame(key, len(frame), columns), blocks
+
+
+def _call_on_column(func, shared, column, args):
+    """Process-pool entry point: attach to a shared frame and run func on one of its columns"""
+    frame = shared.attach(columns=[column])
+    try:
+        return func(frame[column], *args)
+    finally:
+        del frame
+        shared.detach()
+
+
+class ParallelFrame:
+    """
+    Fans per-column work for one dataset out to a process pool through a SharedFrameStore.
+
+    The frame is published on first use and stays published for the lifetime of
+    this object (holding one store reference) until close(), which also runs
+    when it is garbage collected, so repeated fan-outs reuse the same blocks.
+    The pool is obtained from executor_factory on first use.
+    """
+
+    def __init__(self, executor_factory, store, key):
+        self.executor_factory = executor_factory
+        self.store = store
+        self.key = key
+        self._shared = None
+        self._release = None
+        self._lock = threading.Lock()
+
+    def publish(self, frame):
+        """Return the SharedFrame for this dataset, publishing frame the first time"""
+        with self._lock:
+            if self._shared is None:
+                self._shared = self.store.acquire(self.key, frame)
+                self._release = weakref.finalize(self, self.store.release, self.key)
+            return self._shared
+
+    def map_columns(self, frame, func, columns, *args):
+        """Return {column: func(frame[column], *args)}, computed in worker processes.
+        func must be a picklable module-level function; frame only needs the mapped columns."""
+        shared = self.publish(frame)
+        published = {column for column, _, _, _ in shared.columns}
+        missing = [column for column in columns if column not in published]
+        if missing:
+            raise ValueError(f"Columns not in the published frame: {missing}")
+        executor = self.executor_factory()
+        futures = {column: executor.submit(_call_on_column, func, shared, column, args)
+                   for column in columns}
+        return {column: future.result() for column, future in futures.items()}
+
+    def close(self):
+        """Release this dataset's shared blocks (freed once no other holder is left)"""
+        with self._lock:
+            if self._release is not None:
+                self._release()
+            self._shared = self._release = None
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark: measure how long importing the application takes, per module.
+
+Runs `python -X importtime -c "import app"` in a fresh interpreter and reports
+the cumulative import time of every top-level package, project modules first,
+followed by the time of the first request served by the imported app.
+
+Usage:
+    python startup_benchmark.py [--top 15] [--module app] [--no-request]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+from collections import defaultdict
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def project_modules():
+    return {name[:-3] for name in os.listdir(PROJECT_DIR) if name.endswith('.py')}
+
+
+def measure_imports(module):
+    """Return ({top-level package: (self seconds, cumulative seconds)}, total seconds) for importing module.
+
+    Self time sums the package's own module bodies and does not overlap between
+    packages; cumulative time is that of the package's outermost import, which
+    includes whatever it pulled in.
+    """
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                            cwd=PROJECT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    own_time = defaultdict(float)
+    cumulative_time = defaultdict(float)
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        own_time[package] += int(self_us) / 1e6
+        cumulative_time[package] = max(cumulative_time[package], int(cumulative_us) / 1e6)
+        if not name.startswith('  '):
+            total += int(cumulative_us) / 1e6
+    return {package: (own_time[package], cumulative_time[package]) for package in own_time}, total
+
+
+def measure_first_request(module, path):
+    """Import the app in a fresh interpreter and time its first request"""
+    script = (
+        "import time\n"
+        f"import {module} as m\n"
+        "client = m.app.test_client()\n"
+        "start = time.perf_counter()\n"
+        f"status = client.get({path!r}).status_code\n"
+        "print(status, time.perf_counter() - start)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_DIR, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"First request failed:\n{result.stderr[-2000:]}")
+    status, seconds = result.stdout.strip().splitlines()[-1].split()
+    return int(status), float(seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure application import time per module')
+    parser.add_argument('--module', default='app', help='Module to import (default: app)')
+    parser.add_argument('--top', type=int, default=15, help='Number of third-party packages to list')
+    parser.add_argument('--path', default='/available_datasets', help='Path of the first request to time')
+    parser.add_argument('--no-request', action='store_true', help='Skip timing the first request')
+    args = parser.parse_args()
+
+    timings, total = measure_imports(args.module)
+    own = project_modules()
+
+    print(f"Importing {args.module}: {total:.3f}s\n")
+    print(f"  {'module':<30} {'self':>9} {'cumulative':>11}")
+    print("Project modules")
+    ranked = sorted(timings.items(), key=lambda item: -item[1][1])
+    for name, (own_seconds, cumulative) in ranked:
+        if name in own:
+            print(f"  {name:<30} {own_seconds:8.3f}s {cumulative:10.3f}s")
+    print("\nThird-party and standard library")
+    for name, (own_seconds, cumulative) in [item for item in ranked if item[0] not in own][:args.top]:
+        print(f"  {name:<30} {own_seconds:8.3f}s {cumulative:10.3f}s")
+
+    if not args.no_request:
+        status, seconds = measure_first_request(args.module, args.path)
+        print(f"\nFirst request GET {args.path}: {status} in {seconds:.3f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -82,24 +82,25 @@ document.addEventListener('DOMContentLoaded', function() {
                 return;
             }
 
-            if (!file.name.endsWith('.csv')) {
-                showError('Only CSV files are supported');
+            const supported = ['.csv', '.gz', '.zip', '.zst', '.xlsx', '.xls', '.parquet', '.pq'];
+            if (!supported.some(ext => file.name.toLowerCase().endsWith(ext))) {
+                showError('Supported files: CSV (plain, .gz, .zip, .zst), Excel and Parquet');
                 return;
             }
 
-            const formData = new FormData();
-            formData.append('file', file);
-
+            // Send the file as the raw request body; parsing and profiling run as a server job
             showLoading('Uploading file...');
-            const response = await fetch('/upload', {
+            const response = await fetch(`/upload_stream?async=true&filename=${encodeURIComponent(file.name)}`, {
                 method: 'POST',
-                body: formData
+                headers: { 'Content-Type': 'application/octet-stream' },
+                body: file
             });
 
-            const result = await response.json();
-            if (result.status === 'error') {
-                throw new Error(result.message);
+            const accepted = await response.json();
+            if (accepted.status === 'error') {
+                throw new Error(accepted.message);
             }
+            const result = await waitForJob(accepted.job_id);
 
             showSuccess('File uploaded successfully!');
             
@@ -132,6 +133,33 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Poll a background job until it finishes, showing its stage, rows and ETA
+    async function waitForJob(jobId) {
+        while (true) {
+            const response = await fetch(`/jobs/${jobId}`);
+            const data = await response.json();
+            if (data.status === 'error') {
+                throw new Error(data.message);
+            }
+
+            const job = data.job;
+            if (job.status === 'completed') {
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error);
+            }
+
+            let message = `Processing file: ${job.stage}`;
+            if (job.rows_processed) {
+                message += ` (${job.rows_processed.toLocaleString()} rows`;
+                message += job.eta_seconds !== null ? `, ~${Math.ceil(job.eta_seconds)}s left)` : ')';
+            }
+            Swal.update({ title: message });
+            await new Promise(resolve => setTimeout(resolve, 500));
+        }
+    }
+
     async function handleDataUpload(event) {
         event.preventDefault();
         
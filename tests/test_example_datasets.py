@@ -0,0 +1,24 @@
+import example_datasets
+
+
+def test_california_is_listed_before_its_snapshot_is_built():
+    datasets = example_datasets.available_datasets()
+    assert datasets['california']['type'] == 'Regression'
+    assert datasets['california']['features'] == 8
+
+
+def test_missing_snapshot_is_built_on_first_load(tmp_path, monkeypatch):
+    import pandas as pd
+    import app as atos
+    from dataset_cache import DatasetCache
+
+    monkeypatch.setattr(example_datasets, 'snapshots', DatasetCache(str(tmp_path)))
+    monkeypatch.setattr(example_datasets, '_build_frame',
+                        lambda name: (pd.DataFrame({'MedInc': [1.0, 2.0], 'target': [0.5, 1.5]}), {}))
+    assert not example_datasets.is_available('california')
+
+    with atos.app.test_client() as client:
+        result = client.get('/load_example_dataset/california').get_json()
+    assert result['status'] == 'success', result
+    assert result['columns'] == ['MedInc', 'target']
+    assert example_datasets.is_available('california')
@@ -0,0 +1,42 @@
+import io
+import threading
+
+import app as atos
+from jobs import JobManager
+
+
+def test_jobs_are_only_visible_to_their_owner(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    def wait(job):
+        started.set()
+        release.wait(10)
+
+    manager = JobManager(max_workers=1, state_dir=str(tmp_path), publish_interval=0.01)
+    job = manager.submit('upload', wait, owner='session:a')
+    started.wait(10)
+    assert manager.get(job.id, owner='session:a') is job
+    assert manager.get(job.id, owner='session:b') is None
+    assert manager.cancel(job.id, owner='session:b') is None
+    assert not job.cancel_requested
+
+    # Another process sees the published state, with the same owner check
+    manager._publish(job)
+    other = JobManager(state_dir=str(tmp_path))
+    assert other.get(job.id, owner='session:b') is None
+    remote = other.get(job.id, owner='session:a')
+    assert remote is not None and 'owner' not in remote.to_dict()
+    release.set()
+
+
+def test_job_routes_return_404_to_other_workspaces():
+    atos.app.config['TESTING'] = True
+    # Not used as context managers: a preserved request context would share `g` between the clients
+    owner, other = atos.app.test_client(), atos.app.test_client()
+    response = owner.post('/upload', data={'file': (io.BytesIO(b'a,b\n1,2\n3,4\n'), 'small.csv'),
+                                           'async': 'true'})
+    job_id = response.get_json()['job_id']
+
+    assert other.get(f'/jobs/{job_id}').status_code == 404
+    assert other.post(f'/jobs/{job_id}/cancel').status_code == 404
+    assert owner.get(f'/jobs/{job_id}').status_code == 200
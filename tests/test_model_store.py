@@ -0,0 +1,39 @@
+import pickle
+
+import joblib
+import numpy as np
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LogisticRegression
+
+from model_store import ModelStore, _entry_bytes
+
+
+def _entry(model, n_rows=500):
+    rng = np.random.default_rng(0)
+    X, y = rng.normal(size=(n_rows, 5)), rng.integers(0, 2, size=n_rows)
+    model.fit(X, y)
+    return {'model': model, 'predictions': model.predict(X), 'metrics': {'score': 0.5}, 'importance': {}}
+
+
+def test_entry_size_is_estimated_close_to_its_pickle():
+    for model in (RandomForestRegressor(n_estimators=20, random_state=0), LogisticRegression()):
+        entry = _entry(model)
+        pickled = len(pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL))
+        assert 0.5 * pickled <= _entry_bytes(entry) <= 2 * pickled
+
+
+def test_export_reuses_the_spill_file(tmp_path, monkeypatch):
+    dumps = []
+    dump = joblib.dump
+    monkeypatch.setattr(joblib, 'dump', lambda *args, **kwargs: dumps.append(args[1]) or dump(*args, **kwargs))
+
+    store = ModelStore(str(tmp_path / 'spill'), idle_seconds=0)
+    store.put('rf', _entry(RandomForestRegressor(n_estimators=5, random_state=0)))
+    store.export('rf', str(tmp_path / 'rf.joblib'))
+    store.sweep()
+    assert store.stats()['spills'] == 1
+    store.export('rf', str(tmp_path / 'again.joblib'))
+
+    assert len(dumps) == 1
+    restored = joblib.load(str(tmp_path / 'again.joblib'))
+    np.testing.assert_array_equal(restored['predictions'], store['rf']['predictions'])
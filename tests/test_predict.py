@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app as atos
+
+
+@pytest.fixture
+def client():
+    atos.app.config['TESTING'] = True
+    with atos.app.test_client() as client:
+        yield client
+
+
+def _train_walmart(client):
+    assert client.get('/load_example_dataset/walmart_sales').get_json()['status'] == 'success'
+    assert client.post('/set_target', json={'target_column': 'Weekly_Sales'}).get_json()['status'] == 'success'
+    result = client.post('/preprocess', json={'target_column': 'Weekly_Sales', 'memory_map': False}).get_json()
+    assert result['status'] == 'success', result
+    result = client.post('/train_model', json={'model_type': 'dt'}).get_json()
+    assert result['status'] == 'success', result
+
+
+def test_predict_parses_dates_with_the_format_detected_at_load(client):
+    """Walmart dates are dd-mm-yyyy: new rows given as text must parse the same way"""
+    _train_walmart(client)
+    row = {'Store': 1, 'Holiday_Flag': 0, 'Temperature': 42.31, 'Fuel_Price': 2.572,
+           'CPI': 211.096358, 'Unemployment': 8.106}
+    result = client.post('/predict', json={'records': [{**row, 'Date': '05-02-2010'},
+                                                       {**row, 'Date': '13-02-2010'}]}).get_json()
+    assert result['status'] == 'success', result
+    assert result['rows'] == 2
+    assert np.all(np.isfinite(result['predictions']))
+
+    pipeline = atos.current_workspace().ml_processor.split.pipeline
+    assert pipeline.date_formats == {'Date': '%d-%m-%Y'}
+    data = atos.current_workspace().ml_processor.data
+    rows = data[data['Date'].isin(pd.to_datetime(['2010-02-05', '2010-02-12']))].drop(columns='Weekly_Sales').head(2)
+    as_text = rows.assign(Date=rows['Date'].dt.strftime('%d-%m-%Y'))
+    expected = pipeline.transform(rows)
+    transformed = pipeline.transform(as_text)
+    assert not transformed.isna().any().any()
+    np.testing.assert_allclose(transformed.to_numpy(), expected.to_numpy())
+
+
+def test_predict_imputes_unparseable_dates(client):
+    """Date parts of rows whose date cannot be parsed are imputed, not passed on as NaN"""
+    _train_walmart(client)
+    pipeline = atos.current_workspace().ml_processor.split.pipeline
+    row = atos.current_workspace().ml_processor.data.drop(columns='Weekly_Sales').head(1)
+    transformed = pipeline.transform(row.assign(Date='not a date'))
+    assert not transformed.isna().any().any()
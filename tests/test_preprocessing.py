@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+
+from ml_processor import MLProcessor
+from preprocessing import find_uninformative_columns
+
+
+def _frame(n_rows=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    data = pd.DataFrame({
+        'row_id': np.arange(n_rows),
+        'x1': rng.normal(size=n_rows),
+        'x2': rng.normal(size=n_rows),
+        'constant': np.ones(n_rows)
+    })
+    data['y'] = 2 * data['x1'] - data['x2'] + rng.normal(scale=0.1, size=n_rows)
+    return data
+
+
+def test_row_number_is_flagged_in_any_order():
+    data = _frame().sample(frac=1, random_state=0)
+    assert find_uninformative_columns(data)['row_id'] == 'identifier (row number)'
+
+
+def test_preprocess_data_drops_row_number_decided_before_the_split():
+    processor = MLProcessor(data=_frame())
+    processor.set_target('y')
+    summary = processor.preprocess_data()
+
+    assert set(summary['dropped_columns']) == {'row_id', 'constant'}
+    assert processor.split.feature_names == ['x1', 'x2']
+    # New rows lacking the dropped columns can still be scored
+    processor.train_model('lr')
+    assert len(processor.predict(_frame(5, seed=1)[['x1', 'x2']])['predictions']) == 5
+
+
+def test_preprocess_data_keeps_requested_columns():
+    processor = MLProcessor(data=_frame())
+    processor.set_target('y')
+    summary = processor.preprocess_data(keep_columns=['row_id'])
+
+    assert set(summary['dropped_columns']) == {'constant'}
+    assert 'row_id' in processor.split.feature_names
@@ -0,0 +1,50 @@
+import glob
+import hashlib
+import io
+import os
+import time
+
+import pytest
+
+import app as atos
+
+FIRST = b'a,b,y\n' + b''.join(b'%d,%d,%d\n' % (i, i % 7, i % 2) for i in range(200))
+SECOND = b'c,d,z\n' + b''.join(b'%d,%d,%d\n' % (i, i % 5, i % 3) for i in range(300))
+
+
+@pytest.fixture
+def client():
+    atos.app.config['TESTING'] = True
+    with atos.app.test_client() as client:
+        yield client
+
+
+def _read(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+
+def _wait(client, job_id, timeout=60):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = client.get(f'/jobs/{job_id}').get_json()['job']
+        if job['status'] in ('completed', 'failed', 'cancelled'):
+            return job
+        time.sleep(0.05)
+    raise TimeoutError(job_id)
+
+
+def test_uploads_of_the_same_filename_do_not_overwrite_each_other(client):
+    response = client.post('/upload', data={'file': (io.BytesIO(FIRST), 'sales.csv'), 'async': 'true'})
+    assert response.status_code == 202
+    job_id = response.get_json()['job_id']
+    # Another upload under the same name while the job may still be reading the first file
+    result = client.post('/upload', data={'file': (io.BytesIO(SECOND), 'sales.csv')}).get_json()
+    assert result['status'] == 'success', result
+
+    job = _wait(client, job_id)
+    assert job['status'] == 'completed', job
+    assert job['result']['dataset_key'] == hashlib.sha256(FIRST).hexdigest()
+    # Both uploads are still on disk, each under its own path
+    saved = [_read(path) for path in glob.glob(os.path.join(atos.app.config['UPLOAD_FOLDER'], '*', 'sales.csv'))]
+    assert FIRST in saved and SECOND in saved
@@ -0,0 +1,71 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset_cache import DatasetCache
+from feature_store import FeatureStore
+from ml_processor import MLProcessor
+from workspace import Workspace, WorkspaceRegistry, WorkspaceStore
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    rng = np.random.default_rng(0)
+    data = pd.DataFrame({'x1': rng.normal(size=300), 'x2': rng.normal(size=300),
+                         'color': rng.choice(['red', 'green', 'blue'], size=300)})
+    data['label'] = np.where(data['x1'] > 0, 'high', 'low')
+    cache = DatasetCache(str(tmp_path / 'cache'))
+    cache.store('sample', data, filename='sample.csv')
+    return cache
+
+
+def _workspace(registry, snapshot, **options):
+    workspace = registry.get('analyst')
+    processor = MLProcessor(cache=snapshot, fingerprint='sample')
+    processor.set_target('label')
+    processor.preprocess_data(**options)
+    workspace.ml_processor = processor
+    registry.refresh(workspace)
+    return workspace
+
+
+def _bump(store, key):
+    """Rewrite the manifest under a newer revision, as another process saving it would"""
+    manifest = store.load(key)
+    with open(store._manifest_path(key), 'w', encoding='utf-8') as f:
+        json.dump({**manifest, 'revision': manifest['revision'] + 1}, f)
+
+
+def test_string_labels_are_stored_label_encoded(tmp_path):
+    store = FeatureStore(str(tmp_path))
+    labels = np.array(['b', 'a', 'b', 'c'], dtype=object)
+    store.save('k', X_train=np.ones((4, 1)), X_test=np.ones((4, 1)), y_train=labels, y_test=labels[:2])
+    assert store.has('k')
+    np.testing.assert_array_equal(store.load('k')['y_train'], labels)
+
+
+def test_other_process_restores_a_split_with_string_labels(tmp_path, snapshot):
+    store = WorkspaceStore(str(tmp_path / 'state'))
+    features = FeatureStore(str(tmp_path / 'features'))
+    _workspace(WorkspaceRegistry(1 << 30, store=store), snapshot, feature_store=features)
+
+    other = WorkspaceRegistry(1 << 30, store=store).get('analyst')
+    split = other.ml_processor.split
+    assert split is not None
+    assert set(split.y_train) == {'high', 'low'}
+    other.ml_processor.train_model('dt')
+
+
+@pytest.mark.parametrize('options', [{'one_hot': True}, {}], ids=['sparse', 'in-memory'])
+def test_newer_manifest_keeps_the_local_split(tmp_path, snapshot, options):
+    store = WorkspaceStore(str(tmp_path / 'state'))
+    registry = WorkspaceRegistry(1 << 30, store=store)
+    workspace = _workspace(registry, snapshot, **options)
+    split = workspace.ml_processor.split
+    assert store.load('analyst')['split'] is None
+
+    _bump(store, 'analyst')
+    assert registry.get('analyst').ml_processor.split is split
+    workspace.ml_processor.train_model('dt')
@@ -0,0 +1,308 @@
+import numpy as np
+import pandas as pd
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+def _object_bytes(obj):
+    """Approximate memory held by a DataFrame, Series, array or sparse matrix"""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if hasattr(obj, 'indptr'):
+        # SciPy CSR/CSC matrix
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    return 0
+
+
+class Workspace:
+    """Everything one analyst is working on: the loaded dataset, its splits and models"""
+
+    def __init__(self, key):
+        self.key = key
+        self.ml_processor = None
+        self.business_intelligence = None
+        self.business_reporter = None
+        self.most_recent_uploaded_file = None
+        self.most_recent_dataset_key = None
+        self.created = time.time()
+        self.last_used = self.created
+        self.memory_bytes = 0
+        # Revision of the on-disk manifest this workspace matches, and what it said
+        self.revision = 0
+        self.manifest = None
+        # Model name -> ModelStore revision last written next to the manifest
+        self.stored_models = {}
+
+    def measure(self):
+        """Recompute the memory held by the workspace's dataset, train/test splits (current and
+        memoized) and resident models"""
+        processor = self.ml_processor
+        if processor is None:
+            self.memory_bytes = 0
+        else:
+            self.memory_bytes = sum(_object_bytes(getattr(processor, name, None))
+                                    for name in ('data', 'X_train', 'X_test', 'y_train', 'y_test'))
+            self.memory_bytes += sum(_object_bytes(split.X_train) + _object_bytes(split.X_test)
+                                     for split in processor.memoized_splits() if split is not processor.split)
+            self.memory_bytes += processor.models.resident_bytes()
+        return self.memory_bytes
+
+    def to_dict(self):
+        processor = self.ml_processor
+        return {
+            'dataset_key': self.most_recent_dataset_key,
+            'shape': list(processor.data.shape) if processor is not None and processor.data is not None else None,
+            'dataset_version': processor.dataset.version if processor is not None and processor.dataset else None,
+            'target': getattr(processor, 'target', None),
+            'memory_bytes': self.memory_bytes,
+            'models': processor.models.stats() if processor is not None else None,
+            'idle_seconds': round(time.time() - self.last_used, 1)
+        }
+
+
+class WorkspaceStore:
+    """
+    On-disk manifests that let every server process serve every workspace.
+
+    A manifest names the workspace's dataset snapshot, target, memory-mapped
+    train/test split and trained models (each pickled next to it with joblib),
+    all of which live on shared storage. Saving bumps the manifest revision;
+    a process holding an older revision rebuilds the workspace from the
+    manifest before serving it. Splits that were not written to a FeatureStore
+    (sparse or not memory-mapped) cannot be shared: they stay with the process
+    that made them, which keeps using them across restores of the same dataset
+    and target.
+    """
+
+    def __init__(self, state_dir, model_store_factory=None):
+        self.state_dir = state_dir
+        # Builds the ModelStore of restored processors, so they spill like freshly created ones
+        self.model_store_factory = model_store_factory
+        os.makedirs(self.state_dir, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def _workspace_dir(self, key):
+        return os.path.join(self.state_dir, hashlib.sha256(key.encode('utf-8')).hexdigest()[:32])
+
+    def _manifest_path(self, key):
+        return os.path.join(self._workspace_dir(key), 'manifest.json')
+
+    def load(self, key):
+        """Return the stored manifest for a workspace key, or None"""
+        try:
+            with open(self._manifest_path(key), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read workspace manifest: {str(e)}")
+            return None
+
+    def _describe(self, workspace):
+        """Build the manifest body (without revision) for a workspace's current state"""
+        processor = workspace.ml_processor
+        if processor is None or processor.snapshot_source is None:
+            return {'dataset': None, 'uploaded_file': workspace.most_recent_uploaded_file}
+        split = processor.split
+        current = processor.current_model
+        return {
+            'dataset': list(processor.snapshot_source),
+            'dataset_key': workspace.most_recent_dataset_key,
+            'uploaded_file': workspace.most_recent_uploaded_file,
+            'target': processor.target,
+            'split': {
+                'feature_store_dir': split.feature_store_dir,
+                'feature_store_key': split.feature_store_key,
+                'version': split.version,
+                'target': split.target,
+                'problem_type': split.problem_type,
+                'is_classification': split.is_classification,
+                'feature_names': list(split.feature_names),
+                'original_train_rows': split.original_train_rows
+            } if split is not None and split.feature_store_key else None,
+            'models': sorted(processor.models),
+            'current_model': current['name'] if current else None
+        }
+
+    def save(self, workspace):
+        """Write the workspace's manifest (and any newly trained models) if its state changed"""
+        body = self._describe(workspace)
+        if body == workspace.manifest:
+            return False
+
+        with self._lock:
+            directory = self._workspace_dir(workspace.key)
+            os.makedirs(os.path.join(directory, 'models'), exist_ok=True)
+            models = workspace.ml_processor.models if workspace.ml_processor is not None else {}
+            for name in body.get('models', []):
+                # Unchanged models are not read back in, so spilled ones stay on disk
+                revision = models.revision(name)
+                if workspace.stored_models.get(name) == revision:
+                    continue
+                # Reuses the model's spill file rather than serializing it again
+                models.export(name, os.path.join(directory, 'models', f'{name}.joblib'))
+                workspace.stored_models[name] = revision
+
+            stored = self.load(workspace.key) or {}
+            revision = max(workspace.revision, stored.get('revision', 0)) + 1
+            path = self._manifest_path(workspace.key)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({**body, 'revision': revision}, f, indent=2)
+            os.replace(tmp_path, path)
+            workspace.revision, workspace.manifest = revision, body
+        return True
+
+    @staticmethod
+    def _local_split(workspace, body):
+        """The split this process holds for the manifest's dataset and target, if any; used when
+        the manifest names no split this process can load"""
+        local = workspace.ml_processor
+        if local is None or local.split is None or local.snapshot_source is None:
+            return None
+        if list(local.snapshot_source) != list(body['dataset']) or local.split.target != body.get('target'):
+            return None
+        return local.split
+
+    def restore(self, workspace, manifest):
+        """Rebuild a workspace from a manifest written by another process"""
+        from dataset_cache import DatasetCache
+        from feature_store import FeatureStore
+        from ml_processor import MLProcessor, _load_stored_split
+        from business_intelligence import BusinessIntelligence
+        from reporting import BusinessReporter
+        import joblib
+
+        body = {k: v for k, v in manifest.items() if k != 'revision'}
+        if body.get('dataset'):
+            cache_dir, snapshot_key = body['dataset']
+            processor = MLProcessor(cache=DatasetCache(cache_dir), fingerprint=snapshot_key)
+            if self.model_store_factory is not None:
+                processor.models = self.model_store_factory()
+            if body.get('target'):
+                processor.set_target(body['target'])
+            split_info = body.get('split')
+            split = None
+            if split_info and FeatureStore(split_info['feature_store_dir']).has(split_info['feature_store_key']):
+                split = _load_stored_split(split_info['feature_store_dir'], split_info['feature_store_key'],
+                                           split_info['version'], split_info['target'], split_info['problem_type'],
+                                           split_info['is_classification'], split_info['feature_names'],
+                                           split_info.get('original_train_rows'))
+            else:
+                split = self._local_split(workspace, body)
+            if split is not None:
+                processor.publish_split(split)
+            stored_models = {}
+            for name in body.get('models', []):
+                path = os.path.join(self._workspace_dir(workspace.key), 'models', f'{name}.joblib')
+                if not os.path.exists(path):
+                    continue
+                entry = joblib.load(path)
+                # Models trained on an older split keep working, but plots need their own split
+                processor.publish_model(name, entry, split if entry.get('split_version') == getattr(
+                    split, 'version', None) else None)
+                stored_models[name] = processor.models.revision(name)
+            current = body.get('current_model')
+            if current in processor.models:
+                processor.publish_model(current, processor.models[current], split)
+                stored_models[current] = processor.models.revision(current)
+            business_intelligence = BusinessIntelligence(processor.data, profile=processor.dataset.profile)
+            workspace.business_reporter = BusinessReporter(business_intelligence)
+            workspace.business_intelligence = business_intelligence
+            workspace.ml_processor = processor
+            workspace.most_recent_dataset_key = body.get('dataset_key')
+            workspace.stored_models = stored_models
+        workspace.most_recent_uploaded_file = body.get('uploaded_file')
+        workspace.revision, workspace.manifest = manifest.get('revision', 0), body
+        logger.info(f"Restored workspace {workspace.key[:12]} at revision {workspace.revision}")
+
+
+class WorkspaceRegistry:
+    """
+    Workspaces keyed by session or API key, kept in least-recently-used order.
+
+    When the measured size of all workspaces exceeds the memory budget, the
+    least recently used ones are evicted (never the one making the request).
+    Workspaces idle for longer than idle_timeout seconds are dropped as well.
+    Evicted users simply load their dataset again, which the snapshot cache
+    makes cheap.
+
+    With a WorkspaceStore, workspaces are also saved to disk after every change
+    and reloaded when another process saved a newer revision, so evicted
+    workspaces come back on their next request and any process can serve any user.
+    """
+
+    def __init__(self, memory_budget_bytes, idle_timeout=24 * 3600, store=None):
+        self.memory_budget_bytes = memory_budget_bytes
+        self.idle_timeout = idle_timeout
+        self.store = store
+        self._workspaces = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the workspace for key, creating it if needed, and mark it most recently used"""
+        with self._lock:
+            workspace = self._workspaces.get(key)
+            if workspace is None:
+                workspace = self._workspaces[key] = Workspace(key)
+            else:
+                self._workspaces.move_to_end(key)
+            workspace.last_used = time.time()
+        if self.store is not None:
+            manifest = self.store.load(key)
+            if manifest and manifest.get('revision', 0) > workspace.revision:
+                try:
+                    self.store.restore(workspace, manifest)
+                except Exception as e:
+                    logger.warning(f"Could not restore workspace {key[:12]}: {str(e)}")
+        return workspace
+
+    def refresh(self, workspace):
+        """Save and re-measure a workspace, spill idle models, then evict others until the
+        registry fits its budget"""
+        if self.store is not None:
+            try:
+                self.store.save(workspace)
+            except Exception as e:
+                logger.warning(f"Could not save workspace {workspace.key[:12]}: {str(e)}")
+        with self._lock:
+            others = [ws for ws in self._workspaces.values() if ws is not workspace]
+        for ws in others:
+            if ws.ml_processor is not None and ws.ml_processor.models.sweep():
+                ws.measure()
+        if workspace.ml_processor is not None:
+            workspace.ml_processor.models.sweep()
+        workspace.measure()
+        idle_cutoff = time.time() - self.idle_timeout
+        with self._lock:
+            total = sum(ws.memory_bytes for ws in self._workspaces.values())
+            for key in list(self._workspaces):
+                if key == workspace.key:
+                    continue
+                if total <= self.memory_budget_bytes and self._workspaces[key].last_used >= idle_cutoff:
+                    break
+                evicted = self._workspaces.pop(key)
+                total -= evicted.memory_bytes
+                logger.info(f"Evicted workspace {key[:12]} ({evicted.memory_bytes / 1e6:.1f}MB, "
+                            f"idle {time.time() - evicted.last_used:.0f}s)")
+        return total
+
+    def stats(self):
+        with self._lock:
+            workspaces = list(self._workspaces.values())
+        return {
+            'workspaces': len(workspaces),
+            'memory_bytes': sum(ws.memory_bytes for ws in workspaces),
+            'memory_budget_bytes': self.memory_budget_bytes
+        }